@@ -6,22 +6,50 @@ from typing import Any
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 
 from .const import DOMAIN
 from .coordinator import DynamicHeatingCoordinator
+from .dispatcher import DATA_DISPATCHER, async_get_dispatcher
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.SWITCH, Platform.SENSOR]
+PLATFORMS = [Platform.SWITCH, Platform.SENSOR, Platform.CALENDAR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Dynamic Heating services."""
+    await async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Dynamic Heating from a config entry."""
     hass.data.setdefault(DOMAIN, {})
     
-    coordinator = DynamicHeatingCoordinator(hass, entry)
+    # All entries share one dispatcher so a mesh sees a single, rate-limited
+    # stream of commands
+    coordinator = DynamicHeatingCoordinator(hass, entry, async_get_dispatcher(hass))
+    await coordinator.accountant.async_load()
+    await coordinator.presence.async_load()
+    await coordinator.forecaster.async_load()
+    await coordinator.loads.async_load()
     await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(coordinator.accountant.async_start())
+    entry.async_on_unload(coordinator.presence.async_start())
+    entry.async_on_unload(coordinator.forecaster.async_start())
+    entry.async_on_unload(coordinator.watchdog.async_start())
+    entry.async_on_unload(coordinator.climate.async_start())
+
+    # History is only needed by learned features, so don't hold up setup
+    entry.async_create_background_task(
+        hass, coordinator.history.async_warm_up(), f"{DOMAIN} history warm-up"
+    )
     
     hass.data[DOMAIN][entry.entry_id] = coordinator
     
@@ -49,6 +77,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        if hass.data[DOMAIN].keys() <= {DATA_DISPATCHER}:
+            if dispatcher := hass.data[DOMAIN].pop(DATA_DISPATCHER, None):
+                dispatcher.async_stop()
     
     return unload_ok
 
@@ -0,0 +1,293 @@
+"""Energy and cost accounting for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.climate import DOMAIN as CLIMATE_DOMAIN, HVACAction
+from homeassistant.components.water_heater import DOMAIN as WATER_HEATER_DOMAIN
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    ATTR_TEMPERATURE,
+    ATTR_UNIT_OF_MEASUREMENT,
+    STATE_OFF,
+    STATE_ON,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_ZONE_CLIMATE,
+    CONF_ZONE_HEATER_POWER,
+    CONF_ZONE_LOAD,
+    CONF_ZONE_POWER_SENSOR,
+    CONF_ZONES,
+    DOMAIN,
+)
+from .price_series import floor_to_resolution
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+
+PERIOD_DAY = "day"
+PERIOD_MONTH = "month"
+
+# Returns (slot price, average price) for a moment, or None if unknown
+PriceLookup = Callable[[datetime], "tuple[float, float] | None"]
+
+
+class ZoneMeter:
+    """Running power reading of a single zone."""
+
+    __slots__ = ("power_kw", "since")
+
+    def __init__(self) -> None:
+        """Initialize the meter."""
+        self.power_kw = 0.0
+        self.since: datetime | None = None
+
+
+class EnergyAccountant:
+    """Integrate slot prices against zone heating energy.
+
+    Thermostat zones and storage loads are metered alike. Every power change
+    closes the running interval of one zone, split at slot edges so each
+    part is billed at its own slot's price. Totals are persisted in a Store
+    and never rebuilt from recorder history.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        config: Mapping[str, Any],
+        price_lookup: PriceLookup,
+        resolution: Callable[[], timedelta],
+    ) -> None:
+        """Initialize the accountant from the entry's merged config."""
+        self.hass = hass
+        self.entry = entry
+        self._price_lookup = price_lookup
+        self._resolution = resolution
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.accounting"
+        )
+
+        # entity_id -> (zone id, rated heater power in kW or None)
+        self._sources: dict[str, tuple[str, float | None]] = {}
+        self._meters: dict[str, ZoneMeter] = {}
+        for zone in config.get(CONF_ZONES, []):
+            zone_id = zone.get(CONF_ZONE_CLIMATE) or zone.get(CONF_ZONE_LOAD)
+            if not zone_id:
+                continue
+            power_sensor = zone.get(CONF_ZONE_POWER_SENSOR)
+            heater_power = zone.get(CONF_ZONE_HEATER_POWER)
+            if power_sensor:
+                self._sources[power_sensor] = (zone_id, None)
+            elif heater_power:
+                self._sources[zone_id] = (zone_id, float(heater_power))
+            else:
+                continue
+            self._meters[zone_id] = ZoneMeter()
+
+        self._totals: dict[str, dict[str, Any]] = {
+            PERIOD_DAY: _empty_period(None),
+            PERIOD_MONTH: _empty_period(None),
+        }
+
+    @property
+    def configured(self) -> bool:
+        """Return True if any zone has a power source to account for."""
+        return bool(self._meters)
+
+    def total(self, period: str) -> dict[str, Any]:
+        """Return the running totals for a period."""
+        return self._totals[period]
+
+    def last_reset(self, period: str) -> datetime | None:
+        """Return when the period's totals were last reset."""
+        started = self._totals[period]["started"]
+        return dt_util.parse_datetime(started) if started else None
+
+    async def async_load(self) -> None:
+        """Restore the totals from storage."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        for period in (PERIOD_DAY, PERIOD_MONTH):
+            if period in stored:
+                self._totals[period] = {**_empty_period(None), **stored[period]}
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start tracking the zone power sources."""
+        now = dt_util.now()
+        for entity_id, (zone_id, heater_power) in self._sources.items():
+            meter = self._meters[zone_id]
+            meter.power_kw = _read_power(self.hass.states.get(entity_id), heater_power)
+            meter.since = now
+
+        if not self._sources:
+            return lambda: None
+
+        return async_track_state_change_event(
+            self.hass, list(self._sources), self._async_power_changed
+        )
+
+    @callback
+    def async_tick(self) -> None:
+        """Close the running intervals of all zones.
+
+        Called on every coordinator refresh so a constant draw is still
+        billed at the price of the slot it happened in.
+        """
+        now = dt_util.now()
+        for zone_id, meter in self._meters.items():
+            self._integrate(zone_id, meter, now)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _async_power_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Handle a power change of one zone."""
+        zone_id, heater_power = self._sources[event.data["entity_id"]]
+        meter = self._meters[zone_id]
+
+        self._integrate(zone_id, meter, dt_util.now())
+        meter.power_kw = _read_power(event.data["new_state"], heater_power)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _integrate(self, zone_id: str, meter: ZoneMeter, now: datetime) -> None:
+        """Book the energy used since the meter's last reading."""
+        since = meter.since
+        if since is None or not meter.power_kw or now <= since:
+            meter.since = now
+            return
+
+        resolution = self._resolution()
+        start = since
+        while start < now:
+            self._roll_over(start)
+            # Bill each slot the interval spans at that slot's price, and
+            # each day in that day's totals
+            slot = dt_util.as_utc(floor_to_resolution(start, resolution))
+            next_day = dt_util.start_of_local_day(
+                dt_util.as_local(start).date() + timedelta(days=1)
+            )
+            end = min(slot + resolution, next_day, now)
+            hours = (end - start).total_seconds() / 3600
+            meter.since = end
+            self._book(zone_id, meter.power_kw * hours, start)
+            start = end
+
+    def _book(self, zone_id: str, energy: float, moment: datetime) -> None:
+        """Add energy used in the slot containing moment to the totals."""
+        prices = self._price_lookup(moment)
+        for period, key in _period_keys(moment).items():
+            totals = self._totals[period]
+            if totals["key"] != key:
+                # The period is already closed
+                continue
+            totals["energy"] += energy
+            zone_cost = totals["zones"].setdefault(zone_id, 0.0)
+            if prices is None:
+                continue
+            price, average = prices
+            totals["cost"] += energy * price
+            totals["flat_cost"] += energy * average
+            totals["zones"][zone_id] = zone_cost + energy * price
+
+    def _roll_over(self, moment: datetime) -> None:
+        """Reset the daily and monthly totals when moment starts a new period.
+
+        Every zone is first metered up to the start of the new day, so the
+        energy of the period that ended is booked before it is reset.
+        """
+        keys = _period_keys(moment)
+        current = self._totals[PERIOD_DAY]["key"]
+        if current is not None:
+            if keys[PERIOD_DAY] <= current:
+                return
+            boundary = dt_util.start_of_local_day(dt_util.as_local(moment).date())
+            for zone_id, meter in self._meters.items():
+                if meter.since is not None and meter.since < boundary:
+                    self._integrate(zone_id, meter, boundary)
+
+        for period, key in keys.items():
+            if self._totals[period]["key"] != key:
+                self._totals[period] = _empty_period(key)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return self._totals
+
+
+def _period_keys(moment: datetime) -> dict[str, str]:
+    """Return the day and month moment falls in, in local time."""
+    local = dt_util.as_local(moment)
+    return {
+        PERIOD_DAY: local.date().isoformat(),
+        PERIOD_MONTH: f"{local.year:04d}-{local.month:02d}",
+    }
+
+
+def _empty_period(key: str | None) -> dict[str, Any]:
+    """Return zeroed totals for a period."""
+    return {
+        "key": key,
+        "started": dt_util.now().isoformat() if key else None,
+        "energy": 0.0,
+        "cost": 0.0,
+        "flat_cost": 0.0,
+        "zones": {},
+    }
+
+
+def _read_power(state: State | None, heater_power: float | None) -> float:
+    """Return a zone's current heating power in kW."""
+    if state is None:
+        return 0.0
+
+    # Estimated zones draw their rated power while they heat
+    if heater_power is not None:
+        return heater_power if _is_heating(state) else 0.0
+
+    try:
+        power = float(state.state)
+    except (ValueError, TypeError):
+        return 0.0
+
+    if state.attributes.get(ATTR_UNIT_OF_MEASUREMENT) == "W":
+        power /= 1000
+    return max(power, 0.0)
+
+
+def _is_heating(state: State) -> bool:
+    """Return True if a zone or load without a power sensor is heating."""
+    if state.domain == CLIMATE_DOMAIN:
+        return state.attributes.get("hvac_action") == HVACAction.HEATING
+    if state.domain == WATER_HEATER_DOMAIN:
+        # Water heaters do not report whether the element is on; it is while
+        # the tank is below its target
+        current = state.attributes.get("current_temperature")
+        target = state.attributes.get(ATTR_TEMPERATURE)
+        return (
+            state.state != STATE_OFF
+            and current is not None
+            and target is not None
+            and current < target
+        )
+    # Switched loads draw their rated power while switched on
+    return state.state == STATE_ON
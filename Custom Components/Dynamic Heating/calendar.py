@@ -0,0 +1,178 @@
+"""Calendar platform for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import ATTR_DAILY_PLAN, DOMAIN, PRICE_TIER_HIGH, PRICE_TIER_LOW
+from .coordinator import DynamicHeatingCoordinator
+
+TIER_NAMES = {
+    PRICE_TIER_LOW: "Low price",
+    PRICE_TIER_HIGH: "High price",
+}
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Dynamic Heating plan calendar."""
+    coordinator: DynamicHeatingCoordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities([DynamicHeatingPlanCalendar(coordinator, entry)])
+
+
+class PlanIndex:
+    """Sorted, non-overlapping plan intervals answering range queries.
+
+    Consecutive slots with the same tier, comfort and boost flags are merged
+    into one event. Because events never overlap, both their starts and ends
+    are sorted, so the events overlapping a window are one contiguous run
+    found with two bisects.
+    """
+
+    def __init__(self, plan: dict[str, dict[str, Any]], resolution: timedelta) -> None:
+        """Build the index from a plan."""
+        self.events: list[CalendarEvent] = []
+        self._starts: list[datetime] = []
+        self._ends: list[datetime] = []
+
+        run_key = None
+        run_start: datetime | None = None
+        run_end: datetime | None = None
+        run_entries: list[dict[str, Any]] = []
+
+        for key, entry in plan.items():
+            start = dt_util.as_utc(datetime.fromisoformat(key))
+            entry_key = (
+                entry["tier"],
+                entry.get("tier_index"),
+                entry["is_comfort_hour"],
+                entry["boost_for_cop"],
+            )
+            if entry_key == run_key and start == run_end:
+                run_end = start + resolution
+                run_entries.append(entry)
+                continue
+            if run_entries:
+                self._add(run_start, run_end, run_entries)
+            run_key, run_start, run_end = entry_key, start, start + resolution
+            run_entries = [entry]
+
+        if run_entries:
+            self._add(run_start, run_end, run_entries)
+
+    def _add(
+        self, start: datetime, end: datetime, entries: list[dict[str, Any]]
+    ) -> None:
+        """Append one merged event."""
+        first = entries[0]
+        summary = TIER_NAMES.get(first["tier"], "Normal price")
+        if "tier_index" in first:
+            summary += f" (tier {first['tier_index'] + 1})"
+        if first["is_comfort_hour"]:
+            summary += " (comfort)"
+        elif first["boost_for_cop"]:
+            summary += " (COP boost)"
+
+        prices = [entry["price"] for entry in entries]
+        targets = [entry["target_temp"] for entry in entries]
+        description = (
+            f"Average price {sum(prices) / len(prices):.4f}, "
+            f"target {min(targets)}–{max(targets)} °C"
+            if min(targets) != max(targets)
+            else f"Average price {sum(prices) / len(prices):.4f}, "
+            f"target {targets[0]} °C"
+        )
+
+        self.events.append(
+            CalendarEvent(
+                start=dt_util.as_local(start),
+                end=dt_util.as_local(end),
+                summary=summary,
+                description=description,
+            )
+        )
+        self._starts.append(start)
+        self._ends.append(end)
+
+    def between(self, start: datetime, end: datetime) -> list[CalendarEvent]:
+        """Return the events overlapping [start, end)."""
+        first = bisect_right(self._ends, dt_util.as_utc(start))
+        last = bisect_left(self._starts, dt_util.as_utc(end))
+        return self.events[first:last]
+
+    def at_or_after(self, moment: datetime) -> CalendarEvent | None:
+        """Return the event running at moment, or else the next one."""
+        index = bisect_right(self._ends, dt_util.as_utc(moment))
+        return self.events[index] if index < len(self.events) else None
+
+
+class DynamicHeatingPlanCalendar(CoordinatorEntity, CalendarEntity):
+    """Calendar showing the heating plan as tier events."""
+
+    _attr_icon = "mdi:calendar-clock"
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the calendar."""
+        super().__init__(coordinator)
+        self.entry = entry
+        self._attr_unique_id = f"{entry.entry_id}_plan_calendar"
+        self._attr_name = "Heating Plan"
+        self._index = PlanIndex({}, coordinator.resolution)
+        self._index_revision: int | None = None
+        self._last_event: CalendarEvent | None = None
+
+    @property
+    def device_info(self) -> dict[str, Any]:
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self.entry.entry_id)},
+            "name": self.entry.data[CONF_NAME],
+            "manufacturer": "Dynamic Heating Scheduler",
+            "model": "Heating Coordinator",
+        }
+
+    @property
+    def index(self) -> PlanIndex:
+        """Return the interval index, rebuilt once per plan revision."""
+        if self._index_revision != self.coordinator.plan_revision:
+            plan = (self.coordinator.data or {}).get(ATTR_DAILY_PLAN, {})
+            self._index = PlanIndex(plan, self.coordinator.resolution)
+            self._index_revision = self.coordinator.plan_revision
+        return self._index
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the current or next plan event."""
+        return self.index.at_or_after(dt_util.now())
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Return the plan events in a time range."""
+        return self.index.between(start_date, end_date)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the current event changed."""
+        event = self.event
+        if event == self._last_event:
+            return
+        self._last_event = event
+        self.async_write_ha_state()
@@ -0,0 +1,345 @@
+"""Climate entity control for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components.climate import (
+    ATTR_MAX_TEMP,
+    ATTR_MIN_TEMP,
+    ATTR_TARGET_TEMP_HIGH,
+    ATTR_TARGET_TEMP_LOW,
+    ATTR_TARGET_TEMP_STEP,
+    DOMAIN as CLIMATE_DOMAIN,
+    SERVICE_SET_TEMPERATURE,
+    ClimateEntityFeature,
+    HVACMode,
+)
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    ATTR_SUPPORTED_FEATURES,
+    ATTR_TEMPERATURE,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    ReadOnlyDict,
+    State,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import entity_registry as er, issue_registry as ir
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .dispatcher import PRIORITY_NORMAL, ServiceDispatcher
+
+_LOGGER = logging.getLogger(__name__)
+
+# Used when a device does not report a step
+DEFAULT_TEMP_STEP = 0.5
+
+# Targets closer than this to the current setting are not sent
+MIN_TEMP_CHANGE = 0.5
+
+# Failing zones are retried after an exponentially growing delay, and given
+# up on after this many failures in a row until the entity changes state
+BACKOFF_BASE = timedelta(minutes=5)
+BACKOFF_MAX = timedelta(hours=2)
+BREAKER_THRESHOLD = 5
+
+
+@dataclass(frozen=True, slots=True)
+class ClimateCapabilities:
+    """What a climate entity accepts, read from its state attributes."""
+
+    single_target: bool
+    range_target: bool
+    min_temp: float | None
+    max_temp: float | None
+    step: float
+
+    @classmethod
+    def from_state(cls, state: State) -> ClimateCapabilities:
+        """Discover capabilities from a climate state."""
+        attributes = state.attributes
+        features = ClimateEntityFeature(attributes.get(ATTR_SUPPORTED_FEATURES, 0))
+        return cls(
+            single_target=ClimateEntityFeature.TARGET_TEMPERATURE in features,
+            range_target=ClimateEntityFeature.TARGET_TEMPERATURE_RANGE in features,
+            min_temp=attributes.get(ATTR_MIN_TEMP),
+            max_temp=attributes.get(ATTR_MAX_TEMP),
+            step=attributes.get(ATTR_TARGET_TEMP_STEP) or DEFAULT_TEMP_STEP,
+        )
+
+    def adapt(self, target: float) -> float:
+        """Round a target to the device step and clamp it to its limits."""
+        value = round(target / self.step) * self.step
+        if self.min_temp is not None:
+            value = max(value, self.min_temp)
+        if self.max_temp is not None:
+            value = min(value, self.max_temp)
+        return round(value, 2)
+
+
+class ZoneHealth:
+    """Failure state of a single climate entity."""
+
+    __slots__ = ("failures", "retry_at", "unsub_rearm")
+
+    def __init__(self) -> None:
+        """Initialize a healthy zone."""
+        self.failures = 0
+        self.retry_at: datetime | None = None
+        self.unsub_rearm: CALLBACK_TYPE | None = None
+
+    @property
+    def tripped(self) -> bool:
+        """Return True if the breaker stopped commands to this zone."""
+        return self.unsub_rearm is not None
+
+
+class ClimateController:
+    """Send targets to climate entities in a form each entity accepts.
+
+    Capabilities are cached per entity and rediscovered only when the
+    entity's attributes object changes (Home Assistant replaces it on every
+    attribute change) or its registry entry is updated. A call that failed
+    is not repeated until either the payload or the capabilities change.
+
+    Commands go through the domain-wide dispatcher, which rate-limits them
+    per mesh. Unavailable or failing devices are retried with exponential
+    backoff.
+    After BREAKER_THRESHOLD failures the breaker trips: the zone is skipped
+    and a repair issue raised until the entity's next state change.
+    """
+
+    def __init__(self, hass: HomeAssistant, dispatcher: ServiceDispatcher) -> None:
+        """Initialize the controller."""
+        self.hass = hass
+        self.dispatcher = dispatcher
+        # entity_id -> (attributes the capabilities were read from, capabilities)
+        self._capabilities: dict[str, tuple[ReadOnlyDict, ClimateCapabilities]] = {}
+        # entity_id -> payload that failed with the current capabilities
+        self._failed: dict[str, dict[str, Any]] = {}
+        self._health: dict[str, ZoneHealth] = {}
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Drop cached capabilities when a registry entry changes."""
+
+        @callback
+        def registry_updated(event: Event[er.EventEntityRegistryUpdatedData]) -> None:
+            entity_id = event.data["entity_id"]
+            self._capabilities.pop(entity_id, None)
+            self._failed.pop(entity_id, None)
+
+        unsub_registry = self.hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, registry_updated
+        )
+
+        @callback
+        def stop() -> None:
+            unsub_registry()
+            for entity_id, health in self._health.items():
+                if health.unsub_rearm is not None:
+                    # Nothing re-arms the breaker once unloaded, drop its issue
+                    health.unsub_rearm()
+                    ir.async_delete_issue(self.hass, DOMAIN, _issue_id(entity_id))
+            self._health.clear()
+
+        return stop
+
+    def capabilities(self, state: State) -> ClimateCapabilities:
+        """Return the cached capabilities of a climate entity."""
+        cached = self._capabilities.get(state.entity_id)
+        if cached is not None and cached[0] is state.attributes:
+            return cached[1]
+
+        capabilities = ClimateCapabilities.from_state(state)
+        if cached is not None and cached[1] != capabilities:
+            # The device changed, give previously failing payloads a chance
+            self._failed.pop(state.entity_id, None)
+        self._capabilities[state.entity_id] = (state.attributes, capabilities)
+        return capabilities
+
+    def payload(self, state: State, target: float) -> dict[str, Any] | None:
+        """Return the set_temperature data for a target, or None to skip."""
+        if state.state == HVACMode.OFF:
+            # Switched off by the user; setting a target could turn it on
+            return None
+
+        capabilities = self.capabilities(state)
+        value = capabilities.adapt(target)
+        attributes = state.attributes
+
+        # Devices in a dual setpoint mode only take a low/high range
+        use_range = capabilities.range_target and (
+            state.state in (HVACMode.HEAT_COOL, HVACMode.AUTO)
+            or not capabilities.single_target
+        )
+        if use_range:
+            current = attributes.get(ATTR_TARGET_TEMP_LOW)
+            high = attributes.get(ATTR_TARGET_TEMP_HIGH)
+            high = max(high if high is not None else value, value + capabilities.step)
+            payload = {
+                ATTR_TARGET_TEMP_LOW: value,
+                ATTR_TARGET_TEMP_HIGH: capabilities.adapt(high),
+            }
+        elif capabilities.single_target:
+            current = attributes.get(ATTR_TEMPERATURE)
+            payload = {ATTR_TEMPERATURE: value}
+        else:
+            return None
+
+        if current is not None and abs(current - value) < MIN_TEMP_CHANGE:
+            return None
+        return payload
+
+    @callback
+    def async_set_target(
+        self, entity_id: str, target: float, priority: int = PRIORITY_NORMAL
+    ) -> bool:
+        """Queue a target for a climate entity; return True if a call was queued.
+
+        The command is not waited for. Its outcome updates the zone's health
+        once the dispatcher has sent it.
+        """
+        health = self._health.setdefault(entity_id, ZoneHealth())
+        now = dt_util.utcnow()
+        if health.tripped or (health.retry_at is not None and now < health.retry_at):
+            return False
+
+        state = self.hass.states.get(entity_id)
+        if not state or state.state == STATE_UNAVAILABLE:
+            self._record_failure(entity_id, health, now, "entity is unavailable")
+            return False
+
+        payload = self.payload(state, target)
+        if payload is None or self._failed.get(entity_id) == payload:
+            self._record_success(entity_id, health)
+            return False
+
+        future = self.dispatcher.async_enqueue(
+            entity_id,
+            CLIMATE_DOMAIN,
+            SERVICE_SET_TEMPERATURE,
+            {ATTR_ENTITY_ID: entity_id, **payload},
+            priority,
+        )
+        future.add_done_callback(
+            partial(self._async_command_done, entity_id, payload, health)
+        )
+        return True
+
+    @callback
+    def _async_command_done(
+        self,
+        entity_id: str,
+        payload: dict[str, Any],
+        health: ZoneHealth,
+        future: asyncio.Future[bool],
+    ) -> None:
+        """Record the outcome of a command the dispatcher has finished."""
+        if future.cancelled():
+            return
+        if (err := future.exception()) is not None:
+            if isinstance(err, (ServiceValidationError, vol.Invalid)):
+                # The device rejected this payload; it is reachable, so this
+                # is not a health problem, just don't send the same thing again
+                _LOGGER.warning(
+                    "Could not set %s to %s, not retrying until it changes: %s",
+                    entity_id,
+                    payload,
+                    err,
+                )
+                self._failed[entity_id] = payload
+            elif isinstance(err, (HomeAssistantError, TimeoutError)):
+                self._record_failure(
+                    entity_id, health, dt_util.utcnow(), str(err) or "timed out"
+                )
+            else:
+                _LOGGER.error(
+                    "Unexpected error updating %s", entity_id, exc_info=err
+                )
+            return
+        if not future.result():
+            # A newer target replaced this one before it was sent
+            return
+
+        self._failed.pop(entity_id, None)
+        self._record_success(entity_id, health)
+        _LOGGER.info("Set %s to %s", entity_id, payload)
+
+    def _record_success(self, entity_id: str, health: ZoneHealth) -> None:
+        """Reset the failure count of a zone."""
+        if health.failures:
+            _LOGGER.info("Climate entity %s is responding again", entity_id)
+        health.failures = 0
+        health.retry_at = None
+
+    def _record_failure(
+        self, entity_id: str, health: ZoneHealth, now: datetime, reason: str
+    ) -> None:
+        """Back off from a failing zone and trip the breaker if it keeps failing."""
+        health.failures += 1
+        if health.failures >= BREAKER_THRESHOLD:
+            self._trip(entity_id, health, reason)
+            return
+
+        delay = min(BACKOFF_BASE * 2 ** (health.failures - 1), BACKOFF_MAX)
+        health.retry_at = now + delay
+        # Only the first failure is worth a warning, the rest are expected
+        log = _LOGGER.warning if health.failures == 1 else _LOGGER.debug
+        log("Climate entity %s failed (%s), retrying in %s", entity_id, reason, delay)
+
+    def _trip(self, entity_id: str, health: ZoneHealth, reason: str) -> None:
+        """Stop commanding a dead zone until its entity changes state."""
+        _LOGGER.warning(
+            "Climate entity %s failed %d times in a row (%s); pausing it until "
+            "it changes state",
+            entity_id,
+            health.failures,
+            reason,
+        )
+
+        @callback
+        def rearm(event: Event[EventStateChangedData]) -> None:
+            new_state = event.data["new_state"]
+            if new_state is None or new_state.state == STATE_UNAVAILABLE:
+                return
+            if health.unsub_rearm is not None:
+                health.unsub_rearm()
+                health.unsub_rearm = None
+            health.failures = 0
+            health.retry_at = None
+            ir.async_delete_issue(self.hass, DOMAIN, _issue_id(entity_id))
+            _LOGGER.info("Climate entity %s changed state, resuming", entity_id)
+
+        health.unsub_rearm = async_track_state_change_event(
+            self.hass, [entity_id], rearm
+        )
+        ir.async_create_issue(
+            self.hass,
+            DOMAIN,
+            _issue_id(entity_id),
+            is_fixable=False,
+            severity=ir.IssueSeverity.WARNING,
+            translation_key="zone_unavailable",
+            translation_placeholders={"entity_id": entity_id, "reason": reason},
+        )
+
+
+def _issue_id(entity_id: str) -> str:
+    """Return the repair issue id of an unavailable zone."""
+    return f"zone_unavailable_{entity_id}"
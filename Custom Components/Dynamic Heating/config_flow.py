@@ -1,304 +1,843 @@
-“”“Config flow for Dynamic Heating Scheduler.”””
-from **future** import annotations
+"""Config flow for Dynamic Heating Scheduler."""
+from __future__ import annotations
 
 import logging
+from datetime import datetime, timedelta
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_NAME
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, State, callback
 from homeassistant.helpers import selector
 from homeassistant.helpers.selector import (
-EntitySelector,
-EntitySelectorConfig,
-NumberSelector,
-NumberSelectorConfig,
-NumberSelectorMode,
-SelectSelector,
-SelectSelectorConfig,
-SelectSelectorMode,
-TimeSelector,
+    EntitySelector,
+    EntitySelectorConfig,
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
+    TextSelector,
+    TimeSelector,
 )
+from homeassistant.util import dt as dt_util
 
 from .const import (
-CONF_COMFORT_END,
-CONF_COMFORT_START,
-CONF_COMFORT_TEMP,
-CONF_ENABLE_COP_OPTIMIZATION,
-CONF_HOME_AWAY_SENSOR,
-CONF_OUTDOOR_TEMP_SENSOR,
-CONF_OUTDOOR_TEMP_THRESHOLD,
-CONF_PRICE_SENSOR,
-CONF_TEMP_AWAY,
-CONF_TEMP_BOOST,
-CONF_TEMP_MAX,
-CONF_TEMP_MIN,
-CONF_TEMP_NORMAL,
-CONF_TEMP_SETBACK,
-CONF_ZONE_CLIMATE,
-CONF_ZONE_NAME,
-CONF_ZONES,
-DEFAULT_COMFORT_END,
-DEFAULT_COMFORT_START,
-DEFAULT_COMFORT_TEMP,
-DEFAULT_ENABLE_COP_OPTIMIZATION,
-DEFAULT_OUTDOOR_TEMP_THRESHOLD,
-DEFAULT_TEMP_AWAY,
-DEFAULT_TEMP_BOOST,
-DEFAULT_TEMP_MAX,
-DEFAULT_TEMP_MIN,
-DEFAULT_TEMP_NORMAL,
-DEFAULT_TEMP_SETBACK,
-DOMAIN,
+    CONF_BOILER_EFFICIENCY,
+    CONF_BOILER_SWITCH,
+    CONF_CO2_SENSOR,
+    CONF_CO2_WEIGHT,
+    CONF_COMFORT_END,
+    CONF_COMFORT_START,
+    CONF_COMFORT_TEMP,
+    CONF_COP_CURVE,
+    CONF_DIRECT_HEATER_SWITCH,
+    CONF_ENABLE_COP_OPTIMIZATION,
+    CONF_ENABLE_MPC,
+    CONF_ENABLE_PRESENCE_PREDICTION,
+    CONF_ENABLE_PRICE_FORECAST,
+    CONF_EXPOSE_PLAN_ATTRIBUTE,
+    CONF_FALLBACK_PRICE_SENSORS,
+    CONF_FLEX_SENSOR,
+    CONF_FLEX_WEIGHT,
+    CONF_FUEL_PRICE,
+    CONF_FUEL_PRICE_SENSOR,
+    CONF_GRID_TARIFF,
+    CONF_GROUP_NAME,
+    CONF_GROUP_PARENT,
+    CONF_GROUP_ZONES,
+    CONF_HEAT_PUMP_SWITCH,
+    CONF_HOME_AWAY_SENSOR,
+    CONF_MPC_HEAT_RATE,
+    CONF_MPC_TIME_CONSTANT,
+    CONF_OUTDOOR_TEMP_SENSOR,
+    CONF_OUTDOOR_TEMP_THRESHOLD,
+    CONF_PLANNING_HORIZON,
+    CONF_PREHEAT_TIME,
+    CONF_PRICE_SENSOR,
+    CONF_RAMP_LOOKAHEAD,
+    CONF_RAMP_RATE,
+    CONF_SOLAR_SURPLUS_SENSOR,
+    CONF_SOLAR_SURPLUS_WEIGHT,
+    CONF_SURCHARGE,
+    CONF_TEMP_AWAY,
+    CONF_TEMP_BOOST,
+    CONF_TEMP_MAX,
+    CONF_TEMP_MIN,
+    CONF_TEMP_NORMAL,
+    CONF_TEMP_SETBACK,
+    CONF_TIER_COUNT,
+    CONF_TIER_METHOD,
+    CONF_TIER_OFFSETS,
+    CONF_VAT,
+    CONF_ZONE_CHARGE_TEMP,
+    CONF_ZONE_CLIMATE,
+    CONF_ZONE_DEADLINE,
+    CONF_ZONE_ENERGY,
+    CONF_ZONE_GROUPS,
+    CONF_ZONE_HEATER_POWER,
+    CONF_ZONE_IDLE_TEMP,
+    CONF_ZONE_LOAD,
+    CONF_ZONE_NAME,
+    CONF_ZONE_POWER_SENSOR,
+    CONF_ZONES,
+    DEFAULT_BOILER_EFFICIENCY,
+    DEFAULT_CO2_WEIGHT,
+    DEFAULT_COMFORT_END,
+    DEFAULT_COMFORT_START,
+    DEFAULT_COMFORT_TEMP,
+    DEFAULT_ENABLE_COP_OPTIMIZATION,
+    DEFAULT_ENABLE_MPC,
+    DEFAULT_ENABLE_PRESENCE_PREDICTION,
+    DEFAULT_ENABLE_PRICE_FORECAST,
+    DEFAULT_EXPOSE_PLAN_ATTRIBUTE,
+    DEFAULT_FLEX_WEIGHT,
+    DEFAULT_FUEL_PRICE,
+    DEFAULT_MPC_HEAT_RATE,
+    DEFAULT_MPC_TIME_CONSTANT,
+    DEFAULT_OUTDOOR_TEMP_THRESHOLD,
+    DEFAULT_PLANNING_HORIZON,
+    DEFAULT_PREHEAT_TIME,
+    DEFAULT_RAMP_LOOKAHEAD,
+    DEFAULT_RAMP_RATE,
+    DEFAULT_SOLAR_SURPLUS_WEIGHT,
+    DEFAULT_SURCHARGE,
+    DEFAULT_TEMP_AWAY,
+    DEFAULT_TEMP_BOOST,
+    DEFAULT_TEMP_MAX,
+    DEFAULT_TEMP_MIN,
+    DEFAULT_TEMP_NORMAL,
+    DEFAULT_TEMP_SETBACK,
+    DEFAULT_TIER_COUNT,
+    DEFAULT_TIER_METHOD,
+    DEFAULT_VAT,
+    DEFAULT_ZONE_CHARGE_TEMP,
+    DEFAULT_ZONE_DEADLINE,
+    DEFAULT_ZONE_IDLE_TEMP,
+    DOMAIN,
+    MAX_PLANNING_HORIZON,
+    TIER_METHOD_QUANTILE,
+    TIER_METHOD_RANGE,
 )
+from .heat_source import parse_cop_curve
+from .planner import EMPTY_INPUTS, calculate_plan, price_statistics
+from .price_parser import PriceParser
+from .price_series import PriceSeries, normalize_prices
+from .tariff import parse_grid_tariff
+from .tiers import MAX_TIER_COUNT, MIN_TIER_COUNT, tier_offsets
+from .zone_groups import validate_groups
 
-_LOGGER = logging.getLogger(**name**)
+_LOGGER = logging.getLogger(__name__)
+
+class PriceProbe:
+    """Result of parsing the chosen price sensor once during setup."""
+
+    # Slots shown in the tier preview
+    PREVIEW_SLOTS = 8
+
+    def __init__(self, state: State, price_format: str | None, series: PriceSeries) -> None:
+        """Initialize the probe result."""
+        self.entity_id = state.entity_id
+        self.last_updated = state.last_updated
+        self.format = price_format
+        self.series = series
+
+    @classmethod
+    async def async_run(cls, hass: HomeAssistant, state: State) -> PriceProbe:
+        """Parse a price sensor and normalize what it publishes."""
+        parser = PriceParser(hass)
+        raw_prices = await parser.parse_price_sensor(state)
+        series = normalize_prices(
+            raw_prices, dt_util.now(), timedelta(hours=MAX_PLANNING_HORIZON)
+        )
+        return cls(state, parser.last_format, series)
+
+    @property
+    def horizon_hours(self) -> float:
+        """Return how far ahead the sensor publishes prices."""
+        if not self.series.slots:
+            return 0.0
+        end = self.series.slots[-1]["hour"] + self.series.resolution
+        return (end - dt_util.now()).total_seconds() / 3600
+
+    def preview(self) -> str:
+        """Return the first slots with their tiers, one per line."""
+        slots = [
+            {**slot, "spot_price": slot["price"]}
+            for slot in self.series.slots[: self.PREVIEW_SLOTS]
+        ]
+        stats = price_statistics(
+            [{"price": slot["price"]} for slot in self.series.slots]
+        )
+        plan = calculate_plan(slots, stats, EMPTY_INPUTS, {})
+        return "\n".join(
+            f"- {datetime.fromisoformat(key).strftime('%H:%M')}: "
+            f"{entry['price']:.4f} ({entry['tier']})"
+            for key, entry in plan.items()
+        )
 
 class DynamicHeatingConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
-“”“Handle a config flow for Dynamic Heating Scheduler.”””
-
-```
-VERSION = 1
-
-def __init__(self):
-    """Initialize the config flow."""
-    self._zones = []
-    self._current_zone = {}
-    self._base_config = {}
-
-async def async_step_user(
-    self, user_input: dict[str, Any] | None = None
-) -> config_entries.FlowResult:
-    """Handle the initial step."""
-    errors = {}
-
-    if user_input is not None:
-        self._base_config = user_input
-        return await self.async_step_global_settings()
-
-    data_schema = vol.Schema(
-        {
-            vol.Required(CONF_NAME, default="Dynamic Heating"): str,
-            vol.Required(CONF_PRICE_SENSOR): EntitySelector(
-                EntitySelectorConfig(domain=["sensor"])
-            ),
-        }
-    )
-
-    return self.async_show_form(
-        step_id="user",
-        data_schema=data_schema,
-        errors=errors,
-    )
-
-async def async_step_global_settings(
-    self, user_input: dict[str, Any] | None = None
-) -> config_entries.FlowResult:
-    """Handle global settings."""
-    errors = {}
-
-    if user_input is not None:
-        self._base_config.update(user_input)
-        return await self.async_step_add_zone()
-
-    data_schema = vol.Schema(
-        {
-            vol.Optional(CONF_OUTDOOR_TEMP_SENSOR): EntitySelector(
-                EntitySelectorConfig(domain=["sensor"])
-            ),
-            vol.Optional(CONF_HOME_AWAY_SENSOR): EntitySelector(
-                EntitySelectorConfig(domain=["binary_sensor", "input_boolean"])
-            ),
-            vol.Required(
-                CONF_TEMP_BOOST, default=DEFAULT_TEMP_BOOST
-            ): NumberSelector(
-                NumberSelectorConfig(
-                    min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
-                )
-            ),
-            vol.Required(
-                CONF_TEMP_NORMAL, default=DEFAULT_TEMP_NORMAL
-            ): NumberSelector(
-                NumberSelectorConfig(
-                    min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
-                )
-            ),
-            vol.Required(
-                CONF_TEMP_SETBACK, default=DEFAULT_TEMP_SETBACK
-            ): NumberSelector(
-                NumberSelectorConfig(
-                    min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
-                )
-            ),
-            vol.Required(
-                CONF_TEMP_AWAY, default=DEFAULT_TEMP_AWAY
-            ): NumberSelector(
-                NumberSelectorConfig(
-                    min=10, max=25, step=0.5, mode=NumberSelectorMode.SLIDER
-                )
-            ),
-            vol.Required(CONF_TEMP_MIN, default=DEFAULT_TEMP_MIN): NumberSelector(
-                NumberSelectorConfig(
-                    min=10, max=20, step=0.5, mode=NumberSelectorMode.SLIDER
+    """Handle a config flow for Dynamic Heating Scheduler."""
+
+    VERSION = 1
+
+    def __init__(self):
+        """Initialize the config flow."""
+        self._zones = []
+        self._current_zone = {}
+        self._base_config = {}
+        self._probe: PriceProbe | None = None
+
+    async def async_step_user(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Handle the initial step."""
+        errors = {}
+
+        if user_input is not None:
+            price_sensor = user_input[CONF_PRICE_SENSOR]
+            state = self.hass.states.get(price_sensor)
+            if state is None:
+                errors[CONF_PRICE_SENSOR] = "sensor_not_found"
+            else:
+                # Parse once; later steps read the cached probe
+                if (
+                    self._probe is None
+                    or self._probe.entity_id != price_sensor
+                    or self._probe.last_updated != state.last_updated
+                ):
+                    self._probe = await PriceProbe.async_run(self.hass, state)
+                if not self._probe.series.slots:
+                    errors[CONF_PRICE_SENSOR] = "no_price_data"
+                else:
+                    self._base_config = user_input
+                    return await self.async_step_preview()
+
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_NAME, default="Dynamic Heating"): str,
+                vol.Required(CONF_PRICE_SENSOR): EntitySelector(
+                    EntitySelectorConfig(domain=["sensor"])
+                ),
+                vol.Optional(CONF_FALLBACK_PRICE_SENSORS): EntitySelector(
+                    EntitySelectorConfig(domain=["sensor"], multiple=True)
+                ),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="user",
+            data_schema=data_schema,
+            errors=errors,
+        )
+
+    async def async_step_preview(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Show what was read from the price sensor before continuing."""
+        if user_input is not None:
+            return await self.async_step_global_settings()
+
+        probe = self._probe
+        return self.async_show_form(
+            step_id="preview",
+            data_schema=vol.Schema({}),
+            description_placeholders={
+                "format": probe.format or "unknown",
+                "resolution": str(int(probe.series.resolution.total_seconds() // 60)),
+                "horizon": f"{probe.horizon_hours:.1f}",
+                "quality": f"{probe.series.quality:.0%}",
+                "preview": probe.preview(),
+            },
+        )
+
+    async def async_step_global_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Handle global settings."""
+        errors = {}
+
+        if user_input is not None:
+            try:
+                parse_grid_tariff(user_input.get(CONF_GRID_TARIFF))
+            except ValueError:
+                errors[CONF_GRID_TARIFF] = "invalid_tariff"
+            try:
+                tier_offsets(
+                    int(user_input.get(CONF_TIER_COUNT, DEFAULT_TIER_COUNT)),
+                    user_input.get(CONF_TIER_OFFSETS),
+                    user_input,
                 )
-            ),
-            vol.Required(CONF_TEMP_MAX, default=DEFAULT_TEMP_MAX): NumberSelector(
-                NumberSelectorConfig(
-                    min=20, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
+            except ValueError:
+                errors[CONF_TIER_OFFSETS] = "invalid_tier_offsets"
+            try:
+                parse_cop_curve(user_input.get(CONF_COP_CURVE))
+            except ValueError:
+                errors[CONF_COP_CURVE] = "invalid_cop_curve"
+            if not errors:
+                self._base_config.update(user_input)
+                return await self.async_step_add_zone()
+
+        data_schema = vol.Schema(
+            {
+                vol.Optional(CONF_OUTDOOR_TEMP_SENSOR): EntitySelector(
+                    EntitySelectorConfig(domain=["sensor"])
+                ),
+                vol.Optional(CONF_HOME_AWAY_SENSOR): EntitySelector(
+                    EntitySelectorConfig(domain=["binary_sensor", "input_boolean"])
+                ),
+                vol.Required(
+                    CONF_TEMP_BOOST, default=DEFAULT_TEMP_BOOST
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+                vol.Required(
+                    CONF_TEMP_NORMAL, default=DEFAULT_TEMP_NORMAL
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+                vol.Required(
+                    CONF_TEMP_SETBACK, default=DEFAULT_TEMP_SETBACK
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+                vol.Required(
+                    CONF_TEMP_AWAY, default=DEFAULT_TEMP_AWAY
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=10, max=25, step=0.5, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+                vol.Required(CONF_TEMP_MIN, default=DEFAULT_TEMP_MIN): NumberSelector(
+                    NumberSelectorConfig(
+                        min=10, max=20, step=0.5, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+                vol.Required(CONF_TEMP_MAX, default=DEFAULT_TEMP_MAX): NumberSelector(
+                    NumberSelectorConfig(
+                        min=20, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+                vol.Required(
+                    CONF_COMFORT_START, default=DEFAULT_COMFORT_START
+                ): TimeSelector(),
+                vol.Required(
+                    CONF_COMFORT_END, default=DEFAULT_COMFORT_END
+                ): TimeSelector(),
+                vol.Required(
+                    CONF_COMFORT_TEMP, default=DEFAULT_COMFORT_TEMP
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+                vol.Required(
+                    CONF_ENABLE_COP_OPTIMIZATION, default=DEFAULT_ENABLE_COP_OPTIMIZATION
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_OUTDOOR_TEMP_THRESHOLD, default=DEFAULT_OUTDOOR_TEMP_THRESHOLD
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=-20, max=10, step=1, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+                vol.Required(
+                    CONF_PLANNING_HORIZON, default=DEFAULT_PLANNING_HORIZON
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=1,
+                        max=MAX_PLANNING_HORIZON,
+                        step=1,
+                        mode=NumberSelectorMode.SLIDER,
+                    )
+                ),
+                vol.Required(
+                    CONF_TIER_METHOD, default=DEFAULT_TIER_METHOD
+                ): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[TIER_METHOD_RANGE, TIER_METHOD_QUANTILE],
+                        mode=SelectSelectorMode.DROPDOWN,
+                        translation_key=CONF_TIER_METHOD,
+                    )
+                ),
+                vol.Required(CONF_TIER_COUNT, default=DEFAULT_TIER_COUNT): NumberSelector(
+                    NumberSelectorConfig(
+                        min=MIN_TIER_COUNT,
+                        max=MAX_TIER_COUNT,
+                        step=1,
+                        mode=NumberSelectorMode.SLIDER,
+                    )
+                ),
+                vol.Optional(CONF_TIER_OFFSETS): TextSelector(),
+                vol.Required(CONF_RAMP_RATE, default=DEFAULT_RAMP_RATE): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=5, step=0.25, mode=NumberSelectorMode.SLIDER,
+                        unit_of_measurement="°C/h",
+                    )
+                ),
+                vol.Required(
+                    CONF_RAMP_LOOKAHEAD, default=DEFAULT_RAMP_LOOKAHEAD
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=12, step=1, mode=NumberSelectorMode.SLIDER,
+                        unit_of_measurement="h",
+                    )
+                ),
+                vol.Required(
+                    CONF_ENABLE_MPC, default=DEFAULT_ENABLE_MPC
+                ): selector.BooleanSelector(),
+                vol.Required(
+                    CONF_MPC_TIME_CONSTANT, default=DEFAULT_MPC_TIME_CONSTANT
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=5, max=200, step=5, mode=NumberSelectorMode.SLIDER,
+                        unit_of_measurement="h",
+                    )
+                ),
+                vol.Required(
+                    CONF_MPC_HEAT_RATE, default=DEFAULT_MPC_HEAT_RATE
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0.25, max=5, step=0.25, mode=NumberSelectorMode.SLIDER,
+                        unit_of_measurement="°C/h",
+                    )
+                ),
+                vol.Required(
+                    CONF_ENABLE_PRICE_FORECAST,
+                    default=DEFAULT_ENABLE_PRICE_FORECAST,
+                ): selector.BooleanSelector(),
+                vol.Required(
+                    CONF_EXPOSE_PLAN_ATTRIBUTE,
+                    default=DEFAULT_EXPOSE_PLAN_ATTRIBUTE,
+                ): selector.BooleanSelector(),
+                vol.Required(
+                    CONF_ENABLE_PRESENCE_PREDICTION,
+                    default=DEFAULT_ENABLE_PRESENCE_PREDICTION,
+                ): selector.BooleanSelector(),
+                vol.Required(
+                    CONF_PREHEAT_TIME, default=DEFAULT_PREHEAT_TIME
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=240, step=15, mode=NumberSelectorMode.SLIDER,
+                        unit_of_measurement="min",
+                    )
+                ),
+                vol.Optional(CONF_CO2_SENSOR): EntitySelector(
+                    EntitySelectorConfig(domain=["sensor"])
+                ),
+                vol.Optional(CONF_CO2_WEIGHT, default=DEFAULT_CO2_WEIGHT): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=0.01, step="any", mode=NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(CONF_FLEX_SENSOR): EntitySelector(
+                    EntitySelectorConfig(domain=["sensor", "binary_sensor"])
+                ),
+                vol.Optional(CONF_FLEX_WEIGHT, default=DEFAULT_FLEX_WEIGHT): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=10, step=0.01, mode=NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(CONF_SOLAR_SURPLUS_SENSOR): EntitySelector(
+                    EntitySelectorConfig(domain=["sensor"])
+                ),
+                vol.Optional(
+                    CONF_SOLAR_SURPLUS_WEIGHT, default=DEFAULT_SOLAR_SURPLUS_WEIGHT
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=10, step=0.01, mode=NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(CONF_HEAT_PUMP_SWITCH): EntitySelector(
+                    EntitySelectorConfig(domain=["switch", "input_boolean"])
+                ),
+                vol.Optional(CONF_BOILER_SWITCH): EntitySelector(
+                    EntitySelectorConfig(domain=["switch", "input_boolean"])
+                ),
+                vol.Optional(CONF_DIRECT_HEATER_SWITCH): EntitySelector(
+                    EntitySelectorConfig(domain=["switch", "input_boolean"])
+                ),
+                vol.Optional(CONF_FUEL_PRICE, default=DEFAULT_FUEL_PRICE): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=10, step=0.001, mode=NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(CONF_FUEL_PRICE_SENSOR): EntitySelector(
+                    EntitySelectorConfig(domain=["sensor", "input_number"])
+                ),
+                vol.Optional(
+                    CONF_BOILER_EFFICIENCY, default=DEFAULT_BOILER_EFFICIENCY
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=50, max=110, step=1, mode=NumberSelectorMode.BOX,
+                        unit_of_measurement="%",
+                    )
+                ),
+                vol.Optional(CONF_COP_CURVE): TextSelector(),
+                vol.Optional(CONF_GRID_TARIFF): TextSelector(),
+                vol.Optional(CONF_SURCHARGE, default=DEFAULT_SURCHARGE): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=10, step=0.001, mode=NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(CONF_VAT, default=DEFAULT_VAT): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=50, step=0.5, mode=NumberSelectorMode.BOX
+                    )
+                ),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="global_settings",
+            data_schema=data_schema,
+            errors=errors,
+        )
+
+    async def async_step_add_zone(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Handle adding a heating zone."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input.get("add_another"):
+                self._zones.append(self._current_zone.copy())
+                self._current_zone = {}
+                return await self.async_step_zone_config()
+            else:
+                if self._current_zone:
+                    self._zones.append(self._current_zone.copy())
+
+                # Create the config entry
+                self._base_config[CONF_ZONES] = self._zones
+
+                return self.async_create_entry(
+                    title=self._base_config[CONF_NAME],
+                    data=self._base_config,
                 )
+
+        if not self._zones and not self._current_zone:
+            return await self.async_step_zone_config()
+
+        data_schema = vol.Schema(
+            {
+                vol.Required("add_another", default=True): selector.BooleanSelector(),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="add_zone",
+            data_schema=data_schema,
+            errors=errors,
+            description_placeholders={
+                "zone_count": str(len(self._zones) + (1 if self._current_zone else 0))
+            },
+        )
+
+    async def async_step_zone_config(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Configure a heating zone."""
+        errors = {}
+
+        if user_input is not None:
+            # A zone is either a thermostat or a storage load that needs
+            # energy by a deadline
+            climate = user_input.get(CONF_ZONE_CLIMATE)
+            load = user_input.get(CONF_ZONE_LOAD)
+            if bool(climate) == bool(load):
+                errors["base"] = "zone_entity_required"
+            elif load and not (
+                user_input.get(CONF_ZONE_HEATER_POWER)
+                and user_input.get(CONF_ZONE_ENERGY)
+            ):
+                errors["base"] = "load_needs_power_and_energy"
+            else:
+                self._current_zone = user_input
+                return await self.async_step_add_zone()
+
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_ZONE_NAME): str,
+                vol.Optional(CONF_ZONE_CLIMATE): EntitySelector(
+                    EntitySelectorConfig(domain=["climate"])
+                ),
+                vol.Optional(CONF_ZONE_POWER_SENSOR): EntitySelector(
+                    EntitySelectorConfig(domain=["sensor"], device_class="power")
+                ),
+                vol.Optional(CONF_ZONE_HEATER_POWER): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=50, step=0.1, mode=NumberSelectorMode.BOX,
+                        unit_of_measurement="kW",
+                    )
+                ),
+                vol.Optional(CONF_ZONE_LOAD): EntitySelector(
+                    EntitySelectorConfig(
+                        domain=["water_heater", "switch", "input_boolean"]
+                    )
+                ),
+                vol.Optional(CONF_ZONE_ENERGY): NumberSelector(
+                    NumberSelectorConfig(
+                        min=0, max=100, step=0.1, mode=NumberSelectorMode.BOX,
+                        unit_of_measurement="kWh",
+                    )
+                ),
+                vol.Optional(
+                    CONF_ZONE_DEADLINE, default=DEFAULT_ZONE_DEADLINE
+                ): TimeSelector(),
+                vol.Optional(
+                    CONF_ZONE_CHARGE_TEMP, default=DEFAULT_ZONE_CHARGE_TEMP
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=30, max=90, step=1, mode=NumberSelectorMode.BOX,
+                        unit_of_measurement="°C",
+                    )
+                ),
+                vol.Optional(
+                    CONF_ZONE_IDLE_TEMP, default=DEFAULT_ZONE_IDLE_TEMP
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=10, max=90, step=1, mode=NumberSelectorMode.BOX,
+                        unit_of_measurement="°C",
+                    )
+                ),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="zone_config",
+            data_schema=data_schema,
+            errors=errors,
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return DynamicHeatingOptionsFlow(config_entry)
+
+class DynamicHeatingOptionsFlow(config_entries.OptionsFlow):
+    """Handle options flow for Dynamic Heating Scheduler."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+        self._options = dict(config_entry.options)
+        self._groups: list[dict[str, Any]] = [
+            dict(group) for group in self._options.get(CONF_ZONE_GROUPS, [])
+        ]
+        self._group_name: str | None = None
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Manage the options."""
+        menu_options = ["temperatures", "add_group"]
+        if self._groups:
+            menu_options.extend(["select_group", "remove_group"])
+        return self.async_show_menu(step_id="init", menu_options=menu_options)
+
+    async def async_step_temperatures(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Change the temperatures of the whole entry."""
+        if user_input is not None:
+            return self._async_save(user_input)
+
+        config = {**self.config_entry.data, **self._options}
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_TEMP_BOOST,
+                    default=config.get(CONF_TEMP_BOOST, DEFAULT_TEMP_BOOST),
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+                vol.Required(
+                    CONF_TEMP_NORMAL,
+                    default=config.get(CONF_TEMP_NORMAL, DEFAULT_TEMP_NORMAL),
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+                vol.Required(
+                    CONF_TEMP_SETBACK,
+                    default=config.get(CONF_TEMP_SETBACK, DEFAULT_TEMP_SETBACK),
+                ): NumberSelector(
+                    NumberSelectorConfig(
+                        min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
+                    )
+                ),
+            }
+        )
+
+        return self.async_show_form(step_id="temperatures", data_schema=data_schema)
+
+    async def async_step_add_group(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Add a zone group."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_GROUP_NAME] in self._group_names():
+                errors[CONF_GROUP_NAME] = "group_exists"
+            else:
+                groups = [*self._groups, user_input]
+                if not (errors := self._validate_groups(groups)):
+                    return self._async_save({CONF_ZONE_GROUPS: groups})
+
+        return self.async_show_form(
+            step_id="add_group",
+            data_schema=self.add_suggested_values_to_schema(
+                self._group_schema(None), user_input or {}
             ),
-            vol.Required(
-                CONF_COMFORT_START, default=DEFAULT_COMFORT_START
-            ): TimeSelector(),
-            vol.Required(
-                CONF_COMFORT_END, default=DEFAULT_COMFORT_END
-            ): TimeSelector(),
-            vol.Required(
-                CONF_COMFORT_TEMP, default=DEFAULT_COMFORT_TEMP
-            ): NumberSelector(
-                NumberSelectorConfig(
-                    min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
-                )
+            errors=errors,
+        )
+
+    async def async_step_select_group(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Choose the zone group to edit."""
+        if user_input is not None:
+            self._group_name = user_input[CONF_GROUP_NAME]
+            return await self.async_step_edit_group()
+
+        return self.async_show_form(
+            step_id="select_group",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_GROUP_NAME): self._group_selector(self._group_names())}
             ),
-            vol.Required(
-                CONF_ENABLE_COP_OPTIMIZATION, default=DEFAULT_ENABLE_COP_OPTIMIZATION
-            ): selector.BooleanSelector(),
-            vol.Optional(
-                CONF_OUTDOOR_TEMP_THRESHOLD, default=DEFAULT_OUTDOOR_TEMP_THRESHOLD
-            ): NumberSelector(
-                NumberSelectorConfig(
-                    min=-20, max=10, step=1, mode=NumberSelectorMode.SLIDER
-                )
+        )
+
+    async def async_step_edit_group(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Edit a zone group; cleared settings are inherited again."""
+        errors = {}
+        current = next(
+            group for group in self._groups if group[CONF_GROUP_NAME] == self._group_name
+        )
+
+        if user_input is not None:
+            # Fields left empty are not submitted, so build the group afresh
+            edited = {CONF_GROUP_NAME: self._group_name, **user_input}
+            groups = [edited if group is current else group for group in self._groups]
+            if not (errors := self._validate_groups(groups)):
+                return self._async_save({CONF_ZONE_GROUPS: groups})
+
+        return self.async_show_form(
+            step_id="edit_group",
+            data_schema=self.add_suggested_values_to_schema(
+                self._group_schema(self._group_name), user_input or current
             ),
-        }
-    )
-
-    return self.async_show_form(
-        step_id="global_settings",
-        data_schema=data_schema,
-        errors=errors,
-    )
-
-async def async_step_add_zone(
-    self, user_input: dict[str, Any] | None = None
-) -> config_entries.FlowResult:
-    """Handle adding a heating zone."""
-    errors = {}
-
-    if user_input is not None:
-        if user_input.get("add_another"):
-            self._zones.append(self._current_zone.copy())
-            self._current_zone = {}
-            return await self.async_step_zone_config()
-        else:
-            if self._current_zone:
-                self._zones.append(self._current_zone.copy())
-            
-            # Create the config entry
-            self._base_config[CONF_ZONES] = self._zones
-            
-            return self.async_create_entry(
-                title=self._base_config[CONF_NAME],
-                data=self._base_config,
+            errors=errors,
+            description_placeholders={"group_name": self._group_name},
+        )
+
+    async def async_step_remove_group(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Remove a zone group; groups inside it move up a level."""
+        if user_input is not None:
+            name = user_input[CONF_GROUP_NAME]
+            removed = next(
+                group for group in self._groups if group[CONF_GROUP_NAME] == name
             )
+            groups = []
+            for group in self._groups:
+                if group is removed:
+                    continue
+                if group.get(CONF_GROUP_PARENT) == name:
+                    group = {**group, CONF_GROUP_PARENT: removed.get(CONF_GROUP_PARENT)}
+                    if group[CONF_GROUP_PARENT] is None:
+                        del group[CONF_GROUP_PARENT]
+                groups.append(group)
+            return self._async_save({CONF_ZONE_GROUPS: groups})
 
-    if not self._zones and not self._current_zone:
-        return await self.async_step_zone_config()
-
-    data_schema = vol.Schema(
-        {
-            vol.Required("add_another", default=True): selector.BooleanSelector(),
-        }
-    )
-
-    return self.async_show_form(
-        step_id="add_zone",
-        data_schema=data_schema,
-        errors=errors,
-        description_placeholders={
-            "zone_count": str(len(self._zones) + (1 if self._current_zone else 0))
-        },
-    )
-
-async def async_step_zone_config(
-    self, user_input: dict[str, Any] | None = None
-) -> config_entries.FlowResult:
-    """Configure a heating zone."""
-    errors = {}
-
-    if user_input is not None:
-        self._current_zone = user_input
-        return await self.async_step_add_zone()
-
-    data_schema = vol.Schema(
-        {
-            vol.Required(CONF_ZONE_NAME): str,
-            vol.Required(CONF_ZONE_CLIMATE): EntitySelector(
-                EntitySelectorConfig(domain=["climate"])
+        return self.async_show_form(
+            step_id="remove_group",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_GROUP_NAME): self._group_selector(self._group_names())}
             ),
-        }
-    )
-
-    return self.async_show_form(
-        step_id="zone_config",
-        data_schema=data_schema,
-        errors=errors,
-    )
-
-@staticmethod
-@callback
-def async_get_options_flow(
-    config_entry: config_entries.ConfigEntry,
-) -> config_entries.OptionsFlow:
-    """Get the options flow for this handler."""
-    return DynamicHeatingOptionsFlow(config_entry)
-```
+        )
 
-class DynamicHeatingOptionsFlow(config_entries.OptionsFlow):
-“”“Handle options flow for Dynamic Heating Scheduler.”””
-
-```
-def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
-    """Initialize options flow."""
-    self.config_entry = config_entry
-
-async def async_step_init(
-    self, user_input: dict[str, Any] | None = None
-) -> config_entries.FlowResult:
-    """Manage the options."""
-    if user_input is not None:
-        return self.async_create_entry(title="", data=user_input)
-
-    data_schema = vol.Schema(
-        {
-            vol.Required(
-                CONF_TEMP_BOOST,
-                default=self.config_entry.data.get(CONF_TEMP_BOOST, DEFAULT_TEMP_BOOST),
-            ): NumberSelector(
-                NumberSelectorConfig(
-                    min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
-                )
-            ),
-            vol.Required(
-                CONF_TEMP_NORMAL,
-                default=self.config_entry.data.get(CONF_TEMP_NORMAL, DEFAULT_TEMP_NORMAL),
-            ): NumberSelector(
-                NumberSelectorConfig(
-                    min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
-                )
-            ),
-            vol.Required(
-                CONF_TEMP_SETBACK,
-                default=self.config_entry.data.get(CONF_TEMP_SETBACK, DEFAULT_TEMP_SETBACK),
-            ): NumberSelector(
+    def _group_names(self) -> list[str]:
+        """Return the names of the configured zone groups."""
+        return [group[CONF_GROUP_NAME] for group in self._groups]
+
+    @staticmethod
+    def _group_selector(names: list[str]) -> SelectSelector:
+        """Return a dropdown of zone group names."""
+        return SelectSelector(
+            SelectSelectorConfig(options=names, mode=SelectSelectorMode.DROPDOWN)
+        )
+
+    def _group_schema(self, name: str | None) -> vol.Schema:
+        """Return the zone group form; name is None when adding a group.
+
+        Every setting is optional: a group only overrides what is filled in
+        and inherits the rest from the group it sits in, or the entry.
+        """
+        zones = [
+            {"value": zone[CONF_ZONE_CLIMATE], "label": zone[CONF_ZONE_NAME]}
+            for zone in self.config_entry.data.get(CONF_ZONES, [])
+            if zone.get(CONF_ZONE_CLIMATE)
+        ]
+        parents = [group for group in self._group_names() if group != name]
+
+        schema: dict[Any, Any] = {}
+        if name is None:
+            schema[vol.Required(CONF_GROUP_NAME)] = str
+        if parents:
+            schema[vol.Optional(CONF_GROUP_PARENT)] = self._group_selector(parents)
+        schema[vol.Optional(CONF_GROUP_ZONES)] = SelectSelector(
+            SelectSelectorConfig(
+                options=zones, multiple=True, mode=SelectSelectorMode.LIST
+            )
+        )
+        for key, minimum, maximum in (
+            (CONF_TEMP_BOOST, 15, 30),
+            (CONF_TEMP_NORMAL, 15, 30),
+            (CONF_TEMP_SETBACK, 15, 30),
+            (CONF_TEMP_AWAY, 10, 25),
+            (CONF_COMFORT_TEMP, 15, 30),
+        ):
+            schema[vol.Optional(key)] = NumberSelector(
                 NumberSelectorConfig(
-                    min=15, max=30, step=0.5, mode=NumberSelectorMode.SLIDER
+                    min=minimum, max=maximum, step=0.5, mode=NumberSelectorMode.BOX,
+                    unit_of_measurement="°C",
                 )
-            ),
-        }
-    )
+            )
+        schema[vol.Optional(CONF_COMFORT_START)] = TimeSelector()
+        schema[vol.Optional(CONF_COMFORT_END)] = TimeSelector()
+        return vol.Schema(schema)
+
+    @staticmethod
+    def _validate_groups(groups: list[dict[str, Any]]) -> dict[str, str]:
+        """Return form errors for a list of zone groups."""
+        try:
+            validate_groups(groups)
+        except ValueError:
+            return {"base": "invalid_zone_groups"}
+        return {}
 
-    return self.async_show_form(step_id="init", data_schema=data_schema)
-```
\ No newline at end of file
+    @callback
+    def _async_save(self, changes: dict[str, Any]) -> config_entries.FlowResult:
+        """Store the options with changes applied; the entry then reloads."""
+        return self.async_create_entry(title="", data={**self._options, **changes})
@@ -1,41 +1,135 @@
-“”“Constants for Dynamic Heating Scheduler.”””
+"""Constants for Dynamic Heating Scheduler."""
 
-DOMAIN = “dynamic_heating”
+DOMAIN = "dynamic_heating"
 
 # Config flow constants
 
-CONF_ZONES = “zones”
-CONF_ZONE_NAME = “zone_name”
-CONF_ZONE_CLIMATE = “zone_climate”
-CONF_PRICE_SENSOR = “price_sensor”
-CONF_OUTDOOR_TEMP_SENSOR = “outdoor_temp_sensor”
-CONF_HOME_AWAY_SENSOR = “home_away_sensor”
+CONF_ZONES = "zones"
+CONF_ZONE_NAME = "zone_name"
+CONF_ZONE_CLIMATE = "zone_climate"
+CONF_ZONE_POWER_SENSOR = "zone_power_sensor"
+CONF_ZONE_HEATER_POWER = "zone_heater_power"
+CONF_PRICE_SENSOR = "price_sensor"
+CONF_FALLBACK_PRICE_SENSORS = "fallback_price_sensors"
+CONF_OUTDOOR_TEMP_SENSOR = "outdoor_temp_sensor"
+CONF_HOME_AWAY_SENSOR = "home_away_sensor"
+
+# Storage loads
+
+CONF_ZONE_LOAD = "zone_load"
+CONF_ZONE_ENERGY = "zone_energy"
+CONF_ZONE_DEADLINE = "zone_deadline"
+CONF_ZONE_CHARGE_TEMP = "zone_charge_temp"
+CONF_ZONE_IDLE_TEMP = "zone_idle_temp"
+
+# Zone groups
+
+CONF_ZONE_GROUPS = "zone_groups"
+CONF_GROUP_NAME = "group_name"
+CONF_GROUP_PARENT = "group_parent"
+CONF_GROUP_ZONES = "group_zones"
 
 # Temperature settings
 
-CONF_TEMP_BOOST = “temp_boost”
-CONF_TEMP_NORMAL = “temp_normal”
-CONF_TEMP_SETBACK = “temp_setback”
-CONF_TEMP_AWAY = “temp_away”
-CONF_TEMP_MIN = “temp_min”
-CONF_TEMP_MAX = “temp_max”
+CONF_TEMP_BOOST = "temp_boost"
+CONF_TEMP_NORMAL = "temp_normal"
+CONF_TEMP_SETBACK = "temp_setback"
+CONF_TEMP_AWAY = "temp_away"
+CONF_TEMP_MIN = "temp_min"
+CONF_TEMP_MAX = "temp_max"
 
 # Comfort hours
 
-CONF_COMFORT_START = “comfort_start”
-CONF_COMFORT_END = “comfort_end”
-CONF_COMFORT_TEMP = “comfort_temp”
+CONF_COMFORT_START = "comfort_start"
+CONF_COMFORT_END = "comfort_end"
+CONF_COMFORT_TEMP = "comfort_temp"
 
 # COP optimization
 
-CONF_OUTDOOR_TEMP_THRESHOLD = “outdoor_temp_threshold”
-CONF_ENABLE_COP_OPTIMIZATION = “enable_cop_optimization”
+CONF_OUTDOOR_TEMP_THRESHOLD = "outdoor_temp_threshold"
+CONF_ENABLE_COP_OPTIMIZATION = "enable_cop_optimization"
+
+# Planning horizon
+
+CONF_PLANNING_HORIZON = "planning_horizon"
+MAX_PLANNING_HORIZON = 48
+
+# Planning runs in an executor when expected to take longer (seconds)
+PLANNING_LOOP_BUDGET = 0.005
+# Weight of the latest run in the moving average of the planning cost
+PLANNING_COST_SMOOTHING = 0.3
+
+# Plan attribute
+
+CONF_EXPOSE_PLAN_ATTRIBUTE = "expose_plan_attribute"
+
+# Presence prediction
+
+CONF_ENABLE_PRESENCE_PREDICTION = "enable_presence_prediction"
+CONF_PREHEAT_TIME = "preheat_time"
+
+# Slots with a lower predicted occupancy are treated as empty
+OCCUPANCY_EMPTY_THRESHOLD = 0.2
+
+# Price forecast
+
+CONF_ENABLE_PRICE_FORECAST = "enable_price_forecast"
+
+# Setpoint ramping
+
+CONF_RAMP_RATE = "ramp_rate"
+CONF_RAMP_LOOKAHEAD = "ramp_lookahead"
+
+# Model predictive control
+
+CONF_ENABLE_MPC = "enable_mpc"
+CONF_MPC_TIME_CONSTANT = "mpc_time_constant"
+CONF_MPC_HEAT_RATE = "mpc_heat_rate"
+
+# Grid signals
+
+CONF_CO2_SENSOR = "co2_sensor"
+CONF_CO2_WEIGHT = "co2_weight"
+CONF_FLEX_SENSOR = "flex_sensor"
+CONF_FLEX_WEIGHT = "flex_weight"
+CONF_SOLAR_SURPLUS_SENSOR = "solar_surplus_sensor"
+CONF_SOLAR_SURPLUS_WEIGHT = "solar_surplus_weight"
+
+SIGNAL_CO2 = "co2"
+SIGNAL_FLEX = "flex"
+SIGNAL_SOLAR_SURPLUS = "solar_surplus"
+
+# Tariff settings
+
+CONF_GRID_TARIFF = "grid_tariff"
+CONF_SURCHARGE = "surcharge"
+CONF_VAT = "vat"
+
+# Hybrid heat sources
+
+CONF_HEAT_PUMP_SWITCH = "heat_pump_switch"
+CONF_BOILER_SWITCH = "boiler_switch"
+CONF_DIRECT_HEATER_SWITCH = "direct_heater_switch"
+CONF_FUEL_PRICE = "fuel_price"
+CONF_FUEL_PRICE_SENSOR = "fuel_price_sensor"
+CONF_BOILER_EFFICIENCY = "boiler_efficiency"
+CONF_COP_CURVE = "cop_curve"
+
+# Price data quality
+
+MIN_PRICE_QUALITY = 0.5
 
 # Price tier settings
 
-PRICE_TIER_LOW = “low”
-PRICE_TIER_NORMAL = “normal”
-PRICE_TIER_HIGH = “high”
+PRICE_TIER_LOW = "low"
+PRICE_TIER_NORMAL = "normal"
+PRICE_TIER_HIGH = "high"
+
+CONF_TIER_METHOD = "tier_method"
+CONF_TIER_COUNT = "tier_count"
+CONF_TIER_OFFSETS = "tier_offsets"
+TIER_METHOD_RANGE = "range"
+TIER_METHOD_QUANTILE = "quantile"
 
 # Default values
 
@@ -45,18 +139,52 @@ DEFAULT_TEMP_SETBACK = 18
 DEFAULT_TEMP_AWAY = 16
 DEFAULT_TEMP_MIN = 15
 DEFAULT_TEMP_MAX = 25
-DEFAULT_COMFORT_START = “07:00”
-DEFAULT_COMFORT_END = “23:00”
+DEFAULT_COMFORT_START = "07:00"
+DEFAULT_COMFORT_END = "23:00"
 DEFAULT_COMFORT_TEMP = 21
 DEFAULT_OUTDOOR_TEMP_THRESHOLD = -5
 DEFAULT_ENABLE_COP_OPTIMIZATION = True
+DEFAULT_PLANNING_HORIZON = 24
+DEFAULT_ENABLE_PRESENCE_PREDICTION = True
+DEFAULT_PREHEAT_TIME = 60
+DEFAULT_ENABLE_PRICE_FORECAST = True
+DEFAULT_RAMP_RATE = 0.0
+DEFAULT_RAMP_LOOKAHEAD = 3
+DEFAULT_EXPOSE_PLAN_ATTRIBUTE = True
+DEFAULT_ENABLE_MPC = False
+DEFAULT_MPC_TIME_CONSTANT = 40
+DEFAULT_MPC_HEAT_RATE = 1.5
+DEFAULT_TIER_METHOD = TIER_METHOD_RANGE
+DEFAULT_TIER_COUNT = 3
+DEFAULT_ZONE_DEADLINE = "07:00"
+DEFAULT_ZONE_CHARGE_TEMP = 60
+DEFAULT_ZONE_IDLE_TEMP = 45
+DEFAULT_FUEL_PRICE = 0.1
+DEFAULT_BOILER_EFFICIENCY = 90
+DEFAULT_CO2_WEIGHT = 0.0005
+DEFAULT_FLEX_WEIGHT = 0.1
+DEFAULT_SOLAR_SURPLUS_WEIGHT = 0.1
+DEFAULT_SURCHARGE = 0.0
+DEFAULT_VAT = 0.0
+
+# Services
+
+SERVICE_GET_PLAN = "get_plan"
+SERVICE_SIMULATE = "simulate"
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_HORIZON = "horizon"
+ATTR_RESOLUTION = "resolution"
+ATTR_PRICES = "prices"
+ATTR_SETTINGS = "settings"
 
 # Attributes
 
-ATTR_CURRENT_TIER = “current_tier”
-ATTR_NEXT_TIER = “next_tier”
-ATTR_NEXT_TIER_TIME = “next_tier_time”
-ATTR_DAILY_PLAN = “daily_plan”
-ATTR_PRICE_LOW = “price_low”
-ATTR_PRICE_HIGH = “price_high”
-ATTR_PRICE_AVERAGE = “price_average”
\ No newline at end of file
+ATTR_CURRENT_TIER = "current_tier"
+ATTR_NEXT_TIER = "next_tier"
+ATTR_NEXT_TIER_TIME = "next_tier_time"
+ATTR_DAILY_PLAN = "daily_plan"
+ATTR_PRICE_LOW = "price_low"
+ATTR_PRICE_HIGH = "price_high"
+ATTR_PRICE_AVERAGE = "price_average"
+ATTR_PRICE_QUALITY = "price_quality"
\ No newline at end of file
@@ -1,311 +1,775 @@
-“”“Coordinator for Dynamic Heating Scheduler.”””
-from **future** import annotations
+"""Coordinator for Dynamic Heating Scheduler."""
+from __future__ import annotations
 
 import logging
+import time
+from collections.abc import Mapping
 from datetime import datetime, timedelta
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_HOME, STATE_ON
+from homeassistant.const import STATE_HOME, STATE_ON, STATE_UNAVAILABLE
 from homeassistant.core import HomeAssistant, State
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
 from .const import (
-ATTR_CURRENT_TIER,
-ATTR_DAILY_PLAN,
-ATTR_NEXT_TIER,
-ATTR_NEXT_TIER_TIME,
-ATTR_PRICE_AVERAGE,
-ATTR_PRICE_HIGH,
-ATTR_PRICE_LOW,
-CONF_COMFORT_END,
-CONF_COMFORT_START,
-CONF_COMFORT_TEMP,
-CONF_ENABLE_COP_OPTIMIZATION,
-CONF_HOME_AWAY_SENSOR,
-CONF_OUTDOOR_TEMP_SENSOR,
-CONF_OUTDOOR_TEMP_THRESHOLD,
-CONF_PRICE_SENSOR,
-CONF_TEMP_AWAY,
-CONF_TEMP_BOOST,
-CONF_TEMP_MAX,
-CONF_TEMP_MIN,
-CONF_TEMP_NORMAL,
-CONF_TEMP_SETBACK,
-CONF_ZONE_CLIMATE,
-CONF_ZONES,
-DOMAIN,
-PRICE_TIER_HIGH,
-PRICE_TIER_LOW,
-PRICE_TIER_NORMAL,
+    ATTR_CURRENT_TIER,
+    ATTR_DAILY_PLAN,
+    ATTR_NEXT_TIER,
+    ATTR_NEXT_TIER_TIME,
+    ATTR_PRICE_AVERAGE,
+    ATTR_PRICE_HIGH,
+    ATTR_PRICE_LOW,
+    ATTR_PRICE_QUALITY,
+    ATTR_RESOLUTION,
+    CONF_ENABLE_MPC,
+    CONF_ENABLE_PRESENCE_PREDICTION,
+    CONF_ENABLE_PRICE_FORECAST,
+    CONF_FALLBACK_PRICE_SENSORS,
+    CONF_FUEL_PRICE_SENSOR,
+    CONF_HOME_AWAY_SENSOR,
+    CONF_MPC_HEAT_RATE,
+    CONF_MPC_TIME_CONSTANT,
+    CONF_OUTDOOR_TEMP_SENSOR,
+    CONF_PLANNING_HORIZON,
+    CONF_PRICE_SENSOR,
+    CONF_RAMP_LOOKAHEAD,
+    CONF_RAMP_RATE,
+    CONF_ZONE_CLIMATE,
+    CONF_ZONE_GROUPS,
+    CONF_ZONE_HEATER_POWER,
+    CONF_ZONES,
+    DEFAULT_ENABLE_MPC,
+    DEFAULT_ENABLE_PRESENCE_PREDICTION,
+    DEFAULT_ENABLE_PRICE_FORECAST,
+    DEFAULT_MPC_HEAT_RATE,
+    DEFAULT_MPC_TIME_CONSTANT,
+    DEFAULT_PLANNING_HORIZON,
+    DEFAULT_RAMP_LOOKAHEAD,
+    DEFAULT_RAMP_RATE,
+    DOMAIN,
+    MIN_PRICE_QUALITY,
+    PLANNING_COST_SMOOTHING,
+    PLANNING_LOOP_BUDGET,
+    PRICE_TIER_LOW,
+    PRICE_TIER_NORMAL,
 )
+from .accounting import EnergyAccountant
+from .climate_control import ClimateController
+from .dispatcher import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    ServiceDispatcher,
+)
+from .forecast import PriceForecaster
+from .grid_signals import (
+    TEMPERATURE_FIELDS,
+    GridSignalReader,
+    forecast_points,
+    points_to_intervals,
+    resample_onto_slots,
+)
+from .heat_source import HeatSourceSwitcher
+from .history import HistoryWarmup
+from .loads import LoadScheduler
+from .mpc import MpcController, ZoneModel, comfort_bounds
+from .planner import (
+    EMPTY_INPUTS,
+    calculate_plan,
+    price_statistics,
+)
+from .presence import PresencePredictor
 from .price_parser import PriceParser
+from .price_series import (
+    DEFAULT_RESOLUTION,
+    PriceSeries,
+    floor_to_resolution,
+    merge_series,
+    normalize_prices,
+)
+from .price_window import SlidingPriceWindow
+from .ramp import RampTrajectory
+from .tariff import TARIFF_OPTIONS, TariffSchedule
+from .watchdog import LoopWatchdog
+from .zone_groups import resolve_profiles
 
-_LOGGER = logging.getLogger(**name**)
+_LOGGER = logging.getLogger(__name__)
 
 class DynamicHeatingCoordinator(DataUpdateCoordinator):
-“”“Coordinator to manage heating schedules based on dynamic pricing.”””
-
-```
-def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Initialize the coordinator."""
-    super().__init__(
-        hass,
-        _LOGGER,
-        name=DOMAIN,
-        update_interval=timedelta(minutes=5),
-    )
-    self.entry = entry
-    self.price_parser = PriceParser(hass)
-    self._daily_plan = {}
-    self._price_stats = {}
-
-async def _async_update_data(self) -> dict[str, Any]:
-    """Fetch data from sensors and calculate heating plan."""
-    try:
-        # Get price sensor data
-        price_sensor = self.entry.data[CONF_PRICE_SENSOR]
-        price_state = self.hass.states.get(price_sensor)
-        
-        if not price_state:
-            raise UpdateFailed(f"Price sensor {price_sensor} not found")
-
-        # Parse prices for the next 24 hours
-        hourly_prices = await self.price_parser.parse_price_sensor(price_state)
-        
-        if not hourly_prices:
-            raise UpdateFailed("No price data available")
-
-        # Calculate price statistics
-        prices_only = [p["price"] for p in hourly_prices]
-        self._price_stats = {
-            ATTR_PRICE_LOW: min(prices_only),
-            ATTR_PRICE_HIGH: max(prices_only),
-            ATTR_PRICE_AVERAGE: sum(prices_only) / len(prices_only),
+    """Coordinator to manage heating schedules based on dynamic pricing."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, dispatcher: ServiceDispatcher
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(minutes=5),
+        )
+        self.entry = entry
+        # Options edited after setup (temperatures, zone groups) take
+        # precedence; the entry reloads when they change
+        self.config = {**entry.data, **entry.options}
+        self.zone_profiles, self.profiles = resolve_profiles(
+            self.config.get(CONF_ZONE_GROUPS, []), self.config
+        )
+        # Price sources in priority order, each with its own parser and the
+        # last parse result, reused until the source's state changes
+        self._price_sources: list[str] = [
+            self.config[CONF_PRICE_SENSOR],
+            *self.config.get(CONF_FALLBACK_PRICE_SENSORS, []),
+        ]
+        self._price_parsers = {
+            source: PriceParser(hass) for source in self._price_sources
         }
+        self._parsed_prices: dict[str, tuple[datetime, list[dict[str, Any]]]] = {}
+        self.grid_signals = GridSignalReader(hass, self.config)
+        self.tariff = TariffSchedule.from_config(self.config)
+        self._daily_plan = {}
+        self._price_stats = {}
+        self._price_window = SlidingPriceWindow()
+        self._price_signature: list[tuple[str, datetime]] = []
+        self._prices_republished = True
+        self._price_quality = 0.0
+        self._resolution = DEFAULT_RESOLUTION
+        self._spot_slots: list[dict[str, Any]] = []
+        self._plan_inputs: dict[str, Any] = {}
+        self.plan_revision = 0
+        self.watchdog = LoopWatchdog(hass)
+        self.loop_lag = 0.0
+        self.planning_duration = 0.0
+        self.planning_offloaded = False
+        self._planning_cost_per_slot = 0.0
+        self.accountant = EnergyAccountant(
+            hass, entry, self.config, self.price_at, lambda: self._resolution
+        )
+        self.history = HistoryWarmup(hass, entry, self.config)
+        self.presence = PresencePredictor(hass, entry, self.config, self.history)
+        self.forecaster = PriceForecaster(hass, entry, self.config, self.history)
+        self.dispatcher = dispatcher
+        self.climate = ClimateController(hass, dispatcher)
+        self._ramps: dict[str, RampTrajectory] = {}
+        self._ramp_revision: int | None = None
+        self.mpc = MpcController()
+        self.loads = LoadScheduler(hass, entry, self.config, dispatcher)
+        self.heat_sources = HeatSourceSwitcher(hass, self.config, dispatcher)
+
+    @property
+    def resolution(self) -> timedelta:
+        """Return the slot length of the current plan."""
+        return self._resolution
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch data from sensors and calculate heating plan."""
+        try:
+            # Book the energy used since the last refresh while the plan
+            # still holds the prices of a slot that just ended
+            self.accountant.async_tick()
+            self.presence.async_tick()
+
+            now = dt_util.now()
+            horizon = timedelta(
+                hours=self.config.get(
+                    CONF_PLANNING_HORIZON, DEFAULT_PLANNING_HORIZON
+                )
+            )
 
-        # Generate daily plan based on price tiers
-        self._daily_plan = self._calculate_daily_plan(hourly_prices)
-
-        # Get current conditions
-        current_tier = self._get_current_tier()
-        target_temp = self._get_target_temperature(current_tier)
-
-        # Apply temperatures to zones
-        await self._apply_zone_temperatures(target_temp)
+            # Parse every price source, normalize them onto a regular slot grid
+            # and merge them by priority
+            series = await self._async_read_prices(now, horizon)
+            self._price_quality = series.quality
+
+            # Bad data must not replan or actuate; keep following the last plan
+            if series.quality < MIN_PRICE_QUALITY:
+                return self._hold_plan(series)
+
+            self._resolution = series.resolution
+            current_slot = dt_util.as_utc(series.slot_start(now))
+            horizon_end = current_slot + horizon
+
+            # Train on the published prices, then extend them with predicted
+            # slots when the market has not published far enough yet
+            outdoor_temp = self._get_outdoor_temperature()
+            self.forecaster.async_observe(series.slots, outdoor_temp)
+            published = len(series.slots)
+            if self.config.get(
+                CONF_ENABLE_PRICE_FORECAST, DEFAULT_ENABLE_PRICE_FORECAST
+            ):
+                series.slots.extend(
+                    self.forecaster.forecast(
+                        series.slots, series.resolution, horizon_end, outdoor_temp
+                    )
+                )
+            self._spot_slots = series.slots
+
+            # Compose spot prices with grid tariffs, surcharges and VAT so tiers
+            # are computed on what a kWh actually costs
+            hourly_prices = self._apply_tariff(series.slots, self.tariff)
+
+            # Slide the price window over the horizon; statistics are maintained
+            # incrementally instead of being rescanned every update. Predicted
+            # slots are left out, they change without their timestamps changing
+            self._price_window.update(
+                [
+                    (dt_util.as_utc(p["hour"]), p["price"])
+                    for p in hourly_prices[:published]
+                ],
+                current_slot,
+                horizon_end,
+                self._prices_republished,
+            )
+            self._prices_republished = False
+            self._price_stats = {
+                ATTR_PRICE_LOW: self._price_window.minimum,
+                ATTR_PRICE_HIGH: self._price_window.maximum,
+                ATTR_PRICE_AVERAGE: self._price_window.average,
+            }
+
+            # Snapshot the state-machine inputs once; the plan and any on-demand
+            # simulations are computed from this snapshot
+            self._plan_inputs = self._capture_plan_inputs(hourly_prices)
+
+            # Generate daily plan based on price tiers. Entities compare the
+            # revision instead of diffing the whole plan themselves
+            daily_plan = await self._async_calculate_plan(
+                hourly_prices, self._price_stats, self._plan_inputs, self.config
+            )
+            if daily_plan != self._daily_plan:
+                self._daily_plan = daily_plan
+                self.plan_revision += 1
+
+            # Get current conditions
+            current_tier = self._get_current_tier()
+
+            # Apply the planned temperatures to zones and switch the storage loads
+            await self._apply_zone_temperatures()
+            # Their commands are queued with the dispatcher like the zones'
+            if self.loads.loads:
+                hour_plan = self._daily_plan.get(self._current_slot().isoformat(), {})
+                self.loads.async_apply(hour_plan.get("loads", []))
+            if self.heat_sources.switches:
+                hour_plan = self._daily_plan.get(self._current_slot().isoformat(), {})
+                if source := hour_plan.get("heat_source"):
+                    self.heat_sources.async_apply(source)
+
+            self.loop_lag = self.watchdog.take_max_lag()
+
+            return {
+                ATTR_DAILY_PLAN: self._daily_plan,
+                ATTR_CURRENT_TIER: current_tier,
+                ATTR_NEXT_TIER: self._get_next_tier(),
+                ATTR_NEXT_TIER_TIME: self._get_next_tier_time(),
+                ATTR_PRICE_QUALITY: round(self._price_quality, 3),
+                **self._price_stats,
+            }
+
+        except Exception as err:
+            _LOGGER.error("Error updating dynamic heating data: %s", err)
+            raise UpdateFailed(f"Error updating data: {err}") from err
+
+    async def _async_read_prices(
+        self, now: datetime, horizon: timedelta
+    ) -> PriceSeries:
+        """Read all price sources and merge them into one series."""
+        sources: list[tuple[str, PriceSeries]] = []
+        resolution: timedelta | None = None
+        signature: list[tuple[str, datetime]] = []
+
+        for source in self._price_sources:
+            state = self.hass.states.get(source)
+            if not state or state.state == STATE_UNAVAILABLE:
+                _LOGGER.debug("Price source %s is unavailable", source)
+                continue
+
+            # Only parse again when the source published something new
+            cached = self._parsed_prices.get(source)
+            if cached is None or cached[0] != state.last_updated:
+                raw_prices = await self._price_parsers[source].parse_price_sensor(state)
+                cached = (state.last_updated, raw_prices)
+                self._parsed_prices[source] = cached
+
+            # The first source with data sets the grid for the others
+            series = normalize_prices(cached[1], now, horizon, resolution)
+            if series.slots:
+                resolution = series.resolution
+                sources.append((source, series))
+                signature.append((source, cached[0]))
+
+        # Prices already in the window only change when a source published
+        # again or a different set of sources made up the series. The flag
+        # stays set until the window has been rebuilt
+        if signature != self._price_signature:
+            self._prices_republished = True
+        self._price_signature = signature
+
+        if not sources:
+            raise UpdateFailed("No price data available from any price source")
+
+        if len(self._price_sources) == 1:
+            return sources[0][1]
+        return merge_series(sources)
+
+    def _hold_plan(self, series: PriceSeries) -> dict[str, Any]:
+        """Keep the previous plan when the price data is not trustworthy."""
+        _LOGGER.warning(
+            "Price data quality %.0f%% is below %.0f%% (%d gaps, %d interpolated, "
+            "synthetic: %s); keeping the previous plan",
+            series.quality * 100,
+            MIN_PRICE_QUALITY * 100,
+            series.gaps,
+            series.interpolated,
+            series.synthetic,
+        )
+
+        if not self.data:
+            raise UpdateFailed("Price data quality too low to plan")
 
         return {
-            ATTR_DAILY_PLAN: self._daily_plan,
-            ATTR_CURRENT_TIER: current_tier,
+            **self.data,
+            ATTR_CURRENT_TIER: self._get_current_tier(),
             ATTR_NEXT_TIER: self._get_next_tier(),
             ATTR_NEXT_TIER_TIME: self._get_next_tier_time(),
-            **self._price_stats,
+            ATTR_PRICE_QUALITY: round(series.quality, 3),
+        }
+
+    async def async_simulate(
+        self,
+        prices: list[dict[str, Any]] | None = None,
+        settings: Mapping[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Run the planner on cached or caller-supplied inputs without actuating.
+
+        Uses the spot series and state snapshot from the last refresh, so
+        repeated calls never parse the price sensor or touch the state machine.
+        """
+        config = {**self.config, **(settings or {})}
+        now = dt_util.now()
+        horizon = timedelta(
+            hours=config.get(CONF_PLANNING_HORIZON, DEFAULT_PLANNING_HORIZON)
+        )
+
+        if prices is not None:
+            series = normalize_prices(prices, now, horizon)
+            spot_slots, quality = series.slots, series.quality
+            resolution = series.resolution
+        else:
+            horizon_end = floor_to_resolution(now, self._resolution) + horizon
+            spot_slots = [p for p in self._spot_slots if p["hour"] < horizon_end]
+            quality = self._price_quality
+            resolution = self._resolution
+        minutes = int(resolution.total_seconds() // 60)
+
+        if not spot_slots:
+            return {
+                ATTR_DAILY_PLAN: {},
+                ATTR_PRICE_QUALITY: round(quality, 3),
+                ATTR_RESOLUTION: minutes,
+            }
+
+        tariff = self.tariff
+        if settings and any(key in settings for key in TARIFF_OPTIONS):
+            tariff = TariffSchedule.from_config(config)
+
+        hourly_prices = self._apply_tariff(spot_slots, tariff)
+        price_stats = price_statistics(hourly_prices)
+        inputs = self._plan_inputs or EMPTY_INPUTS
+
+        # Simulations leave the refresh's planning metrics alone
+        plan, _, _ = await self._async_run_planner(
+            hourly_prices, price_stats, inputs, config
+        )
+        return {
+            ATTR_DAILY_PLAN: plan,
+            ATTR_PRICE_QUALITY: round(quality, 3),
+            ATTR_RESOLUTION: minutes,
+            **price_stats,
         }
 
-    except Exception as err:
-        _LOGGER.error("Error updating dynamic heating data: %s", err)
-        raise UpdateFailed(f"Error updating data: {err}") from err
-
-def _calculate_daily_plan(self, hourly_prices: list[dict]) -> dict:
-    """Calculate the daily heating plan based on price tiers."""
-    plan = {}
-    
-    avg_price = self._price_stats[ATTR_PRICE_AVERAGE]
-    low_price = self._price_stats[ATTR_PRICE_LOW]
-    high_price = self._price_stats[ATTR_PRICE_HIGH]
-
-    # Calculate thresholds for price tiers
-    # Low tier: bottom third between min and average
-    low_threshold = low_price + (avg_price - low_price) / 3
-    # High tier: top third between average and max
-    high_threshold = avg_price + (high_price - avg_price) * 2 / 3
-
-    for hour_data in hourly_prices:
-        hour = hour_data["hour"]
-        price = hour_data["price"]
-
-        # Determine price tier
-        if price <= low_threshold:
-            tier = PRICE_TIER_LOW
-        elif price >= high_threshold:
-            tier = PRICE_TIER_HIGH
+    def _apply_tariff(
+        self, spot_slots: list[dict], tariff: TariffSchedule
+    ) -> list[dict]:
+        """Turn normalized spot slots into effective price slots."""
+        effective_prices = tariff.apply(
+            [p["hour"] for p in spot_slots],
+            [p["price"] for p in spot_slots],
+        )
+        return [
+            {**p, "price": price, "spot_price": p["price"]}
+            for p, price in zip(spot_slots, effective_prices)
+        ]
+
+    def _capture_plan_inputs(self, hourly_prices: list[dict]) -> dict[str, Any]:
+        """Read everything the planner needs from the state machine once."""
+        # Grid signals (CO2, DSO flexibility, solar surplus) are merged onto the
+        # price slots once and added to each slot's score as a weighted cost
+        hours = [hour_data["hour"] for hour_data in hourly_prices]
+        signal_costs, signals = self.grid_signals.cost_terms(hours, self._resolution)
+        keys = [hour.isoformat() for hour in hours]
+
+        occupancy = {}
+        if self.config.get(
+            CONF_ENABLE_PRESENCE_PREDICTION, DEFAULT_ENABLE_PRESENCE_PREDICTION
+        ):
+            occupancy = {
+                key: probability
+                for key, probability in zip(
+                    keys, self.presence.occupancy(hours, self._resolution)
+                )
+                if probability is not None
+            }
+
+        return {
+            "away": self._is_away_mode(),
+            "current_slot": self._current_slot().isoformat(),
+            "fuel_price": self._get_fuel_price(),
+            "loads": self.loads.requirements(self._resolution),
+            "occupancy": occupancy,
+            "heat_source": self.heat_sources.active_source,
+            "outdoor_forecast": self._get_outdoor_forecast(hours, keys),
+            "outdoor_temp": self._get_outdoor_temperature(),
+            "signal_costs": dict(zip(keys, signal_costs)),
+            "signals": {
+                key: {name: round(values[index], 3) for name, values in signals.items()}
+                for index, key in enumerate(keys)
+            }
+            if signals
+            else {},
+        }
+
+    async def _async_calculate_plan(
+        self,
+        hourly_prices: list[dict],
+        price_stats: dict[str, float],
+        inputs: dict[str, Any],
+        config: Mapping[str, Any],
+    ) -> dict:
+        """Plan the refresh and update the planning metrics.
+
+        The cost per slot is a moving average over inline and executor runs,
+        so one slow run does not send every later plan to the executor.
+        """
+        plan, duration, offloaded = await self._async_run_planner(
+            hourly_prices, price_stats, inputs, config
+        )
+        self.planning_duration = duration
+        self.planning_offloaded = offloaded
+        if hourly_prices:
+            cost = duration / len(hourly_prices)
+            if self._planning_cost_per_slot:
+                cost = self._planning_cost_per_slot + PLANNING_COST_SMOOTHING * (
+                    cost - self._planning_cost_per_slot
+                )
+            self._planning_cost_per_slot = cost
+        return plan
+
+    async def _async_run_planner(
+        self,
+        hourly_prices: list[dict],
+        price_stats: dict[str, float],
+        inputs: dict[str, Any],
+        config: Mapping[str, Any],
+    ) -> tuple[dict, float, bool]:
+        """Run the planner on a snapshot, in an executor when it is expensive.
+
+        Returns the plan, how long it took and whether it was offloaded. The
+        estimated cost per slot decides whether it fits in the event loop
+        budget, so small plans avoid the thread hop entirely.
+        """
+        estimated = self._planning_cost_per_slot * len(hourly_prices)
+        offload = estimated > PLANNING_LOOP_BUDGET
+
+        started = time.perf_counter()
+        if offload:
+            plan = await self.hass.async_add_executor_job(
+                calculate_plan, hourly_prices, price_stats, inputs, config, self.profiles
+            )
         else:
-            tier = PRICE_TIER_NORMAL
-
-        # Check if within comfort hours
-        is_comfort_hour = self._is_comfort_hour(hour)
-        
-        # Check COP optimization
-        should_boost_cop = await self._should_boost_for_cop(hour)
-
-        plan[hour.isoformat()] = {
-            "tier": tier,
-            "price": price,
-            "is_comfort_hour": is_comfort_hour,
-            "boost_for_cop": should_boost_cop,
-            "target_temp": self._get_target_temperature(
-                tier, is_comfort_hour, should_boost_cop
-            ),
+            plan = calculate_plan(
+                hourly_prices, price_stats, inputs, config, self.profiles
+            )
+        return plan, time.perf_counter() - started, offload
+
+    def _get_outdoor_temperature(self) -> float | None:
+        """Read the outdoor temperature sensor, if configured."""
+        outdoor_sensor = self.config.get(CONF_OUTDOOR_TEMP_SENSOR)
+        if not outdoor_sensor:
+            return None
+
+        outdoor_state = self.hass.states.get(outdoor_sensor)
+        if not outdoor_state:
+            return None
+
+        try:
+            return float(outdoor_state.state)
+        except (ValueError, TypeError):
+            return None
+
+    def _get_outdoor_forecast(
+        self, hours: list[datetime], keys: list[str]
+    ) -> dict[str, float]:
+        """Resample the outdoor sensor's forecast attribute onto the slots.
+
+        Slots the forecast does not cover are left out, so the planner falls
+        back to the current outdoor temperature for them.
+        """
+        outdoor_sensor = self.config.get(CONF_OUTDOOR_TEMP_SENSOR)
+        outdoor_state = outdoor_sensor and self.hass.states.get(outdoor_sensor)
+        if not outdoor_state:
+            return {}
+
+        points = forecast_points(outdoor_state.attributes, TEMPERATURE_FIELDS)
+        if not points:
+            return {}
+
+        temperatures = resample_onto_slots(
+            hours,
+            self._resolution,
+            {"outdoor": points_to_intervals(points, self._resolution)},
+            missing=None,
+        )["outdoor"]
+        return {
+            key: round(temperature, 2)
+            for key, temperature in zip(keys, temperatures)
+            if temperature is not None
         }
 
-    return plan
-
-def _is_comfort_hour(self, hour: datetime) -> bool:
-    """Check if the given hour is within comfort hours."""
-    comfort_start = self.entry.data.get(CONF_COMFORT_START, "07:00")
-    comfort_end = self.entry.data.get(CONF_COMFORT_END, "23:00")
-
-    start_time = datetime.strptime(comfort_start, "%H:%M").time()
-    end_time = datetime.strptime(comfort_end, "%H:%M").time()
-    
-    hour_time = hour.time()
-
-    if start_time <= end_time:
-        return start_time <= hour_time < end_time
-    else:
-        return hour_time >= start_time or hour_time < end_time
-
-async def _should_boost_for_cop(self, hour: datetime) -> bool:
-    """Determine if heating should be boosted for COP optimization."""
-    if not self.entry.data.get(CONF_ENABLE_COP_OPTIMIZATION, False):
-        return False
-
-    outdoor_sensor = self.entry.data.get(CONF_OUTDOOR_TEMP_SENSOR)
-    if not outdoor_sensor:
-        return False
-
-    outdoor_state = self.hass.states.get(outdoor_sensor)
-    if not outdoor_state:
-        return False
-
-    try:
-        outdoor_temp = float(outdoor_state.state)
-        threshold = self.entry.data.get(CONF_OUTDOOR_TEMP_THRESHOLD, -5)
-        
-        # If outdoor temp is below threshold, boost during low-price hours
-        if outdoor_temp < threshold:
-            current_hour = dt_util.now().replace(minute=0, second=0, microsecond=0)
-            hour_plan = self._daily_plan.get(hour.isoformat(), {})
-            return hour_plan.get("tier") == PRICE_TIER_LOW
-        
-    except (ValueError, TypeError):
-        pass
-
-    return False
-
-def _get_target_temperature(
-    self, tier: str, is_comfort_hour: bool = False, boost_for_cop: bool = False
-) -> float:
-    """Get target temperature based on tier and conditions."""
-    # Check if away mode is active
-    if self._is_away_mode():
-        return self.entry.data.get(CONF_TEMP_AWAY, 16)
-
-    # Comfort hours override
-    if is_comfort_hour:
-        return self.entry.data.get(CONF_COMFORT_TEMP, 21)
-
-    # COP optimization boost
-    if boost_for_cop:
-        return self.entry.data.get(CONF_TEMP_BOOST, 22)
-
-    # Standard tier-based temperatures
-    if tier == PRICE_TIER_LOW:
-        temp = self.entry.data.get(CONF_TEMP_BOOST, 22)
-    elif tier == PRICE_TIER_HIGH:
-        temp = self.entry.data.get(CONF_TEMP_SETBACK, 18)
-    else:
-        temp = self.entry.data.get(CONF_TEMP_NORMAL, 20)
-
-    # Apply min/max constraints
-    temp_min = self.entry.data.get(CONF_TEMP_MIN, 15)
-    temp_max = self.entry.data.get(CONF_TEMP_MAX, 25)
-    
-    return max(temp_min, min(temp_max, temp))
-
-def _is_away_mode(self) -> bool:
-    """Check if away mode is active."""
-    away_sensor = self.entry.data.get(CONF_HOME_AWAY_SENSOR)
-    if not away_sensor:
-        return False
-
-    away_state = self.hass.states.get(away_sensor)
-    if not away_state:
-        return False
-
-    # Handle both binary_sensor and input_boolean
-    return away_state.state not in [STATE_HOME, STATE_ON]
-
-def _get_current_tier(self) -> str:
-    """Get the current price tier."""
-    now = dt_util.now().replace(minute=0, second=0, microsecond=0)
-    hour_plan = self._daily_plan.get(now.isoformat())
-    
-    if hour_plan:
-        return hour_plan.get("tier", PRICE_TIER_NORMAL)
-    
-    return PRICE_TIER_NORMAL
-
-def _get_next_tier(self) -> str | None:
-    """Get the next price tier."""
-    now = dt_util.now().replace(minute=0, second=0, microsecond=0)
-    current_tier = self._get_current_tier()
-
-    for hour_str in sorted(self._daily_plan.keys()):
-        hour = datetime.fromisoformat(hour_str)
-        if hour > now:
-            next_tier = self._daily_plan[hour_str].get("tier")
-            if next_tier != current_tier:
-                return next_tier
-
-    return None
-
-def _get_next_tier_time(self) -> datetime | None:
-    """Get the time of the next tier change."""
-    now = dt_util.now().replace(minute=0, second=0, microsecond=0)
-    current_tier = self._get_current_tier()
-
-    for hour_str in sorted(self._daily_plan.keys()):
-        hour = datetime.fromisoformat(hour_str)
-        if hour > now:
-            next_tier = self._daily_plan[hour_str].get("tier")
-            if next_tier != current_tier:
-                return hour
-
-    return None
-
-async def _apply_zone_temperatures(self, target_temp: float) -> None:
-    """Apply target temperature to all configured zones."""
-    zones = self.entry.data.get(CONF_ZONES, [])
-    
-    for zone in zones:
-        climate_entity = zone.get(CONF_ZONE_CLIMATE)
-        if not climate_entity:
-            continue
-
-        climate_state = self.hass.states.get(climate_entity)
-        if not climate_state:
-            _LOGGER.warning("Climate entity %s not found", climate_entity)
-            continue
-
-        # Get current temperature setting
-        current_temp = climate_state.attributes.get("temperature")
-        
-        # Only update if temperature has changed significantly (0.5°C threshold)
-        if current_temp is None or abs(current_temp - target_temp) >= 0.5:
-            await self.hass.services.async_call(
-                "climate",
-                "set_temperature",
-                {
-                    "entity_id": climate_entity,
-                    "temperature": target_temp,
-                },
+    def _get_fuel_price(self) -> float | None:
+        """Read the fuel price sensor, if configured."""
+        fuel_sensor = self.config.get(CONF_FUEL_PRICE_SENSOR)
+        if not fuel_sensor:
+            return None
+
+        fuel_state = self.hass.states.get(fuel_sensor)
+        if not fuel_state:
+            return None
+
+        try:
+            return float(fuel_state.state)
+        except (ValueError, TypeError):
+            return None
+
+    def _is_away_mode(self) -> bool:
+        """Check if away mode is active."""
+        away_sensor = self.config.get(CONF_HOME_AWAY_SENSOR)
+        if not away_sensor:
+            return False
+
+        away_state = self.hass.states.get(away_sensor)
+        if not away_state:
+            return False
+
+        # Handle both binary_sensor and input_boolean
+        return away_state.state not in [STATE_HOME, STATE_ON]
+
+    def price_at(self, moment: datetime) -> tuple[float, float] | None:
+        """Return the planned price of the slot containing moment and the average."""
+        slot = floor_to_resolution(moment, self._resolution)
+        hour_plan = self._daily_plan.get(slot.isoformat())
+        if not hour_plan or not self._price_stats:
+            return None
+        return hour_plan["price"], self._price_stats[ATTR_PRICE_AVERAGE]
+
+    def _current_slot(self) -> datetime:
+        """Get the start of the current price slot."""
+        return floor_to_resolution(dt_util.now(), self._resolution)
+
+    def _get_current_tier(self) -> str:
+        """Get the current price tier."""
+        now = self._current_slot()
+        hour_plan = self._daily_plan.get(now.isoformat())
+
+        if hour_plan:
+            return hour_plan.get("tier", PRICE_TIER_NORMAL)
+
+        return PRICE_TIER_NORMAL
+
+    def _next_tier_change(self) -> tuple[datetime, str] | None:
+        """Return the start and tier of the first slot after a tier change."""
+        now = self._current_slot()
+        current_tier = self._get_current_tier()
+
+        # The plan is built in chronological order; sorting the ISO keys would
+        # misorder the repeated hour when DST ends
+        for hour_str, hour_plan in self._daily_plan.items():
+            hour = datetime.fromisoformat(hour_str)
+            if hour > now:
+                next_tier = hour_plan.get("tier")
+                if next_tier != current_tier:
+                    return hour, next_tier
+
+        return None
+
+    def _get_next_tier(self) -> str | None:
+        """Get the next price tier."""
+        change = self._next_tier_change()
+        return change[1] if change else None
+
+    def _get_next_tier_time(self) -> datetime | None:
+        """Get the time of the next tier change."""
+        change = self._next_tier_change()
+        return change[0] if change else None
+
+    async def _apply_zone_temperatures(self) -> None:
+        """Apply the current slot's planned temperature to all configured zones."""
+        # The planned target already holds the comfort hours, COP boost, away
+        # setback and pre-heat; recomputing it here would drop them
+        hour_plan = self._daily_plan.get(self._current_slot().isoformat())
+        if hour_plan is None:
+            return
+        target_temp = hour_plan["target_temp"]
+        zones = self.config.get(CONF_ZONES, [])
+        ramp_rate = self.config.get(CONF_RAMP_RATE, DEFAULT_RAMP_RATE)
+        if ramp_rate and self._ramp_revision != self.plan_revision:
+            self._build_ramps(zones, ramp_rate)
+        mpc_setpoints = {}
+        if self.config.get(CONF_ENABLE_MPC, DEFAULT_ENABLE_MPC):
+            mpc_setpoints = await self._async_solve_mpc(zones)
+        now = dt_util.now()
+        priority = self._zone_priority()
+
+        # Zones in a group with its own profile get that profile's target,
+        # planned once for all of its members
+        profile_targets = hour_plan.get("group_targets", {})
+
+        for zone in zones:
+            climate_entity = zone.get(CONF_ZONE_CLIMATE)
+            if not climate_entity:
+                continue
+
+            # With ramping, zones follow their precomputed trajectory instead
+            # of jumping to the tier temperature
+            zone_target = profile_targets.get(
+                self.zone_profiles.get(climate_entity), target_temp
             )
-            _LOGGER.info(
-                "Set %s temperature to %.1f°C (was %.1f°C)",
-                climate_entity,
-                target_temp,
-                current_temp or 0,
+            if ramp_rate and (ramp := self._ramps.get(climate_entity)):
+                if (setpoint := ramp.setpoint_at(now)) is not None:
+                    zone_target = setpoint
+
+            # MPC closes the loop on the measured room temperature and takes
+            # precedence over the open-loop targets
+            zone_target = mpc_setpoints.get(climate_entity, zone_target)
+
+            # The controller adapts the target to what the device accepts,
+            # skips calls that would not change anything and backs off from
+            # failing devices. Commands are queued, not waited for, since the
+            # dispatcher may hold them a while when a mesh is busy and
+            # coalesces them if the next refresh comes first. One broken zone
+            # must not stop the others
+            try:
+                self.climate.async_set_target(climate_entity, zone_target, priority)
+            except Exception:  # noqa: BLE001
+                _LOGGER.exception("Unexpected error updating %s", climate_entity)
+
+    def _zone_priority(self) -> int:
+        """Return how urgent this refresh's zone commands are.
+
+        Setting back for away goes ahead of ordinary tier changes, and
+        preheating in cheap slots can wait behind both.
+        """
+        if self._is_away_mode():
+            return PRIORITY_HIGH
+        if self._get_current_tier() == PRICE_TIER_LOW:
+            return PRIORITY_LOW
+        return PRIORITY_NORMAL
+
+    async def _async_solve_mpc(self, zones: list[dict[str, Any]]) -> dict[str, float]:
+        """Solve the zone energy plans from the measured room temperatures.
+
+        Runs every refresh on the remaining plan, warm-started from the last
+        solution; only the setpoint for the current slot is used.
+        """
+        current_slot = self._current_slot()
+        remaining = {
+            key: hour_plan
+            for key, hour_plan in self._daily_plan.items()
+            if datetime.fromisoformat(key) >= current_slot
+        }
+        if not remaining:
+            return {}
+
+        time_constant = self.config.get(
+            CONF_MPC_TIME_CONSTANT, DEFAULT_MPC_TIME_CONSTANT
+        )
+        heat_rate = self.config.get(CONF_MPC_HEAT_RATE, DEFAULT_MPC_HEAT_RATE)
+        # Zones are solved per profile, since each has its own comfort bounds
+        models: dict[str | None, dict[str, tuple[ZoneModel, float]]] = {}
+        for zone in zones:
+            climate_entity = zone.get(CONF_ZONE_CLIMATE)
+            state = self.hass.states.get(climate_entity) if climate_entity else None
+            room_temp = state.attributes.get("current_temperature") if state else None
+            if room_temp is None:
+                # Without a measurement the zone follows the plan open-loop
+                continue
+            # Zones without a rated power are compared on price alone
+            heater_power = float(zone.get(CONF_ZONE_HEATER_POWER) or 1.0)
+            profile = self.zone_profiles.get(climate_entity)
+            models.setdefault(profile, {})[climate_entity] = (
+                ZoneModel(time_constant, heat_rate, heater_power),
+                float(room_temp),
+            )
+
+        self.mpc.forget({zone_id for members in models.values() for zone_id in members})
+        if not models:
+            return {}
+
+        costs = [hour_plan["score"] for hour_plan in remaining.values()]
+        outdoor_temp = self._get_outdoor_temperature()
+        setpoints = {}
+        for profile, members in models.items():
+            config = self.config
+            if profile is not None:
+                config = {**config, **self.profiles[profile]}
+            lower, upper = comfort_bounds(remaining, config, profile)
+            setpoints |= await self.hass.async_add_executor_job(
+                self.mpc.solve_all,
+                dt_util.as_utc(current_slot),
+                self._resolution,
+                costs,
+                lower,
+                upper,
+                outdoor_temp,
+                members,
             )
-```
\ No newline at end of file
+        return setpoints
+
+    def _build_ramps(self, zones: list[dict[str, Any]], ramp_rate: float) -> None:
+        """Turn the plan into a setpoint trajectory per zone, once per revision.
+
+        Zones with the same profile and the same current setpoint share one
+        trajectory, so a floor of rooms that already follow it is ramped once.
+        """
+        lookahead = timedelta(
+            hours=self.config.get(CONF_RAMP_LOOKAHEAD, DEFAULT_RAMP_LOOKAHEAD)
+        )
+        now = dt_util.now()
+        self._ramps = {}
+        trajectories: dict[tuple[str | None, float | None], RampTrajectory] = {}
+        for zone in zones:
+            climate_entity = zone.get(CONF_ZONE_CLIMATE)
+            if not climate_entity:
+                continue
+            # Start from whatever the zone is set to now, so the first step is
+            # rate limited too
+            state = self.hass.states.get(climate_entity)
+            current = None
+            if state:
+                current = state.attributes.get("temperature")
+                if current is None:
+                    current = state.attributes.get("target_temp_low")
+            profile = self.zone_profiles.get(climate_entity)
+            if (ramp := trajectories.get((profile, current))) is None:
+                ramp = trajectories[(profile, current)] = RampTrajectory.build(
+                    self._daily_plan,
+                    self._resolution,
+                    now,
+                    current,
+                    ramp_rate,
+                    lookahead,
+                    profile,
+                )
+            self._ramps[climate_entity] = ramp
+        self._ramp_revision = self.plan_revision
\ No newline at end of file
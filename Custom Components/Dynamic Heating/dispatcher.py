@@ -0,0 +1,231 @@
+"""Domain-wide service-call dispatcher for Dynamic Heating Scheduler.
+
+Every entry's coordinator refreshes at the top of the hour, so without a
+limit dozens of setpoint commands reach a Z-Wave or Zigbee mesh at the same
+moment. All entries share one dispatcher, stored in hass.data[DOMAIN] under
+DATA_DISPATCHER. Commands are queued per mesh (the integration that provides
+the entity) and released by a token bucket:
+
+- more urgent commands (away, safety) are sent before boosts
+- a command for an entity that still has one queued replaces it, so a
+  device never receives a setpoint that is already out of date
+- queue depth, waiting time and coalesced commands are tracked
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Key of the dispatcher in hass.data[DOMAIN], next to the coordinators
+DATA_DISPATCHER = "dispatcher"
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Commands per second and burst size for each mesh. Battery and mesh radio
+# networks get less than integrations talking to a hub over IP
+MESH_RATES: dict[str, tuple[float, int]] = {
+    "zwave_js": (1.0, 3),
+    "zha": (2.0, 4),
+    "zigbee2mqtt": (2.0, 4),
+    "mqtt": (2.0, 4),
+    "deconz": (2.0, 4),
+}
+DEFAULT_RATE = (5.0, 10)
+
+# A device gets this long to accept a command once it is sent
+CALL_TIMEOUT = 10
+
+
+class TokenBucket:
+    """Release at most rate commands per second, with bursts up to capacity."""
+
+    __slots__ = ("rate", "capacity", "_tokens", "_updated")
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def delay(self) -> float:
+        """Take a token, returning how long to wait before it is valid."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+@dataclass(slots=True)
+class Command:
+    """A queued service call and the waiters for its result."""
+
+    domain: str
+    service: str
+    data: dict[str, Any]
+    priority: int
+    queued_at: float
+    future: asyncio.Future = field(repr=False)
+
+
+class MeshQueue:
+    """Commands waiting for one mesh, most urgent first."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize an empty queue."""
+        rate, capacity = MESH_RATES.get(name, DEFAULT_RATE)
+        self.name = name
+        self.bucket = TokenBucket(rate, capacity)
+        self.pending: dict[str, Command] = {}
+        self.heap: list[tuple[int, int, str]] = []
+        self.max_depth = 0
+        self.task: asyncio.Task | None = None
+
+
+class ServiceDispatcher:
+    """Rate-limit, prioritize and coalesce device commands of all entries."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self._queues: dict[str, MeshQueue] = {}
+        self._sequence = itertools.count()
+        self.sent = 0
+        self.coalesced = 0
+        self.max_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of commands waiting in all queues."""
+        return sum(len(queue.pending) for queue in self._queues.values())
+
+    def metrics(self) -> dict[str, Any]:
+        """Return queue statistics for diagnostics."""
+        return {
+            "queue_depth": self.queue_depth,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "max_wait_s": round(self.max_wait, 2),
+            "meshes": {
+                name: {"depth": len(queue.pending), "max_depth": queue.max_depth}
+                for name, queue in self._queues.items()
+            },
+        }
+
+    @callback
+    def async_enqueue(
+        self,
+        entity_id: str,
+        domain: str,
+        service: str,
+        data: dict[str, Any],
+        priority: int = PRIORITY_NORMAL,
+    ) -> asyncio.Future[bool]:
+        """Queue a command without waiting for it to be sent.
+
+        The returned future is True once the command was sent, False if a
+        newer command for the same entity replaced it first, or holds the
+        error of the service call.
+        """
+        queue = self._queue(entity_id)
+        future = self.hass.loop.create_future()
+        command = Command(domain, service, data, priority, time.monotonic(), future)
+
+        if (previous := queue.pending.get(entity_id)) is not None:
+            # Superseded before it was sent; keep its place if it was more
+            # urgent, so an away setback is not delayed by a later boost
+            self.coalesced += 1
+            command.priority = min(priority, previous.priority)
+            command.queued_at = previous.queued_at
+            if not previous.future.done():
+                previous.future.set_result(False)
+        queue.pending[entity_id] = command
+        heapq.heappush(queue.heap, (command.priority, next(self._sequence), entity_id))
+        queue.max_depth = max(queue.max_depth, len(queue.pending))
+
+        # The worker starts eagerly and may already have drained the queue
+        if queue.task is None or queue.task.done():
+            queue.task = self.hass.async_create_background_task(
+                self._async_run(queue), f"{DOMAIN} dispatcher {queue.name}"
+            )
+        return future
+
+    def _queue(self, entity_id: str) -> MeshQueue:
+        """Return the queue of the mesh providing an entity."""
+        entry = er.async_get(self.hass).async_get(entity_id)
+        name = entry.platform if entry else "default"
+        if (queue := self._queues.get(name)) is None:
+            queue = self._queues[name] = MeshQueue(name)
+        return queue
+
+    async def _async_run(self, queue: MeshQueue) -> None:
+        """Send the queued commands of one mesh as tokens become available.
+
+        The worker ends once the queue is drained; the next command starts
+        a new one.
+        """
+        while queue.heap:
+            priority, _, entity_id = heapq.heappop(queue.heap)
+            command = queue.pending.get(entity_id)
+            if command is None or command.priority != priority:
+                # A stale heap entry of a coalesced command
+                continue
+
+            if delay := queue.bucket.delay():
+                await asyncio.sleep(delay)
+            # The command may have been replaced while waiting for a token
+            command = queue.pending.pop(entity_id)
+            self.max_wait = max(self.max_wait, time.monotonic() - command.queued_at)
+            await self._async_send(command)
+
+    async def _async_send(self, command: Command) -> None:
+        """Make one service call and hand the outcome to its waiter."""
+        try:
+            async with asyncio.timeout(CALL_TIMEOUT):
+                await self.hass.services.async_call(
+                    command.domain, command.service, command.data, blocking=True
+                )
+        except Exception as err:  # noqa: BLE001
+            if not command.future.done():
+                command.future.set_exception(err)
+            return
+        self.sent += 1
+        if not command.future.done():
+            command.future.set_result(True)
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the mesh workers and fail the queued commands."""
+        for queue in self._queues.values():
+            if queue.task is not None:
+                queue.task.cancel()
+            for command in queue.pending.values():
+                if not command.future.done():
+                    command.future.cancel()
+        self._queues.clear()
+
+
+@callback
+def async_get_dispatcher(hass: HomeAssistant) -> ServiceDispatcher:
+    """Return the dispatcher shared by all entries, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (dispatcher := domain_data.get(DATA_DISPATCHER)) is None:
+        dispatcher = domain_data[DATA_DISPATCHER] = ServiceDispatcher(hass)
+    return dispatcher
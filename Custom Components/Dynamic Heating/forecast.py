@@ -0,0 +1,298 @@
+"""Spot price forecasting for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+import logging
+import math
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_OUTDOOR_TEMP_SENSOR, CONF_PRICE_SENSOR, DOMAIN
+from .history import HISTORY_LOOKBACK, HistoryWarmup
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 600
+
+HOUR = 3600
+
+# Bias, hour of day one-hot, weekend, outdoor temperature, price a day earlier
+FEATURES = 1 + 24 + 1 + 1 + 1
+
+RIDGE_PENALTY = 1.0
+
+# Older observations fade out with a half-life of about two weeks
+FORGETTING = 0.998
+
+# Hours of history needed before predictions are made
+MIN_TRAINING_ROWS = 48
+
+# Share of the seasonal-naive price (same hour a week earlier) in the blend
+SEASONAL_WEIGHT = 0.3
+
+# Prices kept for the lag features, and trained hours remembered so history
+# replayed after a restart is not counted twice, in hours
+PRICE_MEMORY = 8 * 24
+TRAINED_MEMORY = int(HISTORY_LOOKBACK.total_seconds() // HOUR)
+
+
+class PriceForecaster:
+    """Predict hourly spot prices past the published horizon.
+
+    A ridge regression on hour of day, weekend, outdoor temperature and the
+    price a day earlier is blended with a seasonal-naive forecast. The normal
+    equations are accumulated one observation at a time with exponential
+    forgetting, so training never revisits old rows and solving the small
+    system takes a few milliseconds in plain Python.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        config: Mapping[str, Any],
+        history: HistoryWarmup,
+    ) -> None:
+        """Initialize the forecaster from the entry's merged config."""
+        self.hass = hass
+        self._price_entity: str = config[CONF_PRICE_SENSOR]
+        self._outdoor_entity: str | None = config.get(CONF_OUTDOOR_TEMP_SENSOR)
+        self._history = history
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.forecast"
+        )
+
+        # Hourly prices and temperatures keyed by hours since the epoch (UTC)
+        self._prices: dict[int, float] = {}
+        self._temperatures: dict[int, float] = {}
+
+        self._xtx = [[0.0] * FEATURES for _ in range(FEATURES)]
+        self._xty = [0.0] * FEATURES
+        self._rows = 0
+        self._trained: set[int] = set()
+        self._weights: list[float] | None = None
+        self._temperature_mean = 0.0
+
+    @property
+    def ready(self) -> bool:
+        """Return True once enough history was seen to forecast."""
+        return self._rows >= MIN_TRAINING_ROWS
+
+    async def async_load(self) -> None:
+        """Restore the trained model."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        self._xtx = stored["xtx"]
+        self._xty = stored["xty"]
+        self._rows = stored["rows"]
+        self._trained = set(stored["trained"])
+        self._temperature_mean = stored.get("temperature_mean", 0.0)
+        self._prices = {int(hour): price for hour, price in stored["prices"].items()}
+        self._temperatures = {
+            int(hour): temp for hour, temp in stored["temperatures"].items()
+        }
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Train on recorder history once it is available."""
+        return self._history.async_add_listener(self._async_learn_history)
+
+    @callback
+    def _async_learn_history(self) -> None:
+        """Train on price statistics the model has not seen yet."""
+        if self._outdoor_entity:
+            for timestamp, temp in self._history.statistics(self._outdoor_entity):
+                self._temperatures.setdefault(int(timestamp // HOUR), temp)
+
+        hours = []
+        for timestamp, price in self._history.statistics(self._price_entity):
+            hour = int(timestamp // HOUR)
+            self._prices.setdefault(hour, price)
+            hours.append(hour)
+
+        self._train(hours, int(dt_util.utcnow().timestamp() // HOUR))
+        _LOGGER.debug("Price forecaster trained on %d hours", self._rows)
+
+    @callback
+    def async_observe(
+        self, slots: list[dict[str, Any]], outdoor_temp: float | None
+    ) -> None:
+        """Record published prices and train on hours that have passed."""
+        sums: dict[int, list[float]] = {}
+        for slot in slots:
+            if slot.get("predicted"):
+                continue
+            hour = int(slot["hour"].timestamp() // HOUR)
+            sums.setdefault(hour, []).append(slot["price"])
+        for hour, prices in sums.items():
+            self._prices[hour] = sum(prices) / len(prices)
+
+        current = int(dt_util.utcnow().timestamp() // HOUR)
+        if outdoor_temp is not None:
+            self._temperatures[current] = outdoor_temp
+
+        self._train(sorted(self._prices), current)
+
+    def _train(self, hours: list[int], current: int) -> None:
+        """Add the completed, not yet trained hours to the normal equations."""
+        trained = False
+        for hour in hours:
+            if hour >= current or hour in self._trained:
+                continue
+            price = self._prices.get(hour)
+            features = self._features(hour, self._prices, None)
+            if price is None or features is None:
+                continue
+            self._add_row(features, price)
+            self._trained.add(hour)
+            trained = True
+
+        # Only the lag features look back, so older prices can be dropped
+        oldest = current - PRICE_MEMORY
+        for cache in (self._prices, self._temperatures):
+            for hour in [hour for hour in cache if hour < oldest]:
+                del cache[hour]
+        self._trained = {
+            hour for hour in self._trained if hour >= current - TRAINED_MEMORY
+        }
+
+        if trained:
+            self._weights = None
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _add_row(self, features: list[float], price: float) -> None:
+        """Fold one observation into the decayed normal equations."""
+        xtx = self._xtx
+        xty = self._xty
+        for i, x_i in enumerate(features):
+            row = xtx[i]
+            for j in range(i, FEATURES):
+                row[j] = row[j] * FORGETTING + x_i * features[j]
+            xty[i] = xty[i] * FORGETTING + x_i * price
+        self._rows += 1
+
+        temp = features[-2]
+        self._temperature_mean += (temp - self._temperature_mean) / min(
+            self._rows, 24 * 14
+        )
+
+    def _features(
+        self,
+        hour: int,
+        prices: dict[int, float],
+        outdoor_temp: float | None,
+    ) -> list[float] | None:
+        """Return the feature vector of an hour, or None without a lag price."""
+        previous_day = prices.get(hour - 24)
+        if previous_day is None:
+            return None
+
+        temp = self._temperatures.get(hour, outdoor_temp)
+        if temp is None:
+            temp = self._temperature_mean
+
+        local = dt_util.as_local(dt_util.utc_from_timestamp(hour * HOUR))
+        features = [0.0] * FEATURES
+        features[0] = 1.0
+        features[1 + local.hour] = 1.0
+        features[25] = 1.0 if local.weekday() >= 5 else 0.0
+        features[26] = temp
+        features[27] = previous_day
+        return features
+
+    def forecast(
+        self,
+        slots: list[dict[str, Any]],
+        resolution: timedelta,
+        horizon_end: datetime,
+        outdoor_temp: float | None,
+    ) -> list[dict[str, Any]]:
+        """Return predicted slots from the end of slots up to horizon_end."""
+        if not slots or not self.ready:
+            return []
+        if self._weights is None:
+            self._weights = _solve_ridge(self._xtx, self._xty, RIDGE_PENALTY)
+            if self._weights is None:
+                return []
+
+        weights = self._weights
+        prices = dict(self._prices)
+        predicted: list[dict[str, Any]] = []
+        # Step in UTC so the grid survives DST changes
+        start = dt_util.as_utc(slots[-1]["hour"]) + resolution
+
+        while start < horizon_end:
+            hour = int(start.timestamp() // HOUR)
+            if hour not in prices:
+                features = self._features(hour, prices, outdoor_temp)
+                if features is None:
+                    break
+                price = sum(w * x for w, x in zip(weights, features))
+                if (previous_week := prices.get(hour - 7 * 24)) is not None:
+                    price = (1 - SEASONAL_WEIGHT) * price + SEASONAL_WEIGHT * previous_week
+                # Later hours use this prediction as their lag price
+                prices[hour] = price
+
+            predicted.append(
+                {
+                    "hour": dt_util.as_local(start),
+                    "price": round(prices[hour], 5),
+                    "predicted": True,
+                }
+            )
+            start += resolution
+
+        return predicted
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "xtx": self._xtx,
+            "xty": self._xty,
+            "rows": self._rows,
+            "trained": sorted(self._trained),
+            "temperature_mean": self._temperature_mean,
+            "prices": self._prices,
+            "temperatures": self._temperatures,
+        }
+
+
+def _solve_ridge(
+    xtx: list[list[float]], xty: list[float], penalty: float
+) -> list[float] | None:
+    """Solve (XtX + penalty * I) w = Xty with a Cholesky decomposition.
+
+    Only the upper triangle of xtx is filled in. The bias is not penalized.
+    """
+    size = len(xty)
+    lower = [[0.0] * size for _ in range(size)]
+
+    for i in range(size):
+        for j in range(i + 1):
+            value = xtx[j][i] + (penalty if i == j and i else 0.0)
+            value -= sum(lower[i][k] * lower[j][k] for k in range(j))
+            if i == j:
+                if value <= 0:
+                    return None
+                lower[i][i] = math.sqrt(value)
+            else:
+                lower[i][j] = value / lower[j][j]
+
+    # Forward substitution for L y = b, then back substitution for L^T w = y
+    y = [0.0] * size
+    for i in range(size):
+        y[i] = (xty[i] - sum(lower[i][k] * y[k] for k in range(i))) / lower[i][i]
+
+    weights = [0.0] * size
+    for i in reversed(range(size)):
+        weights[i] = (
+            y[i] - sum(lower[k][i] * weights[k] for k in range(i + 1, size))
+        ) / lower[i][i]
+    return weights
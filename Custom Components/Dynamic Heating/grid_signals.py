@@ -0,0 +1,244 @@
+"""Grid signal inputs for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, State
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_CO2_SENSOR,
+    CONF_CO2_WEIGHT,
+    CONF_FLEX_SENSOR,
+    CONF_FLEX_WEIGHT,
+    CONF_SOLAR_SURPLUS_SENSOR,
+    CONF_SOLAR_SURPLUS_WEIGHT,
+    DEFAULT_CO2_WEIGHT,
+    DEFAULT_FLEX_WEIGHT,
+    DEFAULT_SOLAR_SURPLUS_WEIGHT,
+    SIGNAL_CO2,
+    SIGNAL_FLEX,
+    SIGNAL_SOLAR_SURPLUS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# (signal, sensor option, weight option, default weight, sign)
+# A positive sign makes the signal more expensive, a negative sign cheaper.
+SIGNAL_DEFINITIONS = [
+    (SIGNAL_CO2, CONF_CO2_SENSOR, CONF_CO2_WEIGHT, DEFAULT_CO2_WEIGHT, 1.0),
+    (SIGNAL_FLEX, CONF_FLEX_SENSOR, CONF_FLEX_WEIGHT, DEFAULT_FLEX_WEIGHT, 1.0),
+    (
+        SIGNAL_SOLAR_SURPLUS,
+        CONF_SOLAR_SURPLUS_SENSOR,
+        CONF_SOLAR_SURPLUS_WEIGHT,
+        DEFAULT_SOLAR_SURPLUS_WEIGHT,
+        -1.0,
+    ),
+]
+
+FORECAST_ATTRIBUTES = ["forecast", "forecasts", "detailedForecast", "data"]
+TIME_FIELDS = ["datetime", "timestamp", "start", "period_start", "from", "time"]
+VALUE_FIELDS = [
+    "value",
+    "carbonIntensity",
+    "intensity",
+    "pv_estimate",
+    "surplus",
+    "power",
+]
+# Fields holding the temperature in an outdoor temperature forecast
+TEMPERATURE_FIELDS = ["temperature", "native_temperature", "value"]
+
+# Interval = (start, end, value)
+Interval = tuple[datetime, datetime, float]
+
+
+def resample_onto_slots(
+    slot_starts: list[datetime],
+    slot_length: timedelta,
+    series: dict[str, list[Interval]],
+    missing: float | None = 0.0,
+) -> dict[str, list[float]]:
+    """Resample interval series onto the slot grid in a single pass.
+
+    Each slot gets the overlap-weighted mean of the intervals covering it,
+    or missing when nothing covers it. The default of 0.0 means a missing
+    signal never moves the score.
+    """
+    cursors = {name: 0 for name in series}
+    resampled: dict[str, list[float | None]] = {name: [] for name in series}
+
+    for slot_start in slot_starts:
+        slot_end = slot_start + slot_length
+
+        for name, intervals in series.items():
+            index = cursors[name]
+
+            # Skip intervals that ended before this slot; slots are sorted so
+            # they can never matter again.
+            while index < len(intervals) and intervals[index][1] <= slot_start:
+                index += 1
+            cursors[name] = index
+
+            weighted = 0.0
+            covered = 0.0
+            probe = index
+            while probe < len(intervals) and intervals[probe][0] < slot_end:
+                start, end, value = intervals[probe]
+                overlap = (min(end, slot_end) - max(start, slot_start)).total_seconds()
+                if overlap > 0:
+                    weighted += value * overlap
+                    covered += overlap
+                probe += 1
+
+            resampled[name].append(weighted / covered if covered else missing)
+
+    return resampled
+
+
+def forecast_points(
+    attributes: Mapping[str, Any], value_fields: list[str] = VALUE_FIELDS
+) -> list[tuple[datetime, float]]:
+    """Extract sorted (time, value) points from a forecast attribute."""
+    for attr_name in FORECAST_ATTRIBUTES:
+        data = attributes.get(attr_name)
+        if not isinstance(data, list):
+            continue
+
+        points = []
+        for entry in data:
+            if not isinstance(entry, dict):
+                continue
+
+            start_time = next(
+                (entry[field] for field in TIME_FIELDS if field in entry), None
+            )
+            value = next(
+                (entry[field] for field in value_fields if field in entry), None
+            )
+            if start_time is None or value is None:
+                continue
+
+            if isinstance(start_time, str):
+                start_time = dt_util.parse_datetime(start_time)
+            if not isinstance(start_time, datetime):
+                continue
+
+            try:
+                points.append((start_time, float(value)))
+            except (ValueError, TypeError):
+                continue
+
+        if points:
+            return sorted(points, key=lambda point: point[0])
+
+    return []
+
+
+def points_to_intervals(
+    points: list[tuple[datetime, float]], slot_length: timedelta, scale: float = 1.0
+) -> list[Interval]:
+    """Turn sorted forecast points into intervals lasting until the next point."""
+    intervals = []
+    for index, (start, value) in enumerate(points):
+        if index + 1 < len(points):
+            end = points[index + 1][0]
+        else:
+            end = start + slot_length
+        intervals.append((start, end, value * scale))
+    return intervals
+
+
+class GridSignalReader:
+    """Read optional grid signals and turn them into per-slot cost terms."""
+
+    def __init__(self, hass: HomeAssistant, config: Mapping[str, Any]) -> None:
+        """Initialize the grid signal reader with the entry's merged config."""
+        self.hass = hass
+        self.config = config
+
+    @property
+    def configured(self) -> bool:
+        """Return True if any grid signal sensor is configured."""
+        return any(
+            self.config.get(sensor_key)
+            for _, sensor_key, _, _, _ in SIGNAL_DEFINITIONS
+        )
+
+    def cost_terms(
+        self, slot_starts: list[datetime], slot_length: timedelta
+    ) -> tuple[list[float], dict[str, list[float]]]:
+        """Return the weighted cost term per slot and the resampled signals."""
+        if not slot_starts or not self.configured:
+            return [0.0] * len(slot_starts), {}
+
+        series: dict[str, list[Interval]] = {}
+        weights: dict[str, float] = {}
+
+        for signal, sensor_key, weight_key, default_weight, sign in SIGNAL_DEFINITIONS:
+            entity_id = self.config.get(sensor_key)
+            if not entity_id:
+                continue
+
+            state = self.hass.states.get(entity_id)
+            if not state:
+                _LOGGER.debug("Grid signal sensor %s not found", entity_id)
+                continue
+
+            intervals = self._read_intervals(state, slot_starts[0], slot_length)
+            if intervals:
+                series[signal] = intervals
+                weights[signal] = sign * float(
+                    self.config.get(weight_key, default_weight)
+                )
+
+        if not series:
+            return [0.0] * len(slot_starts), {}
+
+        resampled = resample_onto_slots(slot_starts, slot_length, series)
+
+        costs = [
+            sum(weights[signal] * values[index] for signal, values in resampled.items())
+            for index in range(len(slot_starts))
+        ]
+        return costs, resampled
+
+    def _read_intervals(
+        self, state: State, first_slot: datetime, slot_length: timedelta
+    ) -> list[Interval]:
+        """Read a signal sensor as a sorted list of intervals."""
+        scale = self._unit_scale(state)
+        if points := forecast_points(state.attributes):
+            return points_to_intervals(points, slot_length, scale)
+
+        # Without a forecast the current reading only says something about
+        # the slot we are in right now. Binary sensors (e.g. a DSO flexibility
+        # request) count as 1.0 while on.
+        if state.state in (STATE_ON, STATE_OFF):
+            value = 1.0 if state.state == STATE_ON else 0.0
+        else:
+            try:
+                value = float(state.state)
+            except (ValueError, TypeError):
+                return []
+
+        now = dt_util.now()
+        slot_end = first_slot + slot_length
+        while slot_end <= now:
+            slot_end += slot_length
+        return [(slot_end - slot_length, slot_end, value * scale)]
+
+    @staticmethod
+    def _unit_scale(state: State) -> float:
+        """Return the factor that converts power readings to kW."""
+        unit = state.attributes.get("unit_of_measurement")
+        if unit == "W":
+            return 0.001
+        if unit == "MW":
+            return 1000.0
+        return 1.0
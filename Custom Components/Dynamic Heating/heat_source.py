@@ -0,0 +1,263 @@
+"""Hybrid heat-source selection for Dynamic Heating Scheduler.
+
+Sites with a heat pump and a boiler (or a direct electric heater) choose, per
+slot, the source with the lowest cost per kWh of delivered heat: the
+electricity price divided by the heat pump's COP at the slot's forecast
+outdoor temperature, the fuel price divided by the boiler efficiency, or the
+electricity price for direct electric heating. A source only takes over from
+the running one when it is cheaper by a margin, so near-equal costs do not
+flip the sources from slot to slot.
+"""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+from collections.abc import Mapping
+from functools import partial
+import logging
+from typing import Any
+
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    SERVICE_TURN_OFF,
+    SERVICE_TURN_ON,
+    STATE_OFF,
+    STATE_ON,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    CONF_BOILER_EFFICIENCY,
+    CONF_BOILER_SWITCH,
+    CONF_COP_CURVE,
+    CONF_DIRECT_HEATER_SWITCH,
+    CONF_FUEL_PRICE,
+    CONF_HEAT_PUMP_SWITCH,
+    DEFAULT_BOILER_EFFICIENCY,
+    DEFAULT_FUEL_PRICE,
+)
+from .dispatcher import PRIORITY_HIGH, ServiceDispatcher
+
+_LOGGER = logging.getLogger(__name__)
+
+SOURCE_HEAT_PUMP = "heat_pump"
+SOURCE_BOILER = "boiler"
+SOURCE_DIRECT = "direct"
+
+# A typical air-to-water heat pump at 35 °C flow temperature
+DEFAULT_COP_CURVE = "-20=1.8; -15=2.1; -7=2.6; 2=3.3; 7=4.0; 12=4.6"
+
+# Outdoor temperature assumed when no sensor is configured
+DEFAULT_OUTDOOR_TEMP = 5.0
+
+# Fraction of the running source's cost another source must save to take over
+SWITCH_MARGIN = 0.05
+
+
+def parse_cop_curve(spec: str | None) -> list[tuple[float, float]]:
+    """Parse a COP curve such as "-7=2.6; 2=3.3; 7=4.0".
+
+    Returns (outdoor temperature, COP) points sorted by temperature. Raises
+    ValueError on malformed input or a COP that is not positive.
+    """
+    points = []
+    for part in (spec or DEFAULT_COP_CURVE).split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        temperature, _, cop = part.partition("=")
+        if not cop:
+            raise ValueError(f"Invalid COP curve point: {part}")
+        point = (float(temperature), float(cop))
+        if point[1] <= 0:
+            raise ValueError(f"COP must be positive: {part}")
+        points.append(point)
+    if not points:
+        raise ValueError("COP curve has no points")
+    return sorted(points)
+
+
+def cop_at(curve: list[tuple[float, float]], outdoor_temp: float) -> float:
+    """Interpolate the COP at an outdoor temperature, flat beyond the ends."""
+    temperatures = [point[0] for point in curve]
+    index = bisect_left(temperatures, outdoor_temp)
+    if index == 0:
+        return curve[0][1]
+    if index == len(curve):
+        return curve[-1][1]
+    (t0, c0), (t1, c1) = curve[index - 1], curve[index]
+    return c0 + (c1 - c0) * (outdoor_temp - t0) / (t1 - t0)
+
+
+def hybrid_configured(config: Mapping[str, Any]) -> bool:
+    """Return True if there is more than one heat source to choose from."""
+    return bool(
+        config.get(CONF_BOILER_SWITCH) or config.get(CONF_DIRECT_HEATER_SWITCH)
+    )
+
+
+def select_heat_sources(
+    prices: list[float],
+    outdoor_temp: float | None,
+    fuel_price: float | None,
+    config: Mapping[str, Any],
+    outdoor_forecast: list[float | None] | None = None,
+    current_source: str | None = None,
+) -> list[tuple[str, float]]:
+    """Return the source to run and its cost per kWh of heat for every slot.
+
+    Each slot uses its forecast outdoor temperature, falling back to the
+    current one. The source running before a slot keeps it unless another
+    is cheaper by more than SWITCH_MARGIN. This is a plain loop on purpose:
+    the horizon is a few hundred slots at most and the integration does not
+    require NumPy.
+    """
+    curve = parse_cop_curve(config.get(CONF_COP_CURVE))
+    if outdoor_temp is None:
+        outdoor_temp = DEFAULT_OUTDOOR_TEMP
+    cops: dict[float, float] = {}
+
+    boiler_cost = None
+    if config.get(CONF_BOILER_SWITCH):
+        if fuel_price is None:
+            fuel_price = config.get(CONF_FUEL_PRICE, DEFAULT_FUEL_PRICE)
+        efficiency = config.get(CONF_BOILER_EFFICIENCY, DEFAULT_BOILER_EFFICIENCY)
+        boiler_cost = fuel_price / (efficiency / 100)
+    direct = bool(config.get(CONF_DIRECT_HEATER_SWITCH))
+
+    sources = []
+    previous = current_source
+    for index, price in enumerate(prices):
+        temperature = outdoor_temp
+        if outdoor_forecast and outdoor_forecast[index] is not None:
+            temperature = outdoor_forecast[index]
+        if temperature not in cops:
+            cops[temperature] = cop_at(curve, temperature)
+
+        costs = {SOURCE_HEAT_PUMP: price / cops[temperature]}
+        if boiler_cost is not None:
+            costs[SOURCE_BOILER] = boiler_cost
+        # Only wins over a heat pump below a COP of 1, or when prices go
+        # negative
+        if direct:
+            costs[SOURCE_DIRECT] = price
+        best = min(costs, key=costs.__getitem__)
+
+        if (
+            previous in costs
+            and costs[previous] - costs[best] <= abs(costs[previous]) * SWITCH_MARGIN
+        ):
+            best = previous
+        sources.append((best, round(costs[best], 5)))
+        previous = best
+    return sources
+
+
+class HeatSourceSwitcher:
+    """Switch the configured heat sources to the chosen one."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: Mapping[str, Any],
+        dispatcher: ServiceDispatcher,
+    ) -> None:
+        """Initialize the switcher from the entry's merged config."""
+        self.hass = hass
+        self.dispatcher = dispatcher
+        self.switches = {
+            source: entity_id
+            for source, entity_id in (
+                (SOURCE_HEAT_PUMP, config.get(CONF_HEAT_PUMP_SWITCH)),
+                (SOURCE_BOILER, config.get(CONF_BOILER_SWITCH)),
+                (SOURCE_DIRECT, config.get(CONF_DIRECT_HEATER_SWITCH)),
+            )
+            if entity_id
+        }
+
+    @property
+    def active_source(self) -> str | None:
+        """Return the source whose switch is on, if any."""
+        for source, entity_id in self.switches.items():
+            if (state := self.hass.states.get(entity_id)) and state.state == STATE_ON:
+                return source
+        return None
+
+    @callback
+    def async_apply(self, source: str) -> None:
+        """Turn the chosen source on, then the others off.
+
+        The others are only switched off once the chosen source is on, so
+        the house is never left without heat if its call fails. A chosen
+        source that is missing or unavailable leaves every switch alone.
+        """
+        entity_id = self.switches.get(source)
+        if entity_id is None:
+            # A source without a switch of its own runs whenever the
+            # others are off
+            self._switch_others_off(source)
+            return
+
+        state = self.hass.states.get(entity_id)
+        if state is None or state.state == STATE_UNAVAILABLE:
+            _LOGGER.warning(
+                "Heat source %s is unavailable; keeping the current sources",
+                entity_id,
+            )
+            return
+        if state.state == STATE_ON:
+            self._switch_others_off(source)
+            return
+
+        future = self._switch(entity_id, True)
+
+        @callback
+        def chosen_switched(future: asyncio.Future[bool]) -> None:
+            if self._async_switched(entity_id, True, future):
+                self._switch_others_off(source)
+
+        future.add_done_callback(chosen_switched)
+
+    @callback
+    def _switch_others_off(self, source: str) -> None:
+        """Turn off every source but the chosen one."""
+        for name, entity_id in self.switches.items():
+            if name != source and (future := self._switch(entity_id, False)):
+                future.add_done_callback(
+                    partial(self._async_switched, entity_id, False)
+                )
+
+    @callback
+    def _switch(self, entity_id: str, on: bool) -> asyncio.Future[bool] | None:
+        """Queue switching a source; None if it already is or is unavailable."""
+        state = self.hass.states.get(entity_id)
+        if not state or state.state in (
+            STATE_UNAVAILABLE,
+            STATE_ON if on else STATE_OFF,
+        ):
+            return None
+        # Keeping the house heated is the most urgent write there is
+        return self.dispatcher.async_enqueue(
+            entity_id,
+            entity_id.split(".", 1)[0],
+            SERVICE_TURN_ON if on else SERVICE_TURN_OFF,
+            {ATTR_ENTITY_ID: entity_id},
+            PRIORITY_HIGH,
+        )
+
+    @callback
+    def _async_switched(
+        self, entity_id: str, on: bool, future: asyncio.Future[bool]
+    ) -> bool:
+        """Log the outcome of a switch; return True if it was sent."""
+        if future.cancelled():
+            return False
+        if (err := future.exception()) is not None:
+            _LOGGER.warning("Could not switch heat source %s: %s", entity_id, err)
+            return False
+        if not future.result():
+            # A newer command for the source replaced this one
+            return False
+        _LOGGER.info("Turned heat source %s %s", entity_id, "on" if on else "off")
+        return True
@@ -0,0 +1,209 @@
+"""Recorder history warm-up for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.history import state_changes_during_period
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_HOME_AWAY_SENSOR,
+    CONF_OUTDOOR_TEMP_SENSOR,
+    CONF_PRICE_SENSOR,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# How far back to look, how much to fetch per query and the hard row cap
+# per entity, so databases with years of data do not slow down startup
+HISTORY_LOOKBACK = timedelta(days=28)
+HISTORY_CHUNK = timedelta(days=7)
+HISTORY_MAX_ROWS = 5000
+
+
+class HistoryWarmup:
+    """Fetch bounded recorder history once and keep it cached locally.
+
+    Numeric sensors (price, outdoor temperature) are read from hourly
+    long-term statistics; the presence entity from state changes. Queries
+    run in the recorder's executor, one time chunk at a time, and only the
+    delta since the last fetch is loaded after a restart.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, config: Mapping[str, Any]
+    ) -> None:
+        """Initialize the warm-up from the entry's merged config."""
+        self.hass = hass
+        self.entry = entry
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.history"
+        )
+
+        self._statistic_ids = [
+            entity_id
+            for entity_id in (
+                config.get(CONF_PRICE_SENSOR),
+                config.get(CONF_OUTDOOR_TEMP_SENSOR),
+            )
+            if entity_id
+        ]
+        self._state_ids: list[str] = []
+        if away_sensor := config.get(CONF_HOME_AWAY_SENSOR):
+            self._state_ids.append(away_sensor)
+
+        # entity_id -> [(timestamp, value)], oldest first
+        self._statistics: dict[str, list[tuple[float, float]]] = {}
+        # entity_id -> [(timestamp, state)], oldest first
+        self._states: dict[str, list[tuple[float, str]]] = {}
+        self._fetched_until: dict[str, float] = {}
+        self._listeners: list[Callable[[], None]] = []
+        self.ready = False
+
+    def statistics(self, entity_id: str) -> list[tuple[float, float]]:
+        """Return cached hourly means for a numeric sensor."""
+        return self._statistics.get(entity_id, [])
+
+    def states(self, entity_id: str) -> list[tuple[float, str]]:
+        """Return cached state changes for an entity."""
+        return self._states.get(entity_id, [])
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Call update_callback once history is available."""
+        if self.ready:
+            update_callback()
+            return lambda: None
+
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            if update_callback in self._listeners:
+                self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    async def async_warm_up(self) -> None:
+        """Load the cache and fetch whatever history is missing."""
+        if stored := await self._store.async_load():
+            self._statistics = {
+                entity_id: [tuple(row) for row in rows]
+                for entity_id, rows in stored.get("statistics", {}).items()
+            }
+            self._states = {
+                entity_id: [tuple(row) for row in rows]
+                for entity_id, rows in stored.get("states", {}).items()
+            }
+            self._fetched_until = stored.get("fetched_until", {})
+
+        now = dt_util.utcnow()
+        oldest = (now - HISTORY_LOOKBACK).timestamp()
+
+        # The recorder is optional; without it the cache is all there is
+        if "recorder" in self.hass.config.components:
+            for entity_id in self._statistic_ids:
+                await self._async_fetch(entity_id, now, self._fetch_statistics)
+            for entity_id in self._state_ids:
+                await self._async_fetch(entity_id, now, self._fetch_states)
+
+        # Drop anything that fell out of the lookback window
+        for cache in (self._statistics, self._states):
+            for entity_id, rows in cache.items():
+                cache[entity_id] = [row for row in rows if row[0] >= oldest]
+
+        await self._store.async_save(
+            {
+                "statistics": self._statistics,
+                "states": self._states,
+                "fetched_until": self._fetched_until,
+            }
+        )
+
+        self.ready = True
+        for update_callback in self._listeners:
+            update_callback()
+        self._listeners.clear()
+
+    async def _async_fetch(
+        self,
+        entity_id: str,
+        now: datetime,
+        fetch: Callable[[str, datetime, datetime, int], list[tuple]],
+    ) -> None:
+        """Fetch the missing history of one entity in bounded chunks."""
+        start = now - HISTORY_LOOKBACK
+        if (fetched := self._fetched_until.get(entity_id)) is not None:
+            start = max(start, dt_util.utc_from_timestamp(fetched))
+
+        cache = self._statistics if fetch == self._fetch_statistics else self._states
+        rows = cache.setdefault(entity_id, [])
+        fetched_rows = 0
+        recorder = get_instance(self.hass)
+
+        while start < now and fetched_rows < HISTORY_MAX_ROWS:
+            end = min(start + HISTORY_CHUNK, now)
+            try:
+                chunk = await recorder.async_add_executor_job(
+                    fetch, entity_id, start, end, HISTORY_MAX_ROWS - fetched_rows
+                )
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.warning("Could not load history of %s: %s", entity_id, err)
+                return
+
+            # Chunks are half-open, skip a row we already have at the boundary
+            if rows and chunk and chunk[0][0] <= rows[-1][0]:
+                chunk = [row for row in chunk if row[0] > rows[-1][0]]
+            rows.extend(chunk)
+            fetched_rows += len(chunk)
+            if fetched_rows >= HISTORY_MAX_ROWS:
+                # The chunk was cut off at the row cap; the next warm-up
+                # continues after the last row instead of skipping the rest
+                self._fetched_until[entity_id] = rows[-1][0]
+                break
+            self._fetched_until[entity_id] = end.timestamp()
+            start = end
+
+        _LOGGER.debug("Loaded %d history rows for %s", fetched_rows, entity_id)
+
+    def _fetch_statistics(
+        self, entity_id: str, start: datetime, end: datetime, limit: int
+    ) -> list[tuple[float, float]]:
+        """Read hourly means from long-term statistics (recorder executor)."""
+        result = statistics_during_period(
+            self.hass, start, end, {entity_id}, "hour", None, {"mean"}
+        )
+        return [
+            (row["start"], row["mean"])
+            for row in result.get(entity_id, [])[:limit]
+            if row.get("mean") is not None
+        ]
+
+    def _fetch_states(
+        self, entity_id: str, start: datetime, end: datetime, limit: int
+    ) -> list[tuple[float, str]]:
+        """Read state changes from the recorder (recorder executor)."""
+        result = state_changes_during_period(
+            self.hass,
+            start,
+            end,
+            entity_id,
+            no_attributes=True,
+            limit=limit,
+            include_start_time_state=False,
+        )
+        return [
+            (state.last_changed.timestamp(), state.state)
+            for state in result.get(entity_id, [])
+        ]
@@ -0,0 +1,262 @@
+"""Storage loads for Dynamic Heating Scheduler.
+
+Hot-water tanks and switched heaters (an immersion heater, a buffer tank)
+do not follow a temperature curve; they need an amount of energy by a
+deadline and do not care when it arrives. The planner gives each load the
+cheapest slots before its deadline (see planner.schedule_loads), and this
+module tracks how much was delivered and switches the loads. Delivered
+energy is estimated from the rated power while a load is charging, and
+kept in a Store so a restart does not schedule the full amount again.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from functools import partial
+import logging
+import math
+from typing import Any
+
+from homeassistant.components.water_heater import (
+    DOMAIN as WATER_HEATER_DOMAIN,
+    SERVICE_SET_TEMPERATURE,
+)
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    ATTR_TEMPERATURE,
+    SERVICE_TURN_OFF,
+    SERVICE_TURN_ON,
+    STATE_OFF,
+    STATE_ON,
+    STATE_UNAVAILABLE,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_ZONE_CHARGE_TEMP,
+    CONF_ZONE_DEADLINE,
+    CONF_ZONE_ENERGY,
+    CONF_ZONE_HEATER_POWER,
+    CONF_ZONE_IDLE_TEMP,
+    CONF_ZONE_LOAD,
+    CONF_ZONES,
+    DEFAULT_ZONE_CHARGE_TEMP,
+    DEFAULT_ZONE_DEADLINE,
+    DEFAULT_ZONE_IDLE_TEMP,
+    DOMAIN,
+)
+from .dispatcher import PRIORITY_LOW, ServiceDispatcher
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+
+
+@dataclass(frozen=True, slots=True)
+class StorageLoad:
+    """A load that needs energy by a daily deadline."""
+
+    entity_id: str
+    power: float
+    energy: float
+    deadline: time
+    charge_temp: float
+    idle_temp: float
+
+    @property
+    def is_water_heater(self) -> bool:
+        """Return True if the load is a water_heater entity."""
+        return self.entity_id.startswith(f"{WATER_HEATER_DOMAIN}.")
+
+    @classmethod
+    def from_zone(cls, zone: dict[str, Any]) -> StorageLoad | None:
+        """Return the load of a zone, or None for a climate zone."""
+        entity_id = zone.get(CONF_ZONE_LOAD)
+        if not entity_id:
+            return None
+        return cls(
+            entity_id=entity_id,
+            power=float(zone[CONF_ZONE_HEATER_POWER]),
+            energy=float(zone[CONF_ZONE_ENERGY]),
+            deadline=dt_util.parse_time(
+                zone.get(CONF_ZONE_DEADLINE, DEFAULT_ZONE_DEADLINE)
+            ),
+            charge_temp=zone.get(CONF_ZONE_CHARGE_TEMP, DEFAULT_ZONE_CHARGE_TEMP),
+            idle_temp=zone.get(CONF_ZONE_IDLE_TEMP, DEFAULT_ZONE_IDLE_TEMP),
+        )
+
+
+class LoadScheduler:
+    """Track the energy delivered to storage loads and switch them."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        config: Mapping[str, Any],
+        dispatcher: ServiceDispatcher,
+    ) -> None:
+        """Initialize the scheduler from the entry's merged config."""
+        self.hass = hass
+        self.dispatcher = dispatcher
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.loads"
+        )
+        self.loads = [
+            load
+            for zone in config.get(CONF_ZONES, [])
+            if (load := StorageLoad.from_zone(zone)) is not None
+        ]
+        # entity_id -> (deadline of the current cycle, kWh delivered in it)
+        self._delivered: dict[str, tuple[datetime, float]] = {}
+        self._charging: set[str] = set()
+        self._since: datetime | None = None
+
+    async def async_load(self) -> None:
+        """Restore the energy delivered in the current cycles."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        entity_ids = {load.entity_id for load in self.loads}
+        for entity_id, (deadline, delivered) in stored.get("delivered", {}).items():
+            if entity_id not in entity_ids:
+                continue
+            # A cycle whose deadline passed while stopped starts over on the
+            # next booking
+            self._delivered[entity_id] = (dt_util.parse_datetime(deadline), delivered)
+
+    def requirements(self, resolution: timedelta) -> list[dict[str, Any]]:
+        """Return the slots each load still needs before its deadline."""
+        now = dt_util.now()
+        self._book(now)
+        slot_hours = resolution.total_seconds() / 3600
+        requirements = []
+        for load in self.loads:
+            deadline, delivered = self._delivered[load.entity_id]
+            remaining = load.energy - delivered
+            if self._tank_full(load):
+                remaining = 0.0
+            # A small tolerance keeps rounding from adding a slot
+            slots = math.ceil(remaining / (load.power * slot_hours) - 1e-6)
+            requirements.append(
+                {"id": load.entity_id, "slots": max(slots, 0), "deadline": deadline}
+            )
+        return requirements
+
+    @callback
+    def async_apply(self, charging: list[str]) -> None:
+        """Switch every load on or off to match the current slot.
+
+        Commands are queued with the dispatcher; a load counts as charging
+        once its command went through.
+        """
+        self._book(dt_util.now())
+        for load in self.loads:
+            on = load.entity_id in charging and not self._tank_full(load)
+            self._switch(load, on)
+
+    def _book(self, now: datetime) -> None:
+        """Add the energy of charging loads and start new cycles at deadlines."""
+        hours = 0.0
+        if self._since is not None:
+            hours = max((now - self._since).total_seconds() / 3600, 0.0)
+        self._since = now
+
+        for load in self.loads:
+            deadline, delivered = self._delivered.get(load.entity_id, (None, 0.0))
+            if load.entity_id in self._charging:
+                delivered += load.power * hours
+            if deadline is None or now >= deadline:
+                deadline, delivered = _next_deadline(now, load.deadline), 0.0
+            self._delivered[load.entity_id] = (deadline, delivered)
+
+        if self.loads:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _tank_full(self, load: StorageLoad) -> bool:
+        """Return True if a water heater already reports its charge temperature."""
+        if not load.is_water_heater:
+            return False
+        state = self.hass.states.get(load.entity_id)
+        current = state.attributes.get("current_temperature") if state else None
+        return current is not None and current >= load.charge_temp
+
+    @callback
+    def _switch(self, load: StorageLoad, on: bool) -> None:
+        """Command a load unless it is already in the wanted state."""
+        state = self.hass.states.get(load.entity_id)
+        if not state or state.state == STATE_UNAVAILABLE:
+            self._charging.discard(load.entity_id)
+            return
+
+        if load.is_water_heater:
+            target = load.charge_temp if on else load.idle_temp
+            if state.attributes.get(ATTR_TEMPERATURE) == target:
+                self._set_charging(load, on)
+                return
+            domain, service = WATER_HEATER_DOMAIN, SERVICE_SET_TEMPERATURE
+            data = {ATTR_ENTITY_ID: load.entity_id, ATTR_TEMPERATURE: target}
+        else:
+            if state.state == (STATE_ON if on else STATE_OFF):
+                self._set_charging(load, on)
+                return
+            domain = load.entity_id.split(".", 1)[0]
+            service = SERVICE_TURN_ON if on else SERVICE_TURN_OFF
+            data = {ATTR_ENTITY_ID: load.entity_id}
+
+        # Storage loads are the most flexible writes, so they go last
+        future = self.dispatcher.async_enqueue(
+            load.entity_id, domain, service, data, PRIORITY_LOW
+        )
+        future.add_done_callback(partial(self._async_switched, load, on))
+
+    @callback
+    def _async_switched(
+        self, load: StorageLoad, on: bool, future: asyncio.Future[bool]
+    ) -> None:
+        """Track a load once the dispatcher has sent its command."""
+        if future.cancelled():
+            return
+        if (err := future.exception()) is not None:
+            _LOGGER.warning("Could not switch %s: %s", load.entity_id, err)
+            return
+        if future.result():
+            _LOGGER.info(
+                "%s %s", "Charging" if on else "Stopped charging", load.entity_id
+            )
+            self._set_charging(load, on)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "delivered": {
+                entity_id: (deadline.isoformat(), delivered)
+                for entity_id, (deadline, delivered) in self._delivered.items()
+            }
+        }
+
+    def _set_charging(self, load: StorageLoad, on: bool) -> None:
+        """Record whether a load is charging."""
+        if on:
+            self._charging.add(load.entity_id)
+        else:
+            self._charging.discard(load.entity_id)
+
+
+def _next_deadline(now: datetime, deadline: time) -> datetime:
+    """Return the next local occurrence of a deadline time after now."""
+    local = dt_util.as_local(now)
+    candidate = local.replace(
+        hour=deadline.hour, minute=deadline.minute, second=0, microsecond=0
+    )
+    if candidate <= local:
+        candidate = datetime.combine(
+            local.date() + timedelta(days=1), deadline, local.tzinfo
+        )
+    return candidate
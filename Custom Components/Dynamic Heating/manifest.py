@@ -1,6 +1,7 @@
 {
   "domain": "dynamic_heating",
   "name": "Dynamic Heating Scheduler",
+  "after_dependencies": ["recorder"],
   "codeowners": ["@yourusername"],
   "config_flow": true,
   "dependencies": [],
@@ -0,0 +1,277 @@
+"""Receding-horizon model predictive control for Dynamic Heating Scheduler.
+
+Each zone is modelled as a single thermal mass losing heat to the outdoors:
+
+    T[k + 1] = r * T[k] + (1 - r) * T_out + g * u[k]
+
+with r = exp(-dt / tau), g the temperature rise of one slot at full power
+and u[k] the heater duty in [0, 1]. Every refresh the energy plan over the
+horizon is solved again from the measured room temperature, and only the
+setpoint for the current slot is applied.
+
+Scaling slot m by r^-m turns the model into cumulative form: heat added in
+slot j raises every later scaled temperature by the same amount. Comfort
+bounds become bounds on a running sum, which is a lot-sizing problem solved
+greedily: deficits are covered in time order from the cheapest earlier slot
+with spare power and headroom under the upper bound, then energy that is
+not needed is removed from the most expensive slots. This is pure and
+synchronous, like the planner, so it runs in an executor.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import math
+from typing import Any
+
+from .const import CONF_TEMP_MAX, PRICE_TIER_HIGH
+from .planner import is_comfort_hour, target_temperature
+
+# Amounts below this are treated as zero (scaled °C)
+EPSILON = 1e-6
+
+# Outdoor temperature assumed when no sensor is configured
+DEFAULT_OUTDOOR_TEMP = 5.0
+
+
+@dataclass(frozen=True, slots=True)
+class ZoneModel:
+    """Thermal model and limits of one zone."""
+
+    time_constant: float
+    heat_rate: float
+    heater_power: float
+
+
+@dataclass(slots=True)
+class MpcSolution:
+    """Heater duty per slot from a solve, kept to warm-start the next one."""
+
+    start: datetime
+    duty: list[float]
+    setpoint: float
+    predicted: list[float]
+
+
+class MpcController:
+    """Solve the zone energy plans and remember them for warm starts."""
+
+    def __init__(self) -> None:
+        """Initialize the controller."""
+        self._solutions: dict[str, MpcSolution] = {}
+
+    def solution(self, zone_id: str) -> MpcSolution | None:
+        """Return the last solution of a zone."""
+        return self._solutions.get(zone_id)
+
+    def forget(self, zone_ids: set[str]) -> None:
+        """Drop the warm starts of zones that are no longer controlled."""
+        for zone_id in set(self._solutions) - zone_ids:
+            del self._solutions[zone_id]
+
+    def solve_all(
+        self,
+        start: datetime,
+        resolution: timedelta,
+        costs: list[float],
+        lower: list[float],
+        upper: list[float],
+        outdoor_temp: float | None,
+        zones: dict[str, tuple[ZoneModel, float]],
+    ) -> dict[str, float]:
+        """Solve every zone and return the setpoint to apply now.
+
+        zones maps a zone id to its model and measured room temperature.
+        Slot bounds and costs are shared, only the models and starting
+        temperatures differ between zones.
+        """
+        setpoints = {}
+        for zone_id, (model, room_temp) in zones.items():
+            previous = self._solutions.get(zone_id)
+            warm = None
+            if previous is not None:
+                shift = round((start - previous.start) / resolution)
+                if 0 <= shift < len(previous.duty):
+                    warm = previous.duty[shift:]
+            solution = solve_zone(
+                start,
+                model,
+                room_temp,
+                outdoor_temp,
+                resolution,
+                costs,
+                lower,
+                upper,
+                warm,
+            )
+            self._solutions[zone_id] = solution
+            setpoints[zone_id] = solution.setpoint
+        return setpoints
+
+
+def solve_zone(
+    start: datetime,
+    model: ZoneModel,
+    room_temp: float,
+    outdoor_temp: float | None,
+    resolution: timedelta,
+    costs: list[float],
+    lower: list[float],
+    upper: list[float],
+    warm: list[float] | None = None,
+) -> MpcSolution:
+    """Plan the cheapest heater duty keeping a zone within its bounds.
+
+    lower[m] and upper[m] bound the temperature at the end of slot m, and
+    costs[m] is the price of a kWh in slot m.
+    """
+    slots = len(costs)
+    dt = resolution.total_seconds() / 3600
+    r = math.exp(-dt / model.time_constant)
+    gain = model.heat_rate * dt
+    t_out = DEFAULT_OUTDOOR_TEMP if outdoor_temp is None else outdoor_temp
+
+    # Scaled free response, bounds on the running sum of scaled heat, the
+    # most scaled heat each slot can deliver and what that heat costs
+    lo: list[float] = []
+    hi: list[float] = []
+    capacity: list[float] = []
+    unit_cost: list[float] = []
+    free = room_temp
+    scale = 1.0
+    for m in range(slots):
+        free = r * free + (1 - r) * t_out
+        scale /= r
+        lo.append((lower[m] - free) * scale)
+        hi.append((upper[m] - free) * scale)
+        weight = gain * scale
+        capacity.append(weight)
+        unit_cost.append(costs[m] * model.heater_power * dt / weight)
+
+    heat = [0.0] * slots
+    if warm:
+        heat = [
+            min(max(duty, 0.0), 1.0) * cap
+            for duty, cap in zip(warm + [0.0] * slots, capacity)
+        ]
+        if slots and _suffix_slack(heat, hi, positive=True)[0] < -EPSILON:
+            # The last plan overheats from here; start from nothing
+            heat = [0.0] * slots
+
+    by_cost = sorted(range(slots), key=unit_cost.__getitem__)
+
+    # Cover deficits in time order from the cheapest earlier slot
+    headroom = _suffix_slack(heat, hi, positive=True)
+    total = 0.0
+    for m in range(slots):
+        total += heat[m]
+        deficit = lo[m] - total
+        while deficit > EPSILON:
+            for j in by_cost:
+                if j > m or heat[j] >= capacity[j] - EPSILON:
+                    continue
+                amount = min(deficit, capacity[j] - heat[j], headroom[j])
+                if amount > EPSILON:
+                    break
+            else:
+                # Not enough power or headroom; heat as much as possible
+                break
+            heat[j] += amount
+            total += amount
+            deficit -= amount
+            _take_slack(headroom, j, amount)
+
+    # Remove energy no later bound needs, most expensive first
+    surplus = _suffix_slack(heat, lo, positive=False)
+    for j in reversed(by_cost):
+        amount = min(heat[j], surplus[j])
+        if amount > EPSILON:
+            heat[j] -= amount
+            _take_slack(surplus, j, amount)
+
+    # Predicted temperatures and the setpoint for this slot
+    predicted = []
+    temp = room_temp
+    for m in range(slots):
+        temp = r * temp + (1 - r) * t_out + gain * heat[m] / capacity[m]
+        predicted.append(round(temp, 2))
+
+    duty = [h / cap for h, cap in zip(heat, capacity)]
+    if not slots:
+        setpoint = room_temp
+    elif duty[0] > EPSILON:
+        # Ask for the temperature the heating should reach this slot
+        setpoint = min(max(predicted[0], lower[0]), upper[0])
+    else:
+        setpoint = lower[0]
+
+    return MpcSolution(
+        start=start, duty=duty, setpoint=setpoint, predicted=predicted
+    )
+
+
+def _suffix_slack(
+    heat: list[float], bounds: list[float], positive: bool
+) -> list[float]:
+    """Return, per slot, the smallest slack of its own and every later bound.
+
+    With positive, slack is bound minus running sum (room below an upper
+    bound); otherwise running sum minus bound (surplus above a lower one).
+    """
+    slack = []
+    total = 0.0
+    for amount, bound in zip(heat, bounds):
+        total += amount
+        slack.append(bound - total if positive else total - bound)
+    for m in range(len(slack) - 2, -1, -1):
+        slack[m] = min(slack[m], slack[m + 1])
+    return slack
+
+
+def _take_slack(slack: list[float], index: int, amount: float) -> None:
+    """Update suffix slacks after amount was used up from index onwards.
+
+    Every running sum from index on moves by amount, so their slacks drop
+    by it; earlier suffixes include those and can only drop to the new
+    minimum. This avoids recomputing the running sums.
+    """
+    for m in range(index, len(slack)):
+        slack[m] -= amount
+    floor = slack[index]
+    for m in range(index - 1, -1, -1):
+        if slack[m] <= floor:
+            break
+        slack[m] = floor
+
+
+def comfort_bounds(
+    plan: dict[str, dict[str, Any]],
+    config: Mapping[str, Any],
+    profile: str | None = None,
+) -> tuple[list[float], list[float]]:
+    """Return the lower and upper temperature bound of every plan slot.
+
+    The lower bound is what the slot needs at the highest price tier, so
+    MPC decides on its own when storing heat in a cheap slot pays off. It
+    never exceeds the planned target, which keeps away and empty-house
+    setbacks. With a profile, config must already include its overrides
+    and the profile's targets are used.
+    """
+    ceiling = config.get(CONF_TEMP_MAX, 25)
+    lower = [
+        min(
+            entry["group_targets"][profile] if profile else entry["target_temp"],
+            target_temperature(
+                PRICE_TIER_HIGH,
+                is_comfort_hour(datetime.fromisoformat(key), config)
+                if profile
+                else entry["is_comfort_hour"],
+                False,
+                False,
+                config,
+            ),
+        )
+        for key, entry in plan.items()
+    ]
+    return lower, [max(ceiling, bound) for bound in lower]
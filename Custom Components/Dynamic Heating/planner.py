@@ -0,0 +1,390 @@
+"""Heating planner for Dynamic Heating Scheduler.
+
+Everything in this module is pure and synchronous: it works on a snapshot
+of plain values captured by the coordinator and never touches hass, so it
+can run on the event loop or in an executor thread.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime, time, timedelta
+from typing import Any
+
+from .const import (
+    ATTR_PRICE_AVERAGE,
+    ATTR_PRICE_HIGH,
+    ATTR_PRICE_LOW,
+    CONF_COMFORT_END,
+    CONF_COMFORT_START,
+    CONF_COMFORT_TEMP,
+    CONF_ENABLE_COP_OPTIMIZATION,
+    CONF_OUTDOOR_TEMP_THRESHOLD,
+    CONF_PREHEAT_TIME,
+    CONF_TEMP_AWAY,
+    CONF_TEMP_BOOST,
+    CONF_TEMP_MAX,
+    CONF_TEMP_MIN,
+    CONF_TEMP_NORMAL,
+    CONF_TEMP_SETBACK,
+    CONF_TIER_COUNT,
+    CONF_TIER_METHOD,
+    CONF_TIER_OFFSETS,
+    DEFAULT_PREHEAT_TIME,
+    DEFAULT_TIER_COUNT,
+    DEFAULT_TIER_METHOD,
+    OCCUPANCY_EMPTY_THRESHOLD,
+    PRICE_TIER_HIGH,
+    PRICE_TIER_LOW,
+    PRICE_TIER_NORMAL,
+    TIER_METHOD_QUANTILE,
+)
+from .heat_source import hybrid_configured, select_heat_sources
+from .tiers import (
+    assign_tiers,
+    quantile_boundaries,
+    select,
+    tier_name,
+    tier_offsets,
+)
+
+# Inputs used when no refresh has captured the state machine yet
+EMPTY_INPUTS: dict[str, Any] = {
+    "away": False,
+    "loads": [],
+    "outdoor_temp": None,
+    "signal_costs": {},
+    "signals": {},
+}
+
+
+def price_statistics(hourly_prices: list[dict]) -> dict[str, float]:
+    """Return the low, high and average price of a price series."""
+    prices_only = [p["price"] for p in hourly_prices]
+    return {
+        ATTR_PRICE_LOW: min(prices_only),
+        ATTR_PRICE_HIGH: max(prices_only),
+        ATTR_PRICE_AVERAGE: sum(prices_only) / len(prices_only),
+    }
+
+
+def calculate_plan(
+    hourly_prices: list[dict],
+    price_stats: dict[str, float],
+    inputs: Mapping[str, Any],
+    config: Mapping[str, Any],
+    profiles: Mapping[str, Mapping[str, Any]] | None = None,
+) -> dict:
+    """Calculate the heating plan based on price tiers.
+
+    profiles maps the name of each zone group profile to its overrides of
+    config. Tiers, loads and heat sources are shared; every profile only
+    adds its own target per slot under "group_targets".
+    """
+    plan = {}
+
+    signal_costs = inputs["signal_costs"]
+    signals = inputs["signals"]
+    occupancy = inputs.get("occupancy", {})
+    current_slot = inputs.get("current_slot")
+
+    keys = [hour_data["hour"].isoformat() for hour_data in hourly_prices]
+    scores = [
+        hour_data["price"] + signal_costs.get(key, 0.0)
+        for hour_data, key in zip(hourly_prices, keys)
+    ]
+
+    # Quantile tiers carry an index and their own temperature offset;
+    # the classic three tiers use the tier temperatures directly
+    tier_indexes: list[int] | None = None
+    offsets: list[float] = []
+    count = int(config.get(CONF_TIER_COUNT, DEFAULT_TIER_COUNT))
+    if config.get(CONF_TIER_METHOD, DEFAULT_TIER_METHOD) == TIER_METHOD_QUANTILE:
+        tier_indexes = assign_tiers(scores, quantile_boundaries(scores, count))
+        offsets = tier_offsets(count, config.get(CONF_TIER_OFFSETS), config)
+        tiers = [tier_name(index, count) for index in tier_indexes]
+    else:
+        tiers = range_tiers(scores, price_stats)
+
+    # Each distinct profile is resolved once, however many zones share it
+    profile_configs = {
+        name: {**config, **overrides} for name, overrides in (profiles or {}).items()
+    }
+    profile_offsets = {}
+    if tier_indexes is not None:
+        profile_offsets = {
+            name: tier_offsets(count, profile.get(CONF_TIER_OFFSETS), profile)
+            for name, profile in profile_configs.items()
+        }
+
+    # Cheapest heat source per slot, from the same prices
+    heat_sources = None
+    if hybrid_configured(config):
+        outdoor_forecast = inputs.get("outdoor_forecast", {})
+        heat_sources = select_heat_sources(
+            [hour_data["price"] for hour_data in hourly_prices],
+            inputs["outdoor_temp"],
+            inputs.get("fuel_price"),
+            config,
+            [outdoor_forecast.get(key) for key in keys],
+            inputs.get("heat_source"),
+        )
+
+    # Storage loads share the scores, one selection per load
+    charging = schedule_loads(
+        [hour_data["hour"] for hour_data in hourly_prices],
+        scores,
+        inputs.get("loads", []),
+    )
+
+    for index, hour_data in enumerate(hourly_prices):
+        hour = hour_data["hour"]
+        key = keys[index]
+        price = hour_data["price"]
+        score = scores[index]
+        tier = tiers[index]
+        offset = offsets[tier_indexes[index]] if tier_indexes is not None else None
+
+        # Check if within comfort hours
+        comfort_hour = is_comfort_hour(hour, config)
+
+        # Check COP optimization
+        boost_for_cop = should_boost_for_cop(tier, inputs["outdoor_temp"], config)
+
+        # The away sensor describes now; later slots follow the learned
+        # occupancy when there is one, and never boost an empty house. The
+        # current slot counts as empty while away so it can be pre-heated
+        away = inputs["away"]
+        probability = occupancy.get(key)
+        likely_empty = False
+        if probability is not None:
+            if key == current_slot:
+                likely_empty = away
+            else:
+                likely_empty = probability < OCCUPANCY_EMPTY_THRESHOLD
+                away = away and likely_empty
+        if likely_empty:
+            comfort_hour = boost_for_cop = False
+            if tier == PRICE_TIER_LOW:
+                tier_for_temp = PRICE_TIER_NORMAL
+            else:
+                tier_for_temp = tier
+            if offset is not None:
+                offset = min(offset, 0.0)
+        else:
+            tier_for_temp = tier
+
+        plan[key] = {
+            "tier": tier,
+            "price": price,
+            "spot_price": hour_data["spot_price"],
+            "score": round(score, 5),
+            "is_comfort_hour": comfort_hour,
+            "boost_for_cop": boost_for_cop,
+            "target_temp": target_temperature(
+                tier_for_temp, comfort_hour, boost_for_cop, away, config, offset
+            ),
+        }
+
+        if tier_indexes is not None:
+            plan[key]["tier_index"] = tier_indexes[index]
+            plan[key]["tier_offset"] = offset
+
+        if profile_configs:
+            group_targets = {}
+            for name, profile in profile_configs.items():
+                profile_offset = None
+                if tier_indexes is not None:
+                    profile_offset = profile_offsets[name][tier_indexes[index]]
+                    if likely_empty:
+                        profile_offset = min(profile_offset, 0.0)
+                group_targets[name] = target_temperature(
+                    tier_for_temp,
+                    not likely_empty and is_comfort_hour(hour, profile),
+                    boost_for_cop,
+                    away,
+                    profile,
+                    profile_offset,
+                )
+            plan[key]["group_targets"] = group_targets
+
+        if probability is not None:
+            plan[key]["occupancy"] = round(probability, 2)
+            plan[key]["likely_empty"] = likely_empty
+
+        if hour_data.get("interpolated"):
+            plan[key]["interpolated"] = True
+
+        if hour_data.get("predicted"):
+            plan[key]["predicted"] = True
+
+        if "source" in hour_data:
+            plan[key]["source"] = hour_data["source"]
+
+        if key in signals:
+            plan[key]["signals"] = signals[key]
+
+        if index in charging:
+            plan[key]["loads"] = charging[index]
+
+        if heat_sources is not None:
+            plan[key]["heat_source"], plan[key]["heat_cost"] = heat_sources[index]
+
+    if occupancy:
+        add_preheat(plan, config)
+
+    return plan
+
+
+def schedule_loads(
+    hours: list[datetime],
+    scores: list[float],
+    loads: list[dict[str, Any]],
+) -> dict[int, list[str]]:
+    """Pick the cheapest slots before each load's deadline.
+
+    loads holds the id, the number of slots still needed and the deadline of
+    every load. Returns the ids charging in each slot index. Each load costs
+    one linear-time selection over its window, so loads add little to a
+    replan.
+    """
+    charging: dict[int, list[str]] = {}
+    for load in loads:
+        needed = load["slots"]
+        if needed <= 0:
+            continue
+        deadline = load["deadline"]
+        window = [i for i, hour in enumerate(hours) if hour < deadline]
+        if needed < len(window):
+            # Everything cheaper than the needed-th cheapest slot, then the
+            # earliest slots at exactly that price
+            threshold = select([scores[i] for i in window], needed - 1)
+            chosen = [i for i in window if scores[i] < threshold]
+            chosen += [i for i in window if scores[i] == threshold][
+                : needed - len(chosen)
+            ]
+        else:
+            chosen = window
+        for index in chosen:
+            charging.setdefault(index, []).append(load["id"])
+    return charging
+
+
+def range_tiers(scores: list[float], price_stats: dict[str, float]) -> list[str]:
+    """Assign the classic low/normal/high tiers from the price range."""
+    avg_price = price_stats[ATTR_PRICE_AVERAGE]
+    low_price = price_stats[ATTR_PRICE_LOW]
+    high_price = price_stats[ATTR_PRICE_HIGH]
+
+    # Calculate thresholds for price tiers
+    # Low tier: bottom third between min and average
+    low_threshold = low_price + (avg_price - low_price) / 3
+    # High tier: top third between average and max
+    high_threshold = avg_price + (high_price - avg_price) * 2 / 3
+
+    tiers = []
+    for score in scores:
+        if score <= low_threshold:
+            tiers.append(PRICE_TIER_LOW)
+        elif score >= high_threshold:
+            tiers.append(PRICE_TIER_HIGH)
+        else:
+            tiers.append(PRICE_TIER_NORMAL)
+    return tiers
+
+
+def add_preheat(plan: dict, config: Mapping[str, Any]) -> None:
+    """Pre-heat empty slots leading up to a predicted arrival."""
+    lead = timedelta(minutes=config.get(CONF_PREHEAT_TIME, DEFAULT_PREHEAT_TIME))
+    arrival: datetime | None = None
+    arrival_plan: dict[str, Any] = {}
+
+    # Walk backwards so every empty slot knows the next occupied one
+    for key in reversed(list(plan)):
+        hour_plan = plan[key]
+        start = datetime.fromisoformat(key)
+        if not hour_plan.get("likely_empty"):
+            arrival, arrival_plan = start, hour_plan
+            continue
+        if arrival is not None and arrival - start <= lead:
+            hour_plan["preheat"] = True
+            hour_plan["target_temp"] = max(
+                hour_plan["target_temp"], arrival_plan["target_temp"]
+            )
+            for name, temp in hour_plan.get("group_targets", {}).items():
+                hour_plan["group_targets"][name] = max(
+                    temp, arrival_plan["group_targets"][name]
+                )
+
+
+def is_comfort_hour(hour: datetime, config: Mapping[str, Any]) -> bool:
+    """Check if the given hour is within comfort hours."""
+    comfort_start = config.get(CONF_COMFORT_START, "07:00")
+    comfort_end = config.get(CONF_COMFORT_END, "23:00")
+
+    # The time selector stores seconds too ("07:00:00")
+    start_time = time.fromisoformat(comfort_start)
+    end_time = time.fromisoformat(comfort_end)
+
+    hour_time = hour.time()
+
+    if start_time <= end_time:
+        return start_time <= hour_time < end_time
+    return hour_time >= start_time or hour_time < end_time
+
+
+def should_boost_for_cop(
+    tier: str, outdoor_temp: float | None, config: Mapping[str, Any]
+) -> bool:
+    """Determine if heating should be boosted for COP optimization."""
+    if not config.get(CONF_ENABLE_COP_OPTIMIZATION, False):
+        return False
+
+    if outdoor_temp is None:
+        return False
+
+    threshold = config.get(CONF_OUTDOOR_TEMP_THRESHOLD, -5)
+
+    # If outdoor temp is below threshold, boost during low-price hours
+    return outdoor_temp < threshold and tier == PRICE_TIER_LOW
+
+
+def target_temperature(
+    tier: str,
+    comfort_hour: bool,
+    boost_for_cop: bool,
+    away: bool,
+    config: Mapping[str, Any],
+    offset: float | None = None,
+) -> float:
+    """Get target temperature based on tier and conditions.
+
+    With an offset (quantile tiers) the tier temperature is the normal
+    temperature plus the offset instead of the tier's own temperature.
+    """
+    # Check if away mode is active
+    if away:
+        return config.get(CONF_TEMP_AWAY, 16)
+
+    # Comfort hours override
+    if comfort_hour:
+        return config.get(CONF_COMFORT_TEMP, 21)
+
+    # COP optimization boost
+    if boost_for_cop:
+        return config.get(CONF_TEMP_BOOST, 22)
+
+    # Standard tier-based temperatures
+    if offset is not None:
+        temp = config.get(CONF_TEMP_NORMAL, 20) + offset
+    elif tier == PRICE_TIER_LOW:
+        temp = config.get(CONF_TEMP_BOOST, 22)
+    elif tier == PRICE_TIER_HIGH:
+        temp = config.get(CONF_TEMP_SETBACK, 18)
+    else:
+        temp = config.get(CONF_TEMP_NORMAL, 20)
+
+    # Apply min/max constraints
+    temp_min = config.get(CONF_TEMP_MIN, 15)
+    temp_max = config.get(CONF_TEMP_MAX, 25)
+
+    return max(temp_min, min(temp_max, temp))
@@ -0,0 +1,257 @@
+"""Occupancy prediction for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_HOME, STATE_ON
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_HOME_AWAY_SENSOR, DOMAIN
+from .history import HistoryWarmup
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 300
+
+BUCKET = timedelta(minutes=15)
+BUCKETS_PER_DAY = 96
+BUCKETS_PER_WEEK = 7 * BUCKETS_PER_DAY
+
+# Counts are bytes; when a bucket saturates both counts are halved, which
+# also lets old habits fade out
+MAX_COUNT = 255
+
+# Buckets seen fewer times than this have no prediction
+MIN_OBSERVATIONS = 2
+
+
+def is_home(state: str | None) -> bool:
+    """Return True if a presence state means someone is home."""
+    return state in (STATE_HOME, STATE_ON)
+
+
+def bucket_index(moment: datetime) -> int:
+    """Return the week bucket (weekday and quarter hour) of a moment."""
+    local = dt_util.as_local(moment)
+    return (
+        local.weekday() * BUCKETS_PER_DAY
+        + (local.hour * 60 + local.minute) // 15
+    )
+
+
+def bucket_start(moment: datetime) -> datetime:
+    """Return the start of the quarter hour containing moment, in UTC."""
+    utc = dt_util.as_utc(moment)
+    return utc.replace(minute=utc.minute - utc.minute % 15, second=0, microsecond=0)
+
+
+class PresencePredictor:
+    """Learn per-weekday occupancy probabilities from a presence entity.
+
+    Each quarter hour of the week keeps two byte counters: how often it was
+    observed and how often someone was home. A state change only flags the
+    current bucket; buckets are committed as time passes, so handling a state
+    change is O(1).
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        config: Mapping[str, Any],
+        history: HistoryWarmup,
+    ) -> None:
+        """Initialize the predictor from the entry's merged config."""
+        self.hass = hass
+        self.entity_id: str | None = config.get(CONF_HOME_AWAY_SENSOR)
+        self._history = history
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.presence"
+        )
+
+        self._home = array("B", bytes(BUCKETS_PER_WEEK))
+        self._observed = array("B", bytes(BUCKETS_PER_WEEK))
+
+        # Start of the bucket currently being observed, and whether anyone
+        # was home at any point during it
+        self._bucket: datetime | None = None
+        self._bucket_home = False
+        self._is_home = False
+
+        # Everything before this moment was already counted in a previous run
+        self._counted_until: datetime | None = None
+
+    @property
+    def configured(self) -> bool:
+        """Return True if a presence entity is configured."""
+        return self.entity_id is not None
+
+    async def async_load(self) -> None:
+        """Restore the learned counts."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        self._home = array("B", bytes.fromhex(stored["home"]))
+        self._observed = array("B", bytes.fromhex(stored["observed"]))
+        if stored.get("bucket"):
+            self._counted_until = dt_util.parse_datetime(stored["bucket"])
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start learning from the presence entity."""
+        if not self.configured:
+            return lambda: None
+
+        self._is_home = self._read_is_home()
+
+        unsub_history = self._history.async_add_listener(self._async_replay_history)
+        unsub_state = async_track_state_change_event(
+            self.hass, [self.entity_id], self._async_presence_changed
+        )
+
+        @callback
+        def stop() -> None:
+            unsub_history()
+            unsub_state()
+
+        return stop
+
+    @callback
+    def _async_presence_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Record a presence change."""
+        # Close the buckets that passed in the old state first
+        self.async_tick()
+        new_state = event.data["new_state"]
+        self._is_home = is_home(new_state.state if new_state else None)
+        if self._is_home:
+            self._bucket_home = True
+
+    @callback
+    def async_tick(self) -> None:
+        """Commit the buckets that ended since the last call."""
+        if not self.configured:
+            return
+
+        current = bucket_start(dt_util.utcnow())
+        if self._bucket is None:
+            # The first refresh runs before async_start, so read the entity
+            # rather than trust the default
+            self._is_home = self._read_is_home()
+            self._bucket = current
+            self._bucket_home = self._is_home
+            return
+
+        committed = False
+        while self._bucket < current:
+            self._observe(bucket_index(self._bucket), self._bucket_home)
+            self._bucket += BUCKET
+            self._bucket_home = self._is_home
+            committed = True
+
+        if committed:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _read_is_home(self) -> bool:
+        """Return True if the presence entity currently says home."""
+        state = self.hass.states.get(self.entity_id)
+        return is_home(state.state if state else None)
+
+    @callback
+    def _async_replay_history(self) -> None:
+        """Learn from recorder history the predictor has not seen yet."""
+        changes = self._history.states(self.entity_id)
+        if not changes:
+            return
+
+        # Replay up to the bucket live observation started at, skipping what
+        # a previous run already counted
+        end = self._bucket or bucket_start(dt_util.utcnow())
+        start = bucket_start(dt_util.utc_from_timestamp(changes[0][0]))
+        if self._counted_until is not None:
+            start = max(start, self._counted_until)
+
+        index = 0
+        home = False
+        while index < len(changes) and changes[index][0] < start.timestamp():
+            home = is_home(changes[index][1])
+            index += 1
+
+        bucket = start
+        while bucket < end:
+            bucket_end = (bucket + BUCKET).timestamp()
+            home_in_bucket = home
+            while index < len(changes) and changes[index][0] < bucket_end:
+                home = is_home(changes[index][1])
+                home_in_bucket = home_in_bucket or home
+                index += 1
+            self._observe(bucket_index(bucket), home_in_bucket)
+            bucket += BUCKET
+
+        self._counted_until = end
+        if self._bucket is None:
+            self._bucket = end
+            self._bucket_home = self._is_home
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        _LOGGER.debug("Learned presence from %d history changes", len(changes))
+
+    def _observe(self, index: int, home: bool) -> None:
+        """Count one observation of a bucket."""
+        if self._observed[index] == MAX_COUNT:
+            self._observed[index] //= 2
+            self._home[index] //= 2
+        self._observed[index] += 1
+        if home:
+            self._home[index] += 1
+
+    def probability(self, moment: datetime) -> float | None:
+        """Return the probability that someone is home at moment."""
+        index = bucket_index(moment)
+        observed = self._observed[index]
+        if observed < MIN_OBSERVATIONS:
+            return None
+        # Laplace smoothing keeps single observations from being absolute
+        return (self._home[index] + 1) / (observed + 2)
+
+    def occupancy(
+        self, slots: list[datetime], resolution: timedelta
+    ) -> list[float | None]:
+        """Return the mean occupancy probability of each slot."""
+        if not self.configured:
+            return [None] * len(slots)
+
+        buckets = max(1, resolution // BUCKET)
+        result: list[float | None] = []
+        for slot in slots:
+            probabilities = [
+                probability
+                for offset in range(buckets)
+                if (probability := self.probability(slot + offset * BUCKET))
+                is not None
+            ]
+            result.append(
+                sum(probabilities) / len(probabilities) if probabilities else None
+            )
+        return result
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "home": self._home.tobytes().hex(),
+            "observed": self._observed.tobytes().hex(),
+            "bucket": self._bucket.isoformat() if self._bucket else None,
+        }
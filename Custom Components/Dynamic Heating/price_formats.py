@@ -0,0 +1,195 @@
+"""Declarative price formats for Dynamic Heating Scheduler.
+
+Each supported integration is described by a PriceFormat: which attributes
+hold the prices, which fields carry the start time and price, and how to
+scale them. Supporting another integration means adding a spec to
+PRICE_FORMATS (or calling register_price_format), not writing a parser.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+SHAPE_LIST = "list"
+SHAPE_MAPPING = "mapping"
+
+# Turns state attributes into [{"hour": datetime, "price": float}] entries
+Extractor = Callable[[Mapping[str, Any], datetime], list[dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class PriceFormat:
+    """How one integration publishes prices in its state attributes.
+
+    Entries are read from every attribute in attributes, in order. For list
+    attributes the first of time_fields and price_fields present in the
+    entries is used; mapping attributes map timestamps to prices. Numeric
+    timestamps are epoch seconds divided by epoch_unit (1000 for
+    milliseconds), and prices are multiplied by price_scale.
+    """
+
+    name: str
+    attributes: tuple[str, ...]
+    time_fields: tuple[str, ...] = ()
+    price_fields: tuple[str, ...] = ()
+    shapes: tuple[str, ...] = (SHAPE_LIST,)
+    epoch_unit: float = 1.0
+    price_scale: float = 1.0
+
+
+PRICE_FORMATS: list[PriceFormat] = [
+    PriceFormat("nordpool", ("raw_today", "raw_tomorrow"), ("start",), ("value",)),
+    PriceFormat("amber", ("forecasts",), ("start_time",), ("per_kwh",)),
+    PriceFormat(
+        "octopus",
+        ("rates",),
+        ("start", "valid_from"),
+        ("value_inc_vat", "value"),
+    ),
+    PriceFormat("entsoe", ("prices",), shapes=(SHAPE_MAPPING,)),
+    PriceFormat("tibber", ("today", "tomorrow"), ("startsAt",), ("total",)),
+    PriceFormat(
+        "awattar",
+        ("data",),
+        ("start_timestamp",),
+        ("marketprice",),
+        epoch_unit=1000,
+        # aWATTar market prices are per MWh, everything else per kWh
+        price_scale=0.001,
+    ),
+    PriceFormat(
+        "generic_forecast",
+        ("forecast",),
+        ("datetime", "timestamp", "start", "time"),
+        ("price", "value", "amount", "rate"),
+    ),
+    PriceFormat(
+        "generic_attributes",
+        (
+            "prices",
+            "hourly_prices",
+            "price_data",
+            "energy_prices",
+            "electricity_prices",
+        ),
+        ("datetime", "timestamp", "start", "time", "hour"),
+        ("price", "value", "amount", "rate", "cost"),
+        shapes=(SHAPE_LIST, SHAPE_MAPPING),
+    ),
+]
+
+
+def register_price_format(price_format: PriceFormat) -> None:
+    """Add a price format, checked before the generic ones."""
+    PRICE_FORMATS.insert(len(PRICE_FORMATS) - 2, price_format)
+
+
+def attribute_signature(attributes: Mapping[str, Any]) -> tuple:
+    """Return the shape of the price-like attributes of a state.
+
+    Two states with the same signature are parsed by the same extractor,
+    so detection only has to run when the shape changes.
+    """
+    signature = []
+    for name, value in attributes.items():
+        if isinstance(value, Mapping):
+            signature.append((name, SHAPE_MAPPING, None))
+        elif isinstance(value, list) and value:
+            first = value[0]
+            keys = frozenset(first) if isinstance(first, Mapping) else None
+            signature.append((name, SHAPE_LIST, keys))
+    return tuple(signature)
+
+
+def detect_price_format(
+    attributes: Mapping[str, Any],
+) -> tuple[PriceFormat, Extractor] | None:
+    """Find the first format whose structure matches and compile it."""
+    for price_format in PRICE_FORMATS:
+        if (extractor := compile_price_format(price_format, attributes)) is not None:
+            return price_format, extractor
+    return None
+
+
+def compile_price_format(
+    price_format: PriceFormat, attributes: Mapping[str, Any]
+) -> Extractor | None:
+    """Build an extractor for a format if the attributes have its shape.
+
+    Field fallbacks are resolved here, against the first entry, so the
+    returned extractor reads fixed keys without probing every entry.
+    """
+    sources: list[tuple[str, str, str | None, str | None]] = []
+    for name in price_format.attributes:
+        value = attributes.get(name)
+        if not value:
+            continue
+        if isinstance(value, Mapping) and SHAPE_MAPPING in price_format.shapes:
+            sources.append((name, SHAPE_MAPPING, None, None))
+        elif isinstance(value, list) and SHAPE_LIST in price_format.shapes:
+            first = value[0]
+            if not isinstance(first, Mapping):
+                continue
+            time_field = next((f for f in price_format.time_fields if f in first), None)
+            price_field = next(
+                (f for f in price_format.price_fields if first.get(f) is not None),
+                None,
+            )
+            if time_field is None or price_field is None:
+                continue
+            sources.append((name, SHAPE_LIST, time_field, price_field))
+
+    if not sources:
+        return None
+
+    epoch_unit = price_format.epoch_unit
+    price_scale = price_format.price_scale
+
+    def extract(
+        state_attributes: Mapping[str, Any], not_before: datetime
+    ) -> list[dict[str, Any]]:
+        prices = []
+        for name, shape, time_field, price_field in sources:
+            value = state_attributes.get(name)
+            if not value:
+                continue
+            if shape == SHAPE_MAPPING:
+                pairs = value.items() if isinstance(value, Mapping) else ()
+            else:
+                pairs = (
+                    (entry.get(time_field), entry.get(price_field))
+                    for entry in value
+                    if isinstance(entry, Mapping)
+                )
+            for start, price in pairs:
+                if start is None or price is None:
+                    continue
+                start = _parse_start(start, epoch_unit)
+                if start is None or start < not_before:
+                    continue
+                try:
+                    prices.append({"hour": start, "price": float(price) * price_scale})
+                except (TypeError, ValueError):
+                    continue
+        prices.sort(key=lambda entry: entry["hour"])
+        return prices
+
+    return extract
+
+
+def _parse_start(value: Any, epoch_unit: float) -> datetime | None:
+    """Turn a timestamp field into an aware datetime."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return dt_util.utc_from_timestamp(value / epoch_unit)
+    if isinstance(value, str):
+        try:
+            return dt_util.parse_datetime(value)
+        except ValueError:
+            return None
+    return None
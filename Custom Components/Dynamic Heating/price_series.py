@@ -0,0 +1,241 @@
+"""Price series normalization for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import heapq
+import math
+from statistics import fmean
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+DEFAULT_RESOLUTION = timedelta(hours=1)
+
+# Gaps up to this long are interpolated, longer ones are left as gaps
+MAX_INTERPOLATED_GAP = timedelta(hours=2)
+
+# Quality of a series that was fabricated from the sensor's current state
+SYNTHETIC_QUALITY = 0.2
+
+# How merged slots rank against each other, and what each adds to the quality
+SLOT_REAL = 0
+SLOT_INTERPOLATED = 1
+SLOT_SYNTHETIC = 2
+SLOT_WEIGHTS = {
+    SLOT_REAL: 1.0,
+    SLOT_INTERPOLATED: 0.5,
+    SLOT_SYNTHETIC: SYNTHETIC_QUALITY,
+}
+
+
+@dataclass
+class PriceSeries:
+    """A deduplicated price series aligned to a regular slot grid."""
+
+    slots: list[dict[str, Any]] = field(default_factory=list)
+    resolution: timedelta = DEFAULT_RESOLUTION
+    quality: float = 0.0
+    duplicates: int = 0
+    interpolated: int = 0
+    gaps: int = 0
+    synthetic: bool = False
+
+    def slot_start(self, moment: datetime) -> datetime:
+        """Return the start of the slot containing moment."""
+        return floor_to_resolution(moment, self.resolution)
+
+
+def floor_to_resolution(moment: datetime, resolution: timedelta) -> datetime:
+    """Floor a timestamp to the local slot grid.
+
+    Works on absolute time shifted by the local UTC offset, so the grid stays
+    aligned to local wall-clock slots across DST changes.
+    """
+    local = dt_util.as_local(moment)
+    offset = local.utcoffset().total_seconds()
+    step = resolution.total_seconds()
+    floored = (local.timestamp() + offset) // step * step - offset
+    return dt_util.as_local(dt_util.utc_from_timestamp(floored))
+
+
+def detect_resolution(starts: list[datetime]) -> timedelta:
+    """Return the most common distance between consecutive sorted slots."""
+    steps = Counter(
+        later - earlier
+        for earlier, later in zip(starts, starts[1:])
+        if later > earlier
+    )
+    if not steps:
+        return DEFAULT_RESOLUTION
+    return steps.most_common(1)[0][0]
+
+
+def normalize_prices(
+    raw: list[dict[str, Any]],
+    now: datetime,
+    horizon: timedelta,
+    resolution: timedelta | None = None,
+) -> PriceSeries:
+    """Clean parser output into a regular series covering the horizon.
+
+    Invalid prices are dropped, duplicate timestamps (e.g. around DST
+    changes) are merged, slots are aligned to the detected resolution (or
+    the given one, repeating coarser prices over its finer slots and
+    averaging finer prices over each slot) and short gaps are linearly
+    interpolated. The resulting quality score is the share of expected
+    slots backed by real data, with interpolated slots counting half.
+    """
+    synthetic = any(entry.get("synthetic") for entry in raw)
+
+    cleaned: list[tuple[datetime, float]] = []
+    for entry in raw:
+        start = entry.get("hour")
+        price = entry.get("price")
+        if not isinstance(start, datetime) or price is None:
+            continue
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            continue
+        if not math.isfinite(price):
+            continue
+        cleaned.append((dt_util.as_utc(start), price))
+
+    cleaned.sort(key=lambda item: item[0])
+    detected = detect_resolution([start for start, _ in cleaned])
+    if resolution is None:
+        resolution = detected
+    repeat = max(1, detected // resolution)
+    series = PriceSeries(resolution=resolution, synthetic=synthetic)
+
+    # Work in UTC internally: local wall-clock times repeat when DST ends
+    first_slot = dt_util.as_utc(series.slot_start(now))
+    horizon_end = first_slot + horizon
+
+    # Align to the grid and merge duplicates, keeping the last value seen
+    aligned: dict[datetime, float] = {}
+    # slot -> {sub-slot start: price} when the prices are finer than the grid
+    finer: dict[datetime, dict[datetime, float]] = {}
+    for start, price in cleaned:
+        first = dt_util.as_utc(series.slot_start(start))
+        if detected < resolution:
+            if first_slot <= first < horizon_end:
+                sub_slots = finer.setdefault(first, {})
+                if start in sub_slots:
+                    series.duplicates += 1
+                sub_slots[start] = price
+            continue
+        for index in range(repeat):
+            slot = first + index * resolution
+            if slot < first_slot or slot >= horizon_end:
+                continue
+            if slot in aligned and not index:
+                series.duplicates += 1
+            aligned[slot] = price
+
+    # Sub-slots are equally long, so their mean is the slot's time-weighted
+    # price, as in grid_signals.resample_onto_slots
+    for slot, sub_slots in finer.items():
+        aligned[slot] = fmean(sub_slots.values())
+
+    if not aligned:
+        return series
+
+    last_slot = max(aligned)
+    expected = (last_slot - first_slot) // resolution + 1
+    max_gap = max(1, MAX_INTERPOLATED_GAP // resolution)
+
+    previous: tuple[datetime, float] | None = None
+    missing: list[datetime] = []
+    slot = first_slot
+    while slot <= last_slot:
+        price = aligned.get(slot)
+        if price is None:
+            missing.append(slot)
+        else:
+            if missing and previous is not None and len(missing) <= max_gap:
+                series.slots.extend(_interpolate(previous, (slot, price), missing))
+                series.interpolated += len(missing)
+            else:
+                series.gaps += len(missing)
+            missing = []
+            series.slots.append({"hour": dt_util.as_local(slot), "price": price})
+            previous = (slot, price)
+        slot += resolution
+
+    real = expected - series.interpolated - series.gaps
+    series.quality = (real + 0.5 * series.interpolated) / expected
+    if synthetic:
+        series.quality = min(series.quality, SYNTHETIC_QUALITY)
+
+    return series
+
+
+def _interpolate(
+    before: tuple[datetime, float],
+    after: tuple[datetime, float],
+    missing: list[datetime],
+) -> list[dict[str, Any]]:
+    """Linearly interpolate prices for the missing slots between two points."""
+    (start, start_price), (end, end_price) = before, after
+    span = (end - start).total_seconds()
+    return [
+        {
+            "hour": dt_util.as_local(slot),
+            "price": start_price
+            + (end_price - start_price) * (slot - start).total_seconds() / span,
+            "interpolated": True,
+        }
+        for slot in missing
+    ]
+
+
+def merge_series(sources: list[tuple[str, PriceSeries]]) -> PriceSeries:
+    """Merge series on the same grid, slot by slot, in priority order.
+
+    sources is ordered by priority and already normalized onto the first
+    source's grid, so a finer source contributes its slot averages. Each
+    slot takes the first source with real data for it, then the first with
+    an interpolated value, then the first synthetic one, and is tagged with
+    that source. The sorted series
+    are merged in one pass; the quality is that of the slots that won.
+    """
+    def keyed(priority: int, source: str, series: PriceSeries):
+        for slot in series.slots:
+            if series.synthetic:
+                rank = SLOT_SYNTHETIC
+            elif slot.get("interpolated"):
+                rank = SLOT_INTERPOLATED
+            else:
+                rank = SLOT_REAL
+            yield (dt_util.as_utc(slot["hour"]), rank, priority, source, slot)
+
+    merged = PriceSeries(resolution=sources[0][1].resolution)
+    weight = 0.0
+    synthetic = 0
+    last: datetime | None = None
+    for start, rank, _, source, slot in heapq.merge(
+        *(
+            keyed(priority, source, series)
+            for priority, (source, series) in enumerate(sources)
+        )
+    ):
+        if start == last:
+            continue
+        last = start
+        merged.slots.append({**slot, "source": source})
+        weight += SLOT_WEIGHTS[rank]
+        if rank == SLOT_INTERPOLATED:
+            merged.interpolated += 1
+        elif rank == SLOT_SYNTHETIC:
+            synthetic += 1
+
+    if merged.slots:
+        first = dt_util.as_utc(merged.slots[0]["hour"])
+        expected = (last - first) // merged.resolution + 1
+        merged.gaps = expected - len(merged.slots)
+        merged.quality = weight / expected
+        merged.synthetic = synthetic == len(merged.slots)
+    return merged
@@ -0,0 +1,109 @@
+"""Sliding price window statistics for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from itertools import islice
+from datetime import datetime
+
+
+class SlidingPriceWindow:
+    """Track min, max and average over a sliding window of price slots.
+
+    Minimum and maximum are kept in monotonic deques and the average in a
+    running sum, so sliding the window by one slot costs O(1) amortized
+    instead of rescanning the whole horizon.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty window."""
+        self._slots: deque[tuple[datetime, float]] = deque()
+        self._min: deque[tuple[datetime, float]] = deque()
+        self._max: deque[tuple[datetime, float]] = deque()
+        self._sum = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of slots in the window."""
+        return len(self._slots)
+
+    @property
+    def minimum(self) -> float:
+        """Return the lowest price in the window."""
+        return self._min[0][1]
+
+    @property
+    def maximum(self) -> float:
+        """Return the highest price in the window."""
+        return self._max[0][1]
+
+    @property
+    def average(self) -> float:
+        """Return the average price in the window."""
+        return self._sum / len(self._slots)
+
+    def clear(self) -> None:
+        """Drop all slots."""
+        self._slots.clear()
+        self._min.clear()
+        self._max.clear()
+        self._sum = 0.0
+
+    def update(
+        self,
+        series: list[tuple[datetime, float]],
+        window_start: datetime,
+        window_end: datetime,
+        republished: bool = False,
+    ) -> None:
+        """Slide the window to [window_start, window_end) using a sorted series.
+
+        Expired slots are evicted from the front and newly published slots are
+        appended at the back. Slots already in the window are trusted, so the
+        caller passes republished when the series was parsed again and the
+        window has to be rebuilt from scratch.
+        """
+        if republished:
+            self.clear()
+        self._evict_before(window_start)
+
+        index = _bisect_start(series, window_start)
+        if self._slots:
+            index = max(index, _bisect_start(series, self._slots[-1][0]) + 1)
+
+        for start, price in islice(series, index, None):
+            if start >= window_end:
+                break
+            self._push(start, price)
+
+    def _push(self, start: datetime, price: float) -> None:
+        """Append a slot to the back of the window."""
+        self._slots.append((start, price))
+        self._sum += price
+
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((start, price))
+
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((start, price))
+
+    def _evict_before(self, window_start: datetime) -> None:
+        """Drop slots that start before the window."""
+        while self._slots and self._slots[0][0] < window_start:
+            _, price = self._slots.popleft()
+            self._sum -= price
+
+        while self._min and self._min[0][0] < window_start:
+            self._min.popleft()
+        while self._max and self._max[0][0] < window_start:
+            self._max.popleft()
+
+        if not self._slots:
+            # Keep the running sum from accumulating rounding drift
+            self._sum = 0.0
+
+
+def _bisect_start(series: list[tuple[datetime, float]], start: datetime) -> int:
+    """Return the index of the first slot starting at or after start."""
+    return bisect_left(series, start, key=lambda slot: slot[0])
@@ -0,0 +1,111 @@
+"""Setpoint ramping for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+# Time between trajectory samples; matches the coordinator update interval
+RAMP_SAMPLE = timedelta(minutes=5)
+
+# Setpoints are rounded to this grid, so the trajectory only changes (and
+# is only written) in steps a thermostat acts on
+RAMP_GRANULARITY = 0.5
+
+
+class RampTrajectory:
+    """A rate-limited setpoint trajectory for one zone.
+
+    Built once per plan revision: a backward pass starts rises early enough
+    to reach each target on time (but no further ahead than the look-ahead),
+    and a forward pass from the zone's current setpoint limits every change
+    to the ramp rate. Only the points where the rounded setpoint changes are
+    kept, so each breakpoint is exactly one thermostat write and looking up
+    the current setpoint is a bisect.
+    """
+
+    __slots__ = ("_times", "_setpoints")
+
+    def __init__(self, times: list[datetime], setpoints: list[float]) -> None:
+        """Initialize a trajectory from its breakpoints."""
+        self._times = times
+        self._setpoints = setpoints
+
+    def __len__(self) -> int:
+        """Return the number of breakpoints (setpoint writes)."""
+        return len(self._times)
+
+    @classmethod
+    def build(
+        cls,
+        plan: dict[str, dict[str, Any]],
+        resolution: timedelta,
+        start: datetime,
+        start_setpoint: float | None,
+        rate: float,
+        lookahead: timedelta,
+        profile: str | None = None,
+    ) -> RampTrajectory:
+        """Build the trajectory following plan targets from start onwards.
+
+        With a profile the targets of that zone group profile are followed
+        instead of the entry's.
+        """
+        slots = [
+            (
+                dt_util.as_utc(datetime.fromisoformat(key)),
+                entry["group_targets"][profile] if profile else entry["target_temp"],
+            )
+            for key, entry in plan.items()
+        ]
+        start = dt_util.as_utc(start)
+        if not slots or start >= slots[-1][0] + resolution:
+            return cls([], [])
+
+        # Sample the piecewise constant plan targets
+        times: list[datetime] = []
+        targets: list[float] = []
+        index = 0
+        moment = start
+        end = slots[-1][0] + resolution
+        while moment < end:
+            while index + 1 < len(slots) and slots[index + 1][0] <= moment:
+                index += 1
+            times.append(moment)
+            targets.append(slots[index][1])
+            moment += RAMP_SAMPLE
+
+        max_step = rate * RAMP_SAMPLE.total_seconds() / 3600
+
+        # Backward pass: lower bounds that reach every rise on time. Each
+        # bound remembers when the rise it serves happens, so pre-heating
+        # never starts more than the look-ahead before it
+        lower = targets[:]
+        rise_at = times[:]
+        for k in range(len(targets) - 2, -1, -1):
+            candidate = lower[k + 1] - max_step
+            if candidate > lower[k] and rise_at[k + 1] - times[k] <= lookahead:
+                lower[k] = candidate
+                rise_at[k] = rise_at[k + 1]
+
+        # Forward pass: follow the bounds without exceeding the ramp rate
+        current = start_setpoint if start_setpoint is not None else lower[0]
+        breakpoint_times: list[datetime] = []
+        setpoints: list[float] = []
+        for moment, bound in zip(times, lower):
+            current = min(max(bound, current - max_step), current + max_step)
+            rounded = round(current / RAMP_GRANULARITY) * RAMP_GRANULARITY
+            if not setpoints or rounded != setpoints[-1]:
+                breakpoint_times.append(moment)
+                setpoints.append(rounded)
+
+        return cls(breakpoint_times, setpoints)
+
+    def setpoint_at(self, moment: datetime) -> float | None:
+        """Return the setpoint in effect at moment."""
+        index = bisect_right(self._times, dt_util.as_utc(moment)) - 1
+        if index < 0:
+            return None
+        return self._setpoints[index]
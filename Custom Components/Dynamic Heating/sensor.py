@@ -1,215 +1,429 @@
-“”“Sensor platform for Dynamic Heating Scheduler.”””
-from **future** import annotations
+"""Sensor platform for Dynamic Heating Scheduler."""
+from __future__ import annotations
 
 import logging
+from collections.abc import Hashable
+from datetime import datetime
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME
+from homeassistant.const import CONF_NAME, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
-ATTR_CURRENT_TIER,
-ATTR_DAILY_PLAN,
-ATTR_NEXT_TIER,
-ATTR_NEXT_TIER_TIME,
-ATTR_PRICE_AVERAGE,
-ATTR_PRICE_HIGH,
-ATTR_PRICE_LOW,
-DOMAIN,
+    ATTR_CURRENT_TIER,
+    ATTR_DAILY_PLAN,
+    ATTR_NEXT_TIER,
+    ATTR_NEXT_TIER_TIME,
+    ATTR_PRICE_AVERAGE,
+    ATTR_PRICE_HIGH,
+    ATTR_PRICE_LOW,
+    ATTR_PRICE_QUALITY,
+    CONF_EXPOSE_PLAN_ATTRIBUTE,
+    DEFAULT_EXPOSE_PLAN_ATTRIBUTE,
+    DOMAIN,
 )
+from .accounting import PERIOD_DAY, PERIOD_MONTH
 from .coordinator import DynamicHeatingCoordinator
 
-_LOGGER = logging.getLogger(**name**)
+_LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(
-hass: HomeAssistant,
-entry: ConfigEntry,
-async_add_entities: AddEntitiesCallback,
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
 ) -> None:
-“”“Set up Dynamic Heating sensors.”””
-coordinator: DynamicHeatingCoordinator = hass.data[DOMAIN][entry.entry_id]
-
-```
-sensors = [
-    DynamicHeatingCurrentTierSensor(coordinator, entry),
-    DynamicHeatingNextTierSensor(coordinator, entry),
-    DynamicHeatingPriceLowSensor(coordinator, entry),
-    DynamicHeatingPriceHighSensor(coordinator, entry),
-    DynamicHeatingPriceAverageSensor(coordinator, entry),
-]
-
-async_add_entities(sensors)
-```
+    """Set up Dynamic Heating sensors."""
+    coordinator: DynamicHeatingCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    sensors = [
+        DynamicHeatingCurrentTierSensor(coordinator, entry),
+        DynamicHeatingNextTierSensor(coordinator, entry),
+        DynamicHeatingPriceLowSensor(coordinator, entry),
+        DynamicHeatingPriceHighSensor(coordinator, entry),
+        DynamicHeatingPriceAverageSensor(coordinator, entry),
+        DynamicHeatingLoopLagSensor(coordinator, entry),
+        DynamicHeatingQueueDepthSensor(coordinator, entry),
+    ]
+
+    if coordinator.accountant.configured:
+        sensors.extend(
+            [
+                DynamicHeatingCostSensor(coordinator, entry, PERIOD_DAY),
+                DynamicHeatingCostSensor(coordinator, entry, PERIOD_MONTH),
+                DynamicHeatingSavingsSensor(coordinator, entry, PERIOD_DAY),
+                DynamicHeatingSavingsSensor(coordinator, entry, PERIOD_MONTH),
+            ]
+        )
+
+    async_add_entities(sensors)
 
 class DynamicHeatingSensorBase(CoordinatorEntity, SensorEntity):
-“”“Base class for Dynamic Heating sensors.”””
-
-```
-def __init__(
-    self,
-    coordinator: DynamicHeatingCoordinator,
-    entry: ConfigEntry,
-) -> None:
-    """Initialize the sensor."""
-    super().__init__(coordinator)
-    self.entry = entry
-    self._attr_has_entity_name = True
-
-@property
-def device_info(self) -> dict[str, Any]:
-    """Return device information."""
-    return {
-        "identifiers": {(DOMAIN, self.entry.entry_id)},
-        "name": self.entry.data[CONF_NAME],
-        "manufacturer": "Dynamic Heating Scheduler",
-        "model": "Heating Coordinator",
-    }
-```
+    """Base class for Dynamic Heating sensors."""
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entry = entry
+        self._attr_has_entity_name = True
+        self._last_fingerprint: Hashable | None = None
+
+    def _fingerprint(self) -> Hashable:
+        """Return a cheap summary of everything this entity writes."""
+        return (self.available, self.native_value)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this entity's own state changed."""
+        fingerprint = self._fingerprint()
+        if fingerprint == self._last_fingerprint:
+            return
+        self._last_fingerprint = fingerprint
+        self.async_write_ha_state()
+
+    @property
+    def device_info(self) -> dict[str, Any]:
+        """Return device information."""
+        return {
+            "identifiers": {(DOMAIN, self.entry.entry_id)},
+            "name": self.entry.data[CONF_NAME],
+            "manufacturer": "Dynamic Heating Scheduler",
+            "model": "Heating Coordinator",
+        }
 
 class DynamicHeatingCurrentTierSensor(DynamicHeatingSensorBase):
-“”“Sensor showing current price tier.”””
-
-```
-_attr_icon = "mdi:cash-clock"
-
-def __init__(
-    self,
-    coordinator: DynamicHeatingCoordinator,
-    entry: ConfigEntry,
-) -> None:
-    """Initialize the sensor."""
-    super().__init__(coordinator, entry)
-    self._attr_unique_id = f"{entry.entry_id}_current_tier"
-    self._attr_name = "Current Price Tier"
-
-@property
-def native_value(self) -> str | None:
-    """Return the current price tier."""
-    if not self.coordinator.data:
-        return None
-    return self.coordinator.data.get(ATTR_CURRENT_TIER)
-
-@property
-def extra_state_attributes(self) -> dict[str, Any]:
-    """Return additional attributes."""
-    if not self.coordinator.data:
-        return {}
-
-    return {
-        ATTR_DAILY_PLAN: self.coordinator.data.get(ATTR_DAILY_PLAN, {}),
-    }
-```
+    """Sensor showing current price tier."""
+
+    _attr_icon = "mdi:cash-clock"
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_current_tier"
+        self._attr_name = "Current Price Tier"
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the current price tier."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(ATTR_CURRENT_TIER)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return additional attributes."""
+        if not self.coordinator.data:
+            return {}
+
+        attributes = {
+            ATTR_PRICE_QUALITY: self.coordinator.data.get(ATTR_PRICE_QUALITY),
+        }
+        # The plan calendar serves the schedule by range, so the full plan
+        # in every state write is optional
+        if self._expose_plan:
+            attributes[ATTR_DAILY_PLAN] = self.coordinator.data.get(ATTR_DAILY_PLAN, {})
+        return attributes
+
+    @property
+    def _expose_plan(self) -> bool:
+        """Return True if the plan is published as a state attribute."""
+        return self.coordinator.config.get(
+            CONF_EXPOSE_PLAN_ATTRIBUTE, DEFAULT_EXPOSE_PLAN_ATTRIBUTE
+        )
+
+    def _fingerprint(self) -> Hashable:
+        """Return the state summary, using the plan revision for the plan."""
+        data = self.coordinator.data or {}
+        return (
+            self.available,
+            self.native_value,
+            self.coordinator.plan_revision if self._expose_plan else None,
+            data.get(ATTR_PRICE_QUALITY),
+        )
 
 class DynamicHeatingNextTierSensor(DynamicHeatingSensorBase):
-“”“Sensor showing next price tier.”””
-
-```
-_attr_icon = "mdi:clock-outline"
-
-def __init__(
-    self,
-    coordinator: DynamicHeatingCoordinator,
-    entry: ConfigEntry,
-) -> None:
-    """Initialize the sensor."""
-    super().__init__(coordinator, entry)
-    self._attr_unique_id = f"{entry.entry_id}_next_tier"
-    self._attr_name = "Next Price Tier"
-
-@property
-def native_value(self) -> str | None:
-    """Return the next price tier."""
-    if not self.coordinator.data:
-        return None
-    return self.coordinator.data.get(ATTR_NEXT_TIER)
-
-@property
-def extra_state_attributes(self) -> dict[str, Any]:
-    """Return additional attributes."""
-    if not self.coordinator.data:
-        return {}
-
-    next_time = self.coordinator.data.get(ATTR_NEXT_TIER_TIME)
-    return {
-        ATTR_NEXT_TIER_TIME: next_time.isoformat() if next_time else None,
-    }
-```
+    """Sensor showing next price tier."""
+
+    _attr_icon = "mdi:clock-outline"
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_next_tier"
+        self._attr_name = "Next Price Tier"
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the next price tier."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(ATTR_NEXT_TIER)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return additional attributes."""
+        if not self.coordinator.data:
+            return {}
+
+        next_time = self.coordinator.data.get(ATTR_NEXT_TIER_TIME)
+        return {
+            ATTR_NEXT_TIER_TIME: next_time.isoformat() if next_time else None,
+        }
+
+    def _fingerprint(self) -> Hashable:
+        """Return the state summary including the next tier time."""
+        data = self.coordinator.data or {}
+        return (self.available, self.native_value, data.get(ATTR_NEXT_TIER_TIME))
 
 class DynamicHeatingPriceLowSensor(DynamicHeatingSensorBase):
-“”“Sensor showing lowest price of the day.”””
-
-```
-_attr_icon = "mdi:cash-minus"
-_attr_native_unit_of_measurement = "currency/kWh"
-
-def __init__(
-    self,
-    coordinator: DynamicHeatingCoordinator,
-    entry: ConfigEntry,
-) -> None:
-    """Initialize the sensor."""
-    super().__init__(coordinator, entry)
-    self._attr_unique_id = f"{entry.entry_id}_price_low"
-    self._attr_name = "Daily Low Price"
-
-@property
-def native_value(self) -> float | None:
-    """Return the lowest price."""
-    if not self.coordinator.data:
-        return None
-    return self.coordinator.data.get(ATTR_PRICE_LOW)
-```
+    """Sensor showing lowest price of the day."""
+
+    _attr_icon = "mdi:cash-minus"
+    _attr_native_unit_of_measurement = "currency/kWh"
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_price_low"
+        self._attr_name = "Daily Low Price"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the lowest price."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(ATTR_PRICE_LOW)
 
 class DynamicHeatingPriceHighSensor(DynamicHeatingSensorBase):
-“”“Sensor showing highest price of the day.”””
-
-```
-_attr_icon = "mdi:cash-plus"
-_attr_native_unit_of_measurement = "currency/kWh"
-
-def __init__(
-    self,
-    coordinator: DynamicHeatingCoordinator,
-    entry: ConfigEntry,
-) -> None:
-    """Initialize the sensor."""
-    super().__init__(coordinator, entry)
-    self._attr_unique_id = f"{entry.entry_id}_price_high"
-    self._attr_name = "Daily High Price"
-
-@property
-def native_value(self) -> float | None:
-    """Return the highest price."""
-    if not self.coordinator.data:
-        return None
-    return self.coordinator.data.get(ATTR_PRICE_HIGH)
-```
+    """Sensor showing highest price of the day."""
+
+    _attr_icon = "mdi:cash-plus"
+    _attr_native_unit_of_measurement = "currency/kWh"
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_price_high"
+        self._attr_name = "Daily High Price"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the highest price."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(ATTR_PRICE_HIGH)
 
 class DynamicHeatingPriceAverageSensor(DynamicHeatingSensorBase):
-“”“Sensor showing average price of the day.”””
-
-```
-_attr_icon = "mdi:cash"
-_attr_native_unit_of_measurement = "currency/kWh"
-
-def __init__(
-    self,
-    coordinator: DynamicHeatingCoordinator,
-    entry: ConfigEntry,
-) -> None:
-    """Initialize the sensor."""
-    super().__init__(coordinator, entry)
-    self._attr_unique_id = f"{entry.entry_id}_price_average"
-    self._attr_name = "Daily Average Price"
-
-@property
-def native_value(self) -> float | None:
-    """Return the average price."""
-    if not self.coordinator.data:
-        return None
-    return self.coordinator.data.get(ATTR_PRICE_AVERAGE)
-```
\ No newline at end of file
+    """Sensor showing average price of the day."""
+
+    _attr_icon = "mdi:cash"
+    _attr_native_unit_of_measurement = "currency/kWh"
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_price_average"
+        self._attr_name = "Daily Average Price"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the average price."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(ATTR_PRICE_AVERAGE)
+
+class DynamicHeatingLoopLagSensor(DynamicHeatingSensorBase):
+    """Diagnostic sensor showing the worst event loop stall per refresh."""
+
+    _attr_icon = "mdi:timer-alert-outline"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_loop_lag"
+        self._attr_name = "Event Loop Lag"
+
+    @property
+    def native_value(self) -> float:
+        """Return the largest event loop lag since the previous refresh."""
+        return round(self.coordinator.loop_lag * 1000, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return how the last plan was computed."""
+        return {
+            "planning_ms": round(self.coordinator.planning_duration * 1000, 1),
+            "planned_in_executor": self.coordinator.planning_offloaded,
+        }
+
+    def _fingerprint(self) -> Hashable:
+        """Return the state summary including the planning attributes."""
+        return (self.available, self.native_value, *self.extra_state_attributes.values())
+
+class DynamicHeatingQueueDepthSensor(DynamicHeatingSensorBase):
+    """Diagnostic sensor showing the commands waiting in the shared dispatcher."""
+
+    _attr_icon = "mdi:tray-full"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_queue_depth"
+        self._attr_name = "Command Queue Depth"
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of commands waiting for any mesh."""
+        return self.coordinator.dispatcher.queue_depth
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the dispatcher statistics, shared by all entries."""
+        return self.coordinator.dispatcher.metrics()
+
+    def _fingerprint(self) -> Hashable:
+        """Return the state summary including the counters."""
+        metrics = self.extra_state_attributes
+        return (
+            self.available,
+            self.native_value,
+            metrics["sent"],
+            metrics["coalesced"],
+            metrics["max_wait_s"],
+        )
+
+class DynamicHeatingCostSensor(DynamicHeatingSensorBase):
+    """Sensor showing what heating cost in the current day or month."""
+
+    _attr_icon = "mdi:cash-register"
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+        period: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self._period = period
+        self._attr_unique_id = f"{entry.entry_id}_{period}_cost"
+        self._attr_name = (
+            "Daily Heating Cost" if period == PERIOD_DAY else "Monthly Heating Cost"
+        )
+        self._attr_native_unit_of_measurement = coordinator.hass.config.currency
+
+    @property
+    def native_value(self) -> float:
+        """Return the accumulated cost."""
+        return round(self.coordinator.accountant.total(self._period)["cost"], 4)
+
+    @property
+    def last_reset(self) -> datetime | None:
+        """Return when the period started."""
+        return self.coordinator.accountant.last_reset(self._period)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return additional attributes."""
+        totals = self.coordinator.accountant.total(self._period)
+        return {
+            "energy": round(totals["energy"], 3),
+            "zones": {zone: round(cost, 4) for zone, cost in totals["zones"].items()},
+        }
+
+    def _fingerprint(self) -> Hashable:
+        """Return the state summary including energy and the period start."""
+        attributes = self.extra_state_attributes
+        return (
+            self.available,
+            self.native_value,
+            self.last_reset,
+            attributes["energy"],
+            tuple(attributes["zones"].items()),
+        )
+
+class DynamicHeatingSavingsSensor(DynamicHeatingSensorBase):
+    """Sensor showing savings compared to heating on a flat schedule."""
+
+    _attr_icon = "mdi:piggy-bank-outline"
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+
+    def __init__(
+        self,
+        coordinator: DynamicHeatingCoordinator,
+        entry: ConfigEntry,
+        period: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self._period = period
+        self._attr_unique_id = f"{entry.entry_id}_{period}_savings"
+        self._attr_name = (
+            "Daily Heating Savings" if period == PERIOD_DAY else "Monthly Heating Savings"
+        )
+        self._attr_native_unit_of_measurement = coordinator.hass.config.currency
+
+    @property
+    def native_value(self) -> float:
+        """Return the savings versus paying the average price for the same energy."""
+        totals = self.coordinator.accountant.total(self._period)
+        return round(totals["flat_cost"] - totals["cost"], 4)
+
+    @property
+    def last_reset(self) -> datetime | None:
+        """Return when the period started."""
+        return self.coordinator.accountant.last_reset(self._period)
+
+    def _fingerprint(self) -> Hashable:
+        """Return the state summary including the period start."""
+        return (self.available, self.native_value, self.last_reset)
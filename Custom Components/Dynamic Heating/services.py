@@ -0,0 +1,295 @@
+"""Services for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_DAILY_PLAN,
+    ATTR_ENTRY_ID,
+    ATTR_HORIZON,
+    ATTR_PRICES,
+    ATTR_RESOLUTION,
+    ATTR_SETTINGS,
+    CONF_CO2_WEIGHT,
+    CONF_COMFORT_END,
+    CONF_COMFORT_START,
+    CONF_COMFORT_TEMP,
+    CONF_ENABLE_COP_OPTIMIZATION,
+    CONF_FLEX_WEIGHT,
+    CONF_GRID_TARIFF,
+    CONF_OUTDOOR_TEMP_THRESHOLD,
+    CONF_PLANNING_HORIZON,
+    CONF_SOLAR_SURPLUS_WEIGHT,
+    CONF_SURCHARGE,
+    CONF_TEMP_AWAY,
+    CONF_TEMP_BOOST,
+    CONF_TEMP_MAX,
+    CONF_TEMP_MIN,
+    CONF_TEMP_NORMAL,
+    CONF_TEMP_SETBACK,
+    CONF_VAT,
+    DOMAIN,
+    MAX_PLANNING_HORIZON,
+    SERVICE_GET_PLAN,
+    SERVICE_SIMULATE,
+)
+from .coordinator import DynamicHeatingCoordinator
+from .dispatcher import DATA_DISPATCHER
+from .price_series import floor_to_resolution
+
+PLAN_SCHEMA_BASE = {
+    vol.Optional(ATTR_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_HORIZON): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=MAX_PLANNING_HORIZON)
+    ),
+    vol.Optional(ATTR_RESOLUTION): vol.All(
+        vol.Coerce(int), vol.Range(min=5, max=1440)
+    ),
+}
+
+GET_PLAN_SCHEMA = vol.Schema(PLAN_SCHEMA_BASE)
+
+SIMULATION_SETTINGS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_TEMP_BOOST): vol.Coerce(float),
+        vol.Optional(CONF_TEMP_NORMAL): vol.Coerce(float),
+        vol.Optional(CONF_TEMP_SETBACK): vol.Coerce(float),
+        vol.Optional(CONF_TEMP_AWAY): vol.Coerce(float),
+        vol.Optional(CONF_TEMP_MIN): vol.Coerce(float),
+        vol.Optional(CONF_TEMP_MAX): vol.Coerce(float),
+        vol.Optional(CONF_COMFORT_START): cv.string,
+        vol.Optional(CONF_COMFORT_END): cv.string,
+        vol.Optional(CONF_COMFORT_TEMP): vol.Coerce(float),
+        vol.Optional(CONF_ENABLE_COP_OPTIMIZATION): cv.boolean,
+        vol.Optional(CONF_OUTDOOR_TEMP_THRESHOLD): vol.Coerce(float),
+        vol.Optional(CONF_PLANNING_HORIZON): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PLANNING_HORIZON)
+        ),
+        vol.Optional(CONF_GRID_TARIFF): cv.string,
+        vol.Optional(CONF_SURCHARGE): vol.Coerce(float),
+        vol.Optional(CONF_VAT): vol.Coerce(float),
+        vol.Optional(CONF_CO2_WEIGHT): vol.Coerce(float),
+        vol.Optional(CONF_FLEX_WEIGHT): vol.Coerce(float),
+        vol.Optional(CONF_SOLAR_SURPLUS_WEIGHT): vol.Coerce(float),
+    }
+)
+
+SIMULATE_SCHEMA = vol.Schema(
+    {
+        **PLAN_SCHEMA_BASE,
+        vol.Optional(ATTR_PRICES): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required("start"): cv.datetime,
+                        vol.Required("price"): vol.Coerce(float),
+                    }
+                )
+            ],
+        ),
+        vol.Optional(ATTR_SETTINGS, default={}): SIMULATION_SETTINGS_SCHEMA,
+    }
+)
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Dynamic Heating services."""
+
+    async def async_get_plan(call: ServiceCall) -> ServiceResponse:
+        """Return the current plan without touching the price sensor."""
+        coordinator = _get_coordinator(hass, call.data.get(ATTR_ENTRY_ID))
+        if not coordinator.data:
+            raise ServiceValidationError("No heating plan has been calculated yet")
+
+        return _plan_response(
+            coordinator,
+            coordinator.data,
+            call.data.get(ATTR_HORIZON),
+            call.data.get(ATTR_RESOLUTION),
+        )
+
+    async def async_simulate(call: ServiceCall) -> ServiceResponse:
+        """Plan against caller-supplied prices or settings without actuating."""
+        coordinator = _get_coordinator(hass, call.data.get(ATTR_ENTRY_ID))
+
+        prices = call.data.get(ATTR_PRICES)
+        if prices is not None:
+            prices = [{"hour": p["start"], "price": p["price"]} for p in prices]
+
+        result = await coordinator.async_simulate(prices, call.data[ATTR_SETTINGS])
+        return _plan_response(
+            coordinator,
+            result,
+            call.data.get(ATTR_HORIZON),
+            call.data.get(ATTR_RESOLUTION),
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_PLAN,
+        async_get_plan,
+        schema=GET_PLAN_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SIMULATE,
+        async_simulate,
+        schema=SIMULATE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def _get_coordinator(
+    hass: HomeAssistant, entry_id: str | None
+) -> DynamicHeatingCoordinator:
+    """Find the coordinator a service call refers to."""
+    coordinators = {
+        key: value
+        for key, value in hass.data.get(DOMAIN, {}).items()
+        if key != DATA_DISPATCHER
+    }
+
+    if entry_id is None:
+        if len(coordinators) != 1:
+            raise ServiceValidationError(
+                "entry_id is required when more than one Dynamic Heating "
+                "entry is configured"
+            )
+        return next(iter(coordinators.values()))
+
+    if entry_id not in coordinators:
+        raise ServiceValidationError(f"Unknown Dynamic Heating entry: {entry_id}")
+    return coordinators[entry_id]
+
+
+def _plan_response(
+    coordinator: DynamicHeatingCoordinator,
+    data: dict[str, Any],
+    horizon_hours: int | None,
+    resolution_minutes: int | None,
+) -> dict[str, Any]:
+    """Build a JSON-serializable service response from planner output."""
+    # Simulated prices carry their own slot length
+    plan_resolution = coordinator.resolution
+    if ATTR_RESOLUTION in data:
+        plan_resolution = timedelta(minutes=data[ATTR_RESOLUTION])
+    resolution = (
+        timedelta(minutes=resolution_minutes) if resolution_minutes else plan_resolution
+    )
+
+    slots = [
+        (datetime.fromisoformat(key), entry)
+        for key, entry in data.get(ATTR_DAILY_PLAN, {}).items()
+    ]
+    if horizon_hours:
+        horizon_end = dt_util.now() + timedelta(hours=horizon_hours)
+        slots = [(start, entry) for start, entry in slots if start < horizon_end]
+
+    if resolution != plan_resolution:
+        slots = _resample_plan(slots, plan_resolution, resolution)
+
+    response = {
+        key: value
+        for key, value in data.items()
+        if key != ATTR_DAILY_PLAN and not isinstance(value, datetime)
+    }
+    response[ATTR_RESOLUTION] = int(resolution.total_seconds() // 60)
+    response["slots"] = [{"start": start.isoformat(), **entry} for start, entry in slots]
+    return response
+
+
+def _resample_plan(
+    slots: list[tuple[datetime, dict[str, Any]]],
+    plan_resolution: timedelta,
+    resolution: timedelta,
+) -> list[tuple[datetime, dict[str, Any]]]:
+    """Resample plan slots onto another grid in one pass.
+
+    Prices are averaged, the most common tier wins, the target is the highest
+    one requested inside the bucket and flags are set if any slot has them.
+    """
+    if not slots:
+        return []
+
+    resampled = []
+    index = 0
+    bucket = floor_to_resolution(slots[0][0], resolution)
+    last_end = slots[-1][0] + plan_resolution
+
+    while bucket < last_end:
+        bucket_end = bucket + resolution
+
+        # Slots are sorted, so anything ending before this bucket is done
+        while index < len(slots) and slots[index][0] + plan_resolution <= bucket:
+            index += 1
+
+        covering = []
+        probe = index
+        while probe < len(slots) and slots[probe][0] < bucket_end:
+            covering.append(slots[probe][1])
+            probe += 1
+
+        if covering:
+            resampled.append((bucket, _merge_entries(covering)))
+        bucket = bucket_end
+
+    return resampled
+
+
+def _merge_entries(entries: list[dict[str, Any]]) -> dict[str, Any]:
+    """Merge the plan entries that fall into one resampled slot.
+
+    Details that do not combine, such as signals, occupancy and the price
+    source, are left out of merged slots.
+    """
+    if len(entries) == 1:
+        return dict(entries[0])
+
+    merged: dict[str, Any] = {
+        "tier": Counter(entry["tier"] for entry in entries).most_common(1)[0][0],
+        "target_temp": max(entry["target_temp"] for entry in entries),
+        "is_comfort_hour": any(entry["is_comfort_hour"] for entry in entries),
+        "boost_for_cop": any(entry["boost_for_cop"] for entry in entries),
+    }
+    for key in ("price", "spot_price", "score"):
+        merged[key] = round(sum(entry[key] for entry in entries) / len(entries), 5)
+
+    # Profiles get their highest target too, and a load charges in the
+    # resampled slot if it charges in any part of it
+    group_targets: dict[str, float] = {}
+    for entry in entries:
+        for name, target in entry.get("group_targets", {}).items():
+            group_targets[name] = max(target, group_targets.get(name, target))
+    if group_targets:
+        merged["group_targets"] = group_targets
+    loads = dict.fromkeys(
+        load for entry in entries for load in entry.get("loads", [])
+    )
+    if loads:
+        merged["loads"] = list(loads)
+    if sources := [entry for entry in entries if "heat_source" in entry]:
+        merged["heat_source"] = Counter(
+            entry["heat_source"] for entry in sources
+        ).most_common(1)[0][0]
+        merged["heat_cost"] = round(
+            sum(entry["heat_cost"] for entry in sources) / len(sources), 5
+        )
+    if any(entry.get("preheat") for entry in entries):
+        merged["preheat"] = True
+    return merged
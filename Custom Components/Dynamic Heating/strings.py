@@ -6,9 +6,14 @@
 “description”: “Set up dynamic heating based on energy prices”,
 “data”: {
 “name”: “Integration Name”,
-“price_sensor”: “Energy Price Sensor”
+“price_sensor”: “Energy Price Sensor”,
+“fallback_price_sensors”: “Fallback Price Sensors (Optional, in priority order)”
 }
 },
+“preview”: {
+“title”: “Price Sensor Check”,
+“description”: “Detected format: **{format}**\nSlot length: {resolution} minutes\nPrices published for the next {horizon} hours (data quality {quality})\n\nUpcoming price tiers:\n{preview}”
+},
 “global_settings”: {
 “title”: “Global Heating Settings”,
 “description”: “Configure temperature targets and comfort hours”,
@@ -25,15 +30,51 @@
 “comfort_end”: “Comfort Hours End”,
 “comfort_temp”: “Comfort Temperature”,
 “enable_cop_optimization”: “Enable COP Optimization”,
-“outdoor_temp_threshold”: “Outdoor Temp Threshold for COP Boost”
+“outdoor_temp_threshold”: “Outdoor Temp Threshold for COP Boost”,
+“co2_sensor”: “CO2 Intensity Sensor (Optional)”,
+“co2_weight”: “CO2 Cost Weight (per gCO2/kWh)”,
+“flex_sensor”: “Grid Flexibility Request Sensor (Optional)”,
+“flex_weight”: “Flexibility Request Cost Weight”,
+“solar_surplus_sensor”: “Solar Surplus Sensor (Optional)”,
+“solar_surplus_weight”: “Solar Surplus Credit Weight (per kW)”,
+“grid_tariff”: “Grid Tariff Periods (e.g. 06:00-22:00=0.45; 22:00-06:00=0.25)”,
+“surcharge”: “Fixed Surcharge per kWh”,
+“vat”: “VAT (%)”,
+“planning_horizon”: “Planning Horizon (hours)”,
+“enable_presence_prediction”: “Learn Occupancy from Home/Away History”,
+“preheat_time”: “Pre-heat Before Predicted Arrival (minutes)”,
+“enable_price_forecast”: “Forecast Prices Beyond the Published Horizon”,
+“ramp_rate”: “Setpoint Ramp Rate (°C per hour, 0 = off)”,
+“ramp_lookahead”: “Ramp Look-ahead (hours)”,
+“expose_plan_attribute”: “Include the Full Plan in the Current Tier Sensor”,
+“enable_mpc”: “Model Predictive Control (uses room temperatures)”,
+“mpc_time_constant”: “Building Time Constant (hours)”,
+“mpc_heat_rate”: “Heating Rate at Full Power (°C per hour)”,
+“tier_method”: “Price Tier Method”,
+“tier_count”: “Number of Price Tiers (quantile method)”,
+“tier_offsets”: “Tier Temperature Offsets, cheapest first (Optional, e.g. 2, 1, 0, -1, -2)”,
+“heat_pump_switch”: “Heat Pump Switch (Optional, hybrid systems)”,
+“boiler_switch”: “Boiler Switch (Optional, hybrid systems)”,
+“direct_heater_switch”: “Direct Electric Heater Switch (Optional, hybrid systems)”,
+“fuel_price”: “Fuel Price per kWh”,
+“fuel_price_sensor”: “Fuel Price Sensor (Optional, overrides the fixed price)”,
+“boiler_efficiency”: “Boiler Efficiency (%)”,
+“cop_curve”: “Heat Pump COP Curve (Optional, e.g. -7=2.6; 2=3.3; 7=4.0)”
 }
 },
 “zone_config”: {
 “title”: “Add Heating Zone”,
-“description”: “Configure a heating zone”,
+“description”: “Configure a heating zone: a climate entity, or a water heater or switched load that needs energy by a deadline”,
 “data”: {
 “zone_name”: “Zone Name”,
-“zone_climate”: “Climate Entity”
+“zone_climate”: “Climate Entity (for a heating zone)”,
+“zone_power_sensor”: “Power Sensor (Optional)”,
+“zone_heater_power”: “Rated Heater Power (Optional, used without power sensor)”,
+“zone_load”: “Water Heater or Switch (for a storage load)”,
+“zone_energy”: “Energy Needed per Day (kWh, storage loads)”,
+“zone_deadline”: “Energy Needed By (storage loads)”,
+“zone_charge_temp”: “Tank Temperature While Charging (water heaters)”,
+“zone_idle_temp”: “Tank Temperature Otherwise (water heaters)”
 }
 },
 “add_zone”: {
@@ -43,30 +84,144 @@
 “add_another”: “Add Another Zone”
 }
 }
+},
+“error”: {
+“invalid_tariff”: “Invalid grid tariff. Use HH:MM-HH:MM=fee periods separated by semicolons.”,
+“sensor_not_found”: “The selected sensor does not exist”,
+“no_price_data”: “No price data could be read from this sensor”,
+“invalid_tier_offsets”: “Enter one comma-separated temperature offset per tier.”,
+“zone_entity_required”: “Select either a climate entity or a storage load, not both.”,
+“load_needs_power_and_energy”: “Storage loads need a rated heater power and the energy needed per day.”,
+“invalid_cop_curve”: “Invalid COP curve. Use outdoor temperature=COP points separated by semicolons.”
+}
+},
+“services”: {
+“get_plan”: {
+“name”: “Get plan”,
+“description”: “Return the current heating plan.”,
+“fields”: {
+“entry_id”: {
+“name”: “Entry”,
+“description”: “Dynamic Heating entry to use. Optional when only one is configured.”
+},
+“horizon”: {
+“name”: “Horizon”,
+“description”: “Only return slots starting within this many hours.”
+},
+“resolution”: {
+“name”: “Resolution”,
+“description”: “Slot length in minutes to resample the plan to.”
+}
+}
+},
+“simulate”: {
+“name”: “Simulate plan”,
+“description”: “Calculate a plan for other prices or settings without changing any thermostat.”,
+“fields”: {
+“entry_id”: {
+“name”: “Entry”,
+“description”: “Dynamic Heating entry to use. Optional when only one is configured.”
+},
+“horizon”: {
+“name”: “Horizon”,
+“description”: “Only return slots starting within this many hours.”
+},
+“resolution”: {
+“name”: “Resolution”,
+“description”: “Slot length in minutes to resample the plan to.”
+},
+“prices”: {
+“name”: “Prices”,
+“description”: “List of slots with start and price to plan against instead of the price sensor.”
+},
+“settings”: {
+“name”: “Settings”,
+“description”: “Settings to override for this simulation, e.g. temp_boost or vat.”
+}
+}
+}
+},
+“issues”: {
+“zone_unavailable”: {
+“title”: “Heating zone {entity_id} is not responding”,
+“description”: “Dynamic Heating could not control {entity_id} several times in a row ({reason}) and has stopped sending it commands. Check that the device is powered and connected. Control resumes automatically as soon as the entity changes state.”
+}
+},
+“selector”: {
+“tier_method”: {
+“options”: {
+“range”: “Price range (low/normal/high)”,
+“quantile”: “Quantiles (equal share of slots per tier)”
+}
 }
 },
-“entity”: {
-“sensor”: {
-“current_price_tier”: {
-“name”: “Current Price Tier”
+“options”: {
+“step”: {
+“init”: {
+“title”: “Dynamic Heating Options”,
+“menu_options”: {
+“temperatures”: “Temperatures”,
+“add_group”: “Add a zone group”,
+“select_group”: “Edit a zone group”,
+“remove_group”: “Remove a zone group”
+}
 },
-“next_price_tier”: {
-“name”: “Next Price Tier”
+“temperatures”: {
+“title”: “Update Temperature Settings”,
+“data”: {
+“temp_boost”: “Boost Temperature”,
+“temp_normal”: “Normal Temperature”,
+“temp_setback”: “Setback Temperature”
+}
 },
-“daily_low_price”: {
-“name”: “Daily Low Price”
+“add_group”: {
+“title”: “Add Zone Group”,
+“description”: “Group zones by floor, building or wing. Settings left empty are inherited from the group this one is inside, or from the main settings.”,
+“data”: {
+“group_name”: “Group Name”,
+“group_parent”: “Inside Group (Optional)”,
+“group_zones”: “Zones”,
+“temp_boost”: “Boost Temperature”,
+“temp_normal”: “Normal Temperature”,
+“temp_setback”: “Setback Temperature”,
+“temp_away”: “Away Temperature”,
+“comfort_temp”: “Comfort Temperature”,
+“comfort_start”: “Comfort Hours Start”,
+“comfort_end”: “Comfort Hours End”
+}
 },
-“daily_high_price”: {
-“name”: “Daily High Price”
+“select_group”: {
+“title”: “Edit Zone Group”,
+“data”: {
+“group_name”: “Group”
+}
 },
-“daily_average_price”: {
-“name”: “Daily Average Price”
+“edit_group”: {
+“title”: “Edit {group_name}”,
+“description”: “Clear a setting to inherit it again.”,
+“data”: {
+“group_parent”: “Inside Group (Optional)”,
+“group_zones”: “Zones”,
+“temp_boost”: “Boost Temperature”,
+“temp_normal”: “Normal Temperature”,
+“temp_setback”: “Setback Temperature”,
+“temp_away”: “Away Temperature”,
+“comfort_temp”: “Comfort Temperature”,
+“comfort_start”: “Comfort Hours Start”,
+“comfort_end”: “Comfort Hours End”
 }
 },
-“switch”: {
-“dynamic_heating_active”: {
-“name”: “Dynamic Heating Active”
+“remove_group”: {
+“title”: “Remove Zone Group”,
+“description”: “Groups inside the removed group move up one level.”,
+“data”: {
+“group_name”: “Group”
 }
 }
+},
+“error”: {
+“group_exists”: “A zone group with this name already exists”,
+“invalid_zone_groups”: “A group cannot be inside itself, and a zone can only be in one group.”
+}
 }
 }
\ No newline at end of file
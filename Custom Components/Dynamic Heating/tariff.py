@@ -0,0 +1,122 @@
+"""Tariff engine for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_GRID_TARIFF,
+    CONF_SURCHARGE,
+    CONF_VAT,
+    DEFAULT_SURCHARGE,
+    DEFAULT_VAT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+TARIFF_OPTIONS = (CONF_GRID_TARIFF, CONF_SURCHARGE, CONF_VAT)
+
+
+def parse_grid_tariff(spec: str | None) -> list[tuple[int, int, float]]:
+    """Parse a time-of-use grid tariff such as "06:00-22:00=0.45; 22:00-06:00=0.25".
+
+    Returns (start minute, end minute, fee) periods. Later periods override
+    earlier ones where they overlap, and minutes outside every period carry
+    no grid fee. Raises ValueError on malformed input.
+    """
+    periods: list[tuple[int, int, float]] = []
+    if not spec:
+        return periods
+
+    for part in spec.replace(",", ";").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+
+        window, _, fee = part.partition("=")
+        start, _, end = window.partition("-")
+        if not fee or not end:
+            raise ValueError(f"Invalid grid tariff period: {part}")
+
+        periods.append((_parse_minute(start), _parse_minute(end), float(fee)))
+
+    return periods
+
+
+def _parse_minute(value: str) -> int:
+    """Parse HH:MM into minutes since midnight, allowing 24:00."""
+    hours, _, minutes = value.strip().partition(":")
+    minute = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= minute <= MINUTES_PER_DAY:
+        raise ValueError(f"Invalid time of day: {value}")
+    return minute
+
+
+class TariffSchedule:
+    """Compose spot prices with grid fees, surcharges and VAT.
+
+    The schedule is compiled once into a per-minute-of-day offset table with
+    VAT already folded in, so turning a spot series into effective prices is
+    a single multiply-add per slot.
+    """
+
+    def __init__(
+        self,
+        grid_periods: list[tuple[int, int, float]] | None = None,
+        surcharge: float = 0.0,
+        vat_percent: float = 0.0,
+    ) -> None:
+        """Compile the tariff schedule."""
+        vat_factor = 1 + vat_percent / 100
+
+        fees = [0.0] * MINUTES_PER_DAY
+        for start, end, fee in grid_periods or []:
+            if start < end:
+                minutes = range(start, end)
+            else:
+                # Period wraps midnight
+                minutes = [*range(start, MINUTES_PER_DAY), *range(0, end)]
+            for minute in minutes:
+                fees[minute] = fee
+
+        self.is_identity = not grid_periods and not surcharge and not vat_percent
+        self._spot_factor = vat_factor
+        self._offsets = [(fee + surcharge) * vat_factor for fee in fees]
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> TariffSchedule:
+        """Build a tariff schedule from config entry data."""
+        try:
+            periods = parse_grid_tariff(config.get(CONF_GRID_TARIFF))
+        except ValueError as err:
+            _LOGGER.warning("Ignoring invalid grid tariff: %s", err)
+            periods = []
+
+        return cls(
+            periods,
+            float(config.get(CONF_SURCHARGE, DEFAULT_SURCHARGE)),
+            float(config.get(CONF_VAT, DEFAULT_VAT)),
+        )
+
+    def apply(self, slots: list[datetime], spot_prices: list[float]) -> list[float]:
+        """Return the effective price for each slot."""
+        if self.is_identity:
+            return list(spot_prices)
+
+        factor = self._spot_factor
+        offsets = self._offsets
+        return [
+            price * factor + offsets[_minute_of_day(slot)]
+            for slot, price in zip(slots, spot_prices)
+        ]
+
+
+def _minute_of_day(slot: datetime) -> int:
+    """Return the local minute of day a slot starts at."""
+    local = dt_util.as_local(slot)
+    return local.hour * 60 + local.minute
@@ -0,0 +1,104 @@
+"""Quantile price tiers for Dynamic Heating Scheduler.
+
+The classic tiers split the price range at fixed fractions between the
+minimum, average and maximum, so a single spike pushes every other slot into
+the low tier. Quantile tiers give each of N tiers an equal share of the
+horizon instead, which one outlier cannot move.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Mapping
+import random
+from typing import Any
+
+from .const import (
+    CONF_TEMP_BOOST,
+    CONF_TEMP_NORMAL,
+    CONF_TEMP_SETBACK,
+    PRICE_TIER_HIGH,
+    PRICE_TIER_LOW,
+    PRICE_TIER_NORMAL,
+)
+
+MIN_TIER_COUNT = 2
+MAX_TIER_COUNT = 9
+
+
+def select(values: list[float], k: int) -> float:
+    """Return the k-th smallest value in expected linear time (quickselect).
+
+    Works on a copy, so the caller's list keeps its order.
+    """
+    items = list(values)
+    low, high = 0, len(items) - 1
+    while low < high:
+        pivot = items[random.randint(low, high)]
+        # Three-way partition of items[low:high + 1] around the pivot
+        lt, i, gt = low, low, high
+        while i <= gt:
+            if items[i] < pivot:
+                items[lt], items[i] = items[i], items[lt]
+                lt += 1
+                i += 1
+            elif items[i] > pivot:
+                items[i], items[gt] = items[gt], items[i]
+                gt -= 1
+            else:
+                i += 1
+        if k < lt:
+            high = lt - 1
+        elif k > gt:
+            low = gt + 1
+        else:
+            return pivot
+    return items[k]
+
+
+def quantile_boundaries(scores: list[float], count: int) -> list[float]:
+    """Return the count - 1 scores separating count equally sized tiers."""
+    if not scores:
+        return []
+    last = len(scores) - 1
+    return [select(scores, round(last * i / count)) for i in range(1, count)]
+
+
+def assign_tiers(scores: list[float], boundaries: list[float]) -> list[int]:
+    """Return the tier index of every score; 0 is the cheapest tier.
+
+    A score equal to a boundary belongs to the cheaper tier.
+    """
+    return [bisect_left(boundaries, score) for score in scores]
+
+
+def tier_name(index: int, count: int) -> str:
+    """Return the low/normal/high name of a tier index."""
+    if index == 0:
+        return PRICE_TIER_LOW
+    if index == count - 1:
+        return PRICE_TIER_HIGH
+    return PRICE_TIER_NORMAL
+
+
+def tier_offsets(
+    count: int, spec: str | None, config: Mapping[str, Any]
+) -> list[float]:
+    """Return the temperature offset from the normal temperature per tier.
+
+    spec lists the offsets from cheapest to most expensive, such as
+    "2, 1, 0, -1, -2". Without one they are spread evenly from the boost to
+    the setback temperature. Raises ValueError if spec does not have one
+    offset per tier.
+    """
+    if spec:
+        offsets = [float(part) for part in spec.replace(";", ",").split(",")]
+        if len(offsets) != count:
+            raise ValueError(f"Expected {count} tier offsets, got {len(offsets)}")
+        return offsets
+
+    normal = config.get(CONF_TEMP_NORMAL, 20)
+    boost = config.get(CONF_TEMP_BOOST, 22) - normal
+    setback = config.get(CONF_TEMP_SETBACK, 18) - normal
+    return [
+        round(boost + (setback - boost) * i / (count - 1), 2) for i in range(count)
+    ]
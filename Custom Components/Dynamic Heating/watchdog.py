@@ -0,0 +1,57 @@
+"""Event loop watchdog for Dynamic Heating Scheduler."""
+from __future__ import annotations
+
+from asyncio import TimerHandle
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+# How often the loop is probed, in seconds
+PROBE_INTERVAL = 1.0
+
+
+class LoopWatchdog:
+    """Measure how late the event loop runs a periodic probe.
+
+    Anything blocking the loop, including our own planning, delays the probe
+    by the time it held the loop. The largest delay since the last read is
+    kept, so each coordinator refresh reports the worst stall of its interval.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the watchdog."""
+        self.hass = hass
+        self._handle: TimerHandle | None = None
+        self._expected = 0.0
+        self._max_lag = 0.0
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start probing the event loop."""
+        self._schedule()
+
+        @callback
+        def stop() -> None:
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+
+        return stop
+
+    def take_max_lag(self) -> float:
+        """Return the largest lag in seconds since the last call and reset it."""
+        max_lag, self._max_lag = self._max_lag, 0.0
+        return max_lag
+
+    def _schedule(self) -> None:
+        """Schedule the next probe."""
+        loop = self.hass.loop
+        self._expected = loop.time() + PROBE_INTERVAL
+        self._handle = loop.call_at(self._expected, self._probe)
+
+    @callback
+    def _probe(self) -> None:
+        """Record how late this probe ran and schedule the next one."""
+        lag = self.hass.loop.time() - self._expected
+        if lag > self._max_lag:
+            self._max_lag = lag
+        self._schedule()
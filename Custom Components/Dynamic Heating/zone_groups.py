@@ -0,0 +1,111 @@
+"""Zone groups for Dynamic Heating Scheduler.
+
+A group (a floor, a building, a wing) lists member zones and may override
+the entry's temperature profile. Groups can sit inside other groups: a zone
+gets the entry's settings, then the overrides of every group from the
+outermost down to its own. Zones that end up with the same settings share
+one profile, which the planner computes once for all of them.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from .const import (
+    CONF_COMFORT_END,
+    CONF_COMFORT_START,
+    CONF_COMFORT_TEMP,
+    CONF_GROUP_NAME,
+    CONF_GROUP_PARENT,
+    CONF_GROUP_ZONES,
+    CONF_TEMP_AWAY,
+    CONF_TEMP_BOOST,
+    CONF_TEMP_NORMAL,
+    CONF_TEMP_SETBACK,
+)
+
+# Settings a group can override; everything else applies to the whole entry
+PROFILE_KEYS = (
+    CONF_TEMP_BOOST,
+    CONF_TEMP_NORMAL,
+    CONF_TEMP_SETBACK,
+    CONF_TEMP_AWAY,
+    CONF_COMFORT_TEMP,
+    CONF_COMFORT_START,
+    CONF_COMFORT_END,
+)
+
+
+def group_chain(
+    name: str, groups: Mapping[str, Mapping[str, Any]]
+) -> list[Mapping[str, Any]]:
+    """Return a group and the groups it sits in, outermost first.
+
+    Raises ValueError if a parent is unknown or the parents form a cycle.
+    """
+    chain = []
+    seen: set[str] = set()
+    while name:
+        if name not in groups:
+            raise ValueError(f"Unknown zone group: {name}")
+        if name in seen:
+            raise ValueError(f"Zone group {name} is inside itself")
+        seen.add(name)
+        group = groups[name]
+        chain.append(group)
+        name = group.get(CONF_GROUP_PARENT)
+    chain.reverse()
+    return chain
+
+
+def validate_groups(groups: list[Mapping[str, Any]]) -> None:
+    """Raise ValueError on unknown parents, cycles or zones in two groups."""
+    by_name = {group[CONF_GROUP_NAME]: group for group in groups}
+    members: set[str] = set()
+    for group in groups:
+        group_chain(group[CONF_GROUP_NAME], by_name)
+        for entity_id in group.get(CONF_GROUP_ZONES, []):
+            if entity_id in members:
+                raise ValueError(f"{entity_id} is in more than one zone group")
+            members.add(entity_id)
+
+
+def resolve_profiles(
+    groups: list[Mapping[str, Any]], config: Mapping[str, Any]
+) -> tuple[dict[str, str], dict[str, dict[str, Any]]]:
+    """Return the profile of every grouped zone and the distinct profiles.
+
+    The first mapping is zone entity id to profile name, the second profile
+    name to its overrides of config. A profile is named after the first
+    group that produces it. Zones whose groups change nothing are left out
+    and follow the entry.
+    """
+    by_name = {group[CONF_GROUP_NAME]: group for group in groups}
+    zone_profiles: dict[str, str] = {}
+    profiles: dict[str, dict[str, Any]] = {}
+    names: dict[tuple[tuple[str, Any], ...], str] = {}
+
+    for group in groups:
+        if not group.get(CONF_GROUP_ZONES):
+            continue
+        overrides: dict[str, Any] = {}
+        for ancestor in group_chain(group[CONF_GROUP_NAME], by_name):
+            overrides.update(
+                (key, ancestor[key])
+                for key in PROFILE_KEYS
+                if ancestor.get(key) is not None
+            )
+        overrides = {
+            key: value for key, value in overrides.items() if config.get(key) != value
+        }
+        if not overrides:
+            continue
+
+        name = names.setdefault(
+            tuple(sorted(overrides.items())), group[CONF_GROUP_NAME]
+        )
+        profiles[name] = overrides
+        for entity_id in group[CONF_GROUP_ZONES]:
+            zone_profiles.setdefault(entity_id, name)
+
+    return zone_profiles, profiles
@@ -0,0 +1,439 @@
+"""Load harness for Dynamic Heating Scheduler.
+
+Starts a bare Home Assistant core (no recorder or default_config) in a
+temporary config directory, creates synthetic price sensors and climate
+entities, and sets up many dynamic_heating entries through the real config
+flow. All coordinators are then refreshed at the same moment, as happens
+with aligned 5-minute polls and hourly price updates, while the harness
+measures:
+
+- event loop lag, from a probe task sleeping in short intervals
+- refresh latency of every coordinator refresh
+- climate service-call throughput
+- traced memory per entry
+
+Results are written as JSON so runs can be compared between versions:
+
+    python scripts/load_harness.py --entries 50 --zones 20 --output report.json
+
+Requires the homeassistant and home-assistant-frontend packages. The
+integration folder (the one copied to config/custom_components/dynamic_heating
+when installing) is taken from --integration. A folder straight from this
+repository, with manifest.py in place of manifest.json, is assembled into an
+installable one first.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+import json
+import math
+import os
+from pathlib import Path
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from homeassistant import bootstrap, config_entries
+from homeassistant.components.climate import ClimateEntityFeature
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers import config_validation as cv
+from homeassistant.runner import RuntimeConfig
+from homeassistant.util import dt as dt_util
+
+DOMAIN = "dynamic_heating"
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_INTEGRATION = REPO_ROOT / "Custom Components" / "Dynamic Heating"
+
+# The English translations of the repository checkout
+TRANSLATIONS = REPO_ROOT / "Dynamic Heating" / "Translations" / "EN"
+
+# Refreshes per simulated hour (the coordinator polls every 5 minutes)
+TICKS_PER_HOUR = 12
+
+# Interval of the event loop lag probe (seconds)
+PROBE_INTERVAL = 0.01
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """Summarize samples (in seconds) as milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(fraction: float) -> float:
+        index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+class LagProbe:
+    """Measure how late the event loop wakes a sleeping task."""
+
+    def __init__(self) -> None:
+        """Initialize the probe."""
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start probing."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop probing."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(PROBE_INTERVAL)
+            self.samples.append(max(0.0, loop.time() - started - PROBE_INTERVAL))
+
+
+class SyntheticSite:
+    """Synthetic price sensors and climate entities for the harness."""
+
+    def __init__(
+        self, hass: HomeAssistant, seed: int, call_latency: float
+    ) -> None:
+        """Initialize the site."""
+        self.hass = hass
+        self.random = random.Random(seed)
+        self.call_latency = call_latency
+        self.call_times: list[float] = []
+        self._climates: list[str] = []
+
+    def register_climate_service(self) -> None:
+        """Handle climate.set_temperature for the synthetic thermostats."""
+
+        async def set_temperature(call: ServiceCall) -> None:
+            if self.call_latency:
+                await asyncio.sleep(self.call_latency)
+            self.call_times.append(time.perf_counter())
+            # Without the climate integration's schema entity_id stays a string
+            for entity_id in cv.ensure_list(call.data["entity_id"]):
+                state = self.hass.states.get(entity_id)
+                if state is None:
+                    continue
+                attributes = dict(state.attributes)
+                for key in ("temperature", "target_temp_low", "target_temp_high"):
+                    if key in call.data:
+                        attributes[key] = call.data[key]
+                self.hass.states.async_set(entity_id, state.state, attributes)
+
+        self.hass.services.async_register("climate", "set_temperature", set_temperature)
+
+    def add_price_sensor(self, entity_id: str) -> None:
+        """Publish 48 hours of Nord Pool style prices."""
+        self.publish_prices(entity_id, dt_util.start_of_local_day())
+
+    def publish_prices(self, entity_id: str, day: datetime) -> None:
+        """Publish new prices, which makes every coordinator parse again."""
+        base = self.random.uniform(0.05, 0.4)
+        prices = []
+        for hour in range(48):
+            start = day + timedelta(hours=hour)
+            # Morning and evening peaks with noise and the odd spike
+            value = base * (1 + 0.5 * math.sin((hour % 24 - 6) / 24 * 2 * math.pi))
+            value += self.random.gauss(0, base * 0.1)
+            if self.random.random() < 0.02:
+                value *= 5
+            prices.append(
+                {
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(hours=1)).isoformat(),
+                    "value": round(value, 4),
+                }
+            )
+        self.hass.states.async_set(
+            entity_id,
+            str(prices[dt_util.now().hour]["value"]),
+            {
+                "raw_today": prices[:24],
+                "raw_tomorrow": prices[24:],
+                "unit_of_measurement": "EUR/kWh",
+            },
+        )
+
+    def add_climate(self, entity_id: str) -> None:
+        """Create a thermostat that accepts a single target temperature."""
+        self._climates.append(entity_id)
+        self.hass.states.async_set(
+            entity_id,
+            "heat",
+            {
+                "hvac_modes": ["off", "heat"],
+                "min_temp": 7,
+                "max_temp": 35,
+                "target_temp_step": 0.5,
+                "temperature": 20,
+                "current_temperature": round(self.random.uniform(18, 22), 1),
+                "supported_features": ClimateEntityFeature.TARGET_TEMPERATURE,
+            },
+        )
+
+    def drift_rooms(self) -> None:
+        """Move every room temperature towards its target with some noise."""
+        for entity_id in self._climates:
+            state = self.hass.states.get(entity_id)
+            attributes = dict(state.attributes)
+            current = attributes["current_temperature"]
+            target = attributes.get("temperature", current)
+            current += 0.2 * (target - current) + self.random.gauss(0, 0.1)
+            attributes["current_temperature"] = round(current, 1)
+            self.hass.states.async_set(entity_id, state.state, attributes)
+
+
+async def async_create_entry(
+    hass: HomeAssistant, index: int, zones: int, settings: dict[str, Any]
+) -> None:
+    """Create one entry through the config flow, as a user would."""
+    flow = hass.config_entries.flow
+    result = await flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await flow.async_configure(
+        result["flow_id"],
+        {"name": f"Load {index}", "price_sensor": f"sensor.load_price_{index}"},
+    )
+    # Tier preview, then global settings
+    result = await flow.async_configure(result["flow_id"], {})
+    result = await flow.async_configure(result["flow_id"], settings)
+    for zone in range(zones):
+        result = await flow.async_configure(
+            result["flow_id"],
+            {
+                "zone_name": f"Zone {zone}",
+                "zone_climate": f"climate.load_{index}_{zone}",
+                "zone_heater_power": 1.5,
+            },
+        )
+        result = await flow.async_configure(
+            result["flow_id"], {"add_another": zone < zones - 1}
+        )
+    if result["type"] != FlowResultType.CREATE_ENTRY:
+        raise RuntimeError(f"Config flow for entry {index} ended with {result}")
+
+
+def install_integration(source: Path, target: Path) -> None:
+    """Copy the integration into target, laid out as Home Assistant expects."""
+    shutil.copytree(source, target, ignore=shutil.ignore_patterns("__pycache__"))
+    manifest = target / "manifest.json"
+    if not manifest.exists() and (target / "manifest.py").exists():
+        (target / "manifest.py").rename(manifest)
+    translations = target / "translations" / "en.json"
+    if not translations.exists() and TRANSLATIONS.exists():
+        translations.parent.mkdir()
+        shutil.copyfile(TRANSLATIONS, translations)
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the load test and return the report."""
+    config_dir = Path(tempfile.mkdtemp(prefix="dynamic_heating_load_"))
+    try:
+        install_integration(
+            args.integration, config_dir / "custom_components" / DOMAIN
+        )
+        (config_dir / "configuration.yaml").write_text(
+            f"homeassistant:\n  time_zone: {args.time_zone}\n"
+        )
+        hass = await bootstrap.async_setup_hass(
+            RuntimeConfig(config_dir=str(config_dir), skip_pip=True)
+        )
+        if hass is None:
+            raise RuntimeError("Home Assistant failed to start")
+        try:
+            return await async_measure(hass, args)
+        finally:
+            await hass.async_stop()
+    finally:
+        # Home Assistant reports blocking I/O on its loop thread even after
+        # it stopped, so file work from here on runs in a worker thread
+        await asyncio.to_thread(shutil.rmtree, config_dir, ignore_errors=True)
+
+
+async def async_measure(hass: HomeAssistant, args: argparse.Namespace) -> dict[str, Any]:
+    """Set up the entries, drive the refreshes and collect the metrics."""
+    await hass.async_start()
+    site = SyntheticSite(hass, args.seed, args.call_latency / 1000)
+    site.register_climate_service()
+
+    settings = json.loads(args.settings) if args.settings else {}
+    for index in range(args.entries):
+        site.add_price_sensor(f"sensor.load_price_{index}")
+        for zone in range(args.zones):
+            site.add_climate(f"climate.load_{index}_{zone}")
+
+    tracemalloc.start()
+    memory_baseline = tracemalloc.get_traced_memory()[0]
+
+    setup_started = time.perf_counter()
+    for index in range(args.entries):
+        await async_create_entry(hass, index, args.zones, settings)
+    await hass.async_block_till_done()
+    setup_seconds = time.perf_counter() - setup_started
+
+    coordinators = list(hass.data[DOMAIN].values())
+    coordinators = [c for c in coordinators if hasattr(c, "async_refresh")]
+
+    probe = LagProbe()
+    probe.start()
+    latencies: list[float] = []
+    calls_per_tick: list[int] = []
+    peak_rate = 0.0
+
+    async def timed_refresh(coordinator) -> None:
+        started = time.perf_counter()
+        await coordinator.async_refresh()
+        latencies.append(time.perf_counter() - started)
+
+    for tick in range(args.ticks):
+        if tick and tick % TICKS_PER_HOUR == 0:
+            # A new hour: every price source publishes at the same time
+            for index in range(args.entries):
+                site.publish_prices(
+                    f"sensor.load_price_{index}", dt_util.start_of_local_day()
+                )
+        site.drift_rooms()
+
+        calls_before = len(site.call_times)
+        started = time.perf_counter()
+        await asyncio.gather(*(timed_refresh(c) for c in coordinators))
+        # Zone commands drain from the shared dispatcher in the background
+        await hass.async_block_till_done(wait_background_tasks=True)
+        elapsed = time.perf_counter() - started
+
+        calls = len(site.call_times) - calls_before
+        calls_per_tick.append(calls)
+        if calls:
+            peak_rate = max(peak_rate, calls / elapsed)
+        await asyncio.sleep(args.pause)
+
+    await probe.stop()
+    memory_total = tracemalloc.get_traced_memory()[0] - memory_baseline
+    tracemalloc.stop()
+
+    dispatcher = hass.data[DOMAIN].get("dispatcher")
+    planning = [c.planning_duration for c in coordinators]
+    offloaded = sum(1 for c in coordinators if c.planning_offloaded)
+
+    return {
+        "parameters": {
+            "entries": args.entries,
+            "zones": args.zones,
+            "ticks": args.ticks,
+            "call_latency_ms": args.call_latency,
+            "seed": args.seed,
+            "settings": settings,
+        },
+        "environment": {
+            "python": sys.version.split()[0],
+            "home_assistant": HA_VERSION,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "setup_seconds": round(setup_seconds, 3),
+        "refresh_latency_ms": percentiles(latencies),
+        "loop_lag_ms": percentiles(probe.samples),
+        "service_calls": {
+            "total": len(site.call_times),
+            "per_tick_mean": round(sum(calls_per_tick) / len(calls_per_tick), 2)
+            if calls_per_tick
+            else 0,
+            "peak_per_second": round(peak_rate, 1),
+            "dispatcher": dispatcher.metrics() if dispatcher else None,
+        },
+        "planning": {
+            "last_ms_max": round(max(planning, default=0.0) * 1000, 3),
+            "offloaded_entries": offloaded,
+        },
+        "memory": {
+            "traced_total_mb": round(memory_total / 2**20, 2),
+            "traced_per_entry_kb": round(memory_total / max(args.entries, 1) / 2**10, 1),
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            "max_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                / (2**20 if sys.platform == "darwin" else 2**10),
+                1,
+            ),
+        },
+    }
+
+
+def main() -> int:
+    """Parse arguments, run the harness and write the report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--zones", type=int, default=20, help="zones per entry")
+    parser.add_argument(
+        "--ticks",
+        type=int,
+        default=2 * TICKS_PER_HOUR,
+        help="aligned refresh rounds; prices are republished every 12th",
+    )
+    parser.add_argument(
+        "--call-latency",
+        type=float,
+        default=0.0,
+        help="simulated thermostat response time (ms)",
+    )
+    parser.add_argument(
+        "--pause", type=float, default=0.1, help="idle time between rounds (s)"
+    )
+    parser.add_argument(
+        "--settings",
+        help="JSON global settings passed to every config flow, e.g. "
+        '\'{"enable_mpc": true}\'',
+    )
+    parser.add_argument("--time-zone", default="Europe/Stockholm")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--integration",
+        type=Path,
+        default=DEFAULT_INTEGRATION,
+        help="the dynamic_heating integration folder",
+    )
+    parser.add_argument("--output", type=Path, help="report file (default stdout)")
+    args = parser.parse_args()
+
+    asyncio.run(async_main(args))
+    return 0
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run the harness and write the report."""
+    report = await async_run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        await asyncio.to_thread(args.output.write_text, text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+"""Test setup for the Dynamic Heating integration.
+
+The integration lives in "Custom Components/Dynamic Heating" instead of a
+custom_components package, so it is registered under the import path Home
+Assistant would give it.
+"""
+from __future__ import annotations
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+INTEGRATION_DIR = Path(__file__).parent.parent / "Custom Components" / "Dynamic Heating"
+
+if "custom_components" not in sys.modules:
+    _package = types.ModuleType("custom_components")
+    _package.__path__ = []
+    sys.modules["custom_components"] = _package
+
+_spec = importlib.util.spec_from_file_location(
+    "custom_components.dynamic_heating",
+    INTEGRATION_DIR / "__init__.py",
+    submodule_search_locations=[str(INTEGRATION_DIR)],
+)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = _module
+_spec.loader.exec_module(_module)
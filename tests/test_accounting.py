@@ -0,0 +1,148 @@
+"""Tests for energy and cost accounting."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dynamic_heating.accounting import (
+    PERIOD_DAY,
+    EnergyAccountant,
+)
+from custom_components.dynamic_heating.const import (
+    CONF_PRICE_SENSOR,
+    CONF_ZONE_CLIMATE,
+    CONF_ZONE_ENERGY,
+    CONF_ZONE_HEATER_POWER,
+    CONF_ZONE_LOAD,
+    CONF_ZONES,
+    DOMAIN,
+)
+from custom_components.dynamic_heating.coordinator import DynamicHeatingCoordinator
+from custom_components.dynamic_heating.dispatcher import async_get_dispatcher
+
+HOUR = timedelta(hours=1)
+
+
+async def test_energy_split_at_slot_edges(hass: HomeAssistant, freezer) -> None:
+    """A reading spanning two slots is billed at each slot's price."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_ZONES: [
+                {CONF_ZONE_CLIMATE: "climate.living", CONF_ZONE_HEATER_POWER: 2.0},
+                {
+                    CONF_ZONE_LOAD: "switch.boiler",
+                    CONF_ZONE_HEATER_POWER: 3.0,
+                    CONF_ZONE_ENERGY: 6.0,
+                },
+            ]
+        },
+    )
+    start = dt_util.as_utc(dt_util.now().replace(minute=30, second=0, microsecond=0))
+    freezer.move_to(start)
+    boundary = start + timedelta(minutes=30)
+
+    def price_at(moment: datetime) -> tuple[float, float]:
+        return (1.0, 1.5) if moment < boundary else (2.0, 1.5)
+
+    accountant = EnergyAccountant(
+        hass, entry, entry.data, price_at, lambda: HOUR
+    )
+    hass.states.async_set("climate.living", "heat", {"hvac_action": "heating"})
+    hass.states.async_set("switch.boiler", "on")
+    unsub = accountant.async_start()
+
+    freezer.move_to(start + HOUR)
+    accountant.async_tick()
+    unsub()
+
+    totals = accountant.total(PERIOD_DAY)
+    assert totals["energy"] == 5.0
+    # Half of each reading at 1.0 and half at 2.0
+    assert totals["cost"] == 7.5
+    assert totals["flat_cost"] == 7.5
+    assert totals["zones"] == {"climate.living": 3.0, "switch.boiler": 4.5}
+
+
+async def test_slot_tail_billed_after_replan(hass: HomeAssistant, freezer) -> None:
+    """The end of a slot is billed at its price by the refresh after it."""
+    start = dt_util.start_of_local_day() + timedelta(hours=10, minutes=50)
+    freezer.move_to(start)
+    day = dt_util.start_of_local_day()
+    prices = [
+        {
+            "start": (day + hour * HOUR).isoformat(),
+            "end": (day + (hour + 1) * HOUR).isoformat(),
+            "value": float(hour),
+        }
+        for hour in range(24)
+    ]
+    hass.states.async_set(
+        "sensor.price", "10.0", {"raw_today": prices, "raw_tomorrow": []}
+    )
+    hass.states.async_set("climate.living", "heat", {"hvac_action": "heating"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_PRICE_SENSOR: "sensor.price",
+            CONF_ZONES: [
+                {CONF_ZONE_CLIMATE: "climate.living", CONF_ZONE_HEATER_POWER: 6.0}
+            ],
+        },
+    )
+    coordinator = DynamicHeatingCoordinator(hass, entry, async_get_dispatcher(hass))
+    await coordinator.async_refresh()
+    unsub = coordinator.accountant.async_start()
+
+    # Ten minutes at 10.0, then ten minutes at 11.0
+    freezer.move_to(start + timedelta(minutes=20))
+    await coordinator.async_refresh()
+    unsub()
+
+    totals = coordinator.accountant.total(PERIOD_DAY)
+    assert totals["energy"] == pytest.approx(2.0)
+    assert totals["cost"] == pytest.approx(21.0)
+
+
+async def test_midnight_splits_the_day_totals(hass: HomeAssistant, freezer) -> None:
+    """Energy before midnight stays in the day that ended."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_ZONES: [
+                {CONF_ZONE_CLIMATE: "climate.living", CONF_ZONE_HEATER_POWER: 6.0},
+                {CONF_ZONE_CLIMATE: "climate.bedroom", CONF_ZONE_HEATER_POWER: 6.0},
+            ]
+        },
+    )
+    midnight = dt_util.start_of_local_day() + timedelta(days=1)
+    freezer.move_to(midnight - timedelta(minutes=30))
+    accountant = EnergyAccountant(
+        hass, entry, entry.data, lambda moment: (1.0, 1.0), lambda: HOUR
+    )
+    hass.states.async_set("climate.living", "heat", {"hvac_action": "heating"})
+    hass.states.async_set("climate.bedroom", "heat", {"hvac_action": "heating"})
+    unsub = accountant.async_start()
+    freezer.move_to(midnight - timedelta(minutes=20))
+    accountant.async_tick()
+    yesterday = accountant.total(PERIOD_DAY)
+
+    # The bedroom stops after midnight and is booked before the next tick
+    freezer.move_to(midnight + timedelta(minutes=10))
+    hass.states.async_set("climate.bedroom", "heat", {"hvac_action": "idle"})
+    await hass.async_block_till_done()
+    freezer.move_to(midnight + timedelta(minutes=20))
+    accountant.async_tick()
+    unsub()
+
+    # Half an hour of both zones before midnight
+    assert yesterday["energy"] == pytest.approx(6.0)
+    assert yesterday["key"] == (midnight - HOUR).date().isoformat()
+    today = accountant.total(PERIOD_DAY)
+    assert today["key"] == midnight.date().isoformat()
+    # Twenty minutes of the living room, ten of the bedroom
+    assert today["energy"] == pytest.approx(3.0)
@@ -0,0 +1,27 @@
+"""Tests for the climate controller's circuit breaker."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import issue_registry as ir
+
+from custom_components.dynamic_heating.climate_control import (
+    ClimateController,
+    ZoneHealth,
+)
+from custom_components.dynamic_heating.const import DOMAIN
+from custom_components.dynamic_heating.dispatcher import async_get_dispatcher
+
+
+async def test_stop_deletes_tripped_issues(hass: HomeAssistant) -> None:
+    """Unloading clears the repair issue of every tripped zone."""
+    controller = ClimateController(hass, async_get_dispatcher(hass))
+    stop = controller.async_start()
+    registry = ir.async_get(hass)
+    for entity_id in ("climate.living", "climate.bedroom"):
+        health = controller._health.setdefault(entity_id, ZoneHealth())
+        controller._trip(entity_id, health, "unavailable")
+    assert len(registry.issues) == 2
+
+    stop()
+
+    assert not any(domain == DOMAIN for domain, _ in registry.issues)
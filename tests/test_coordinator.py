@@ -0,0 +1,204 @@
+"""Tests for the Dynamic Heating coordinator."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_mock_service,
+)
+
+from custom_components.dynamic_heating.const import (
+    ATTR_PRICE_HIGH,
+    CONF_COMFORT_END,
+    CONF_COMFORT_START,
+    CONF_COMFORT_TEMP,
+    CONF_GROUP_NAME,
+    CONF_GROUP_ZONES,
+    CONF_HEAT_PUMP_SWITCH,
+    CONF_OUTDOOR_TEMP_SENSOR,
+    CONF_PREHEAT_TIME,
+    CONF_PRICE_SENSOR,
+    CONF_TEMP_AWAY,
+    CONF_ZONE_CLIMATE,
+    CONF_ZONE_GROUPS,
+    CONF_ZONE_NAME,
+    CONF_ZONES,
+    DOMAIN,
+)
+from custom_components.dynamic_heating.coordinator import DynamicHeatingCoordinator
+from custom_components.dynamic_heating.dispatcher import async_get_dispatcher
+from custom_components.dynamic_heating.planner import (
+    EMPTY_INPUTS,
+    calculate_plan,
+    price_statistics,
+)
+
+CONFIG = {
+    CONF_PRICE_SENSOR: "sensor.price",
+    CONF_ZONES: [{CONF_ZONE_NAME: "Living", CONF_ZONE_CLIMATE: "climate.living"}],
+    CONF_COMFORT_START: "00:00",
+    CONF_COMFORT_END: "23:59:59",
+    CONF_COMFORT_TEMP: 21.5,
+    CONF_TEMP_AWAY: 16,
+    CONF_PREHEAT_TIME: 60,
+}
+
+
+CLIMATE_ATTRIBUTES = {
+    "temperature": 16,
+    "min_temp": 7,
+    "max_temp": 35,
+    "supported_features": 1,
+}
+
+
+def _slots(coordinator: DynamicHeatingCoordinator, count: int) -> list[dict]:
+    """Return flat hourly prices starting at the current slot."""
+    now = coordinator._current_slot()
+    return [
+        {"hour": now + timedelta(hours=i), "price": 1.0, "spot_price": 1.0}
+        for i in range(count)
+    ]
+
+
+async def test_preheat_slot_sets_planned_setpoint(hass: HomeAssistant) -> None:
+    """A zone gets the pre-heat target of the current slot, not a recompute."""
+    entry = MockConfigEntry(domain=DOMAIN, data=CONFIG)
+    entry.add_to_hass(hass)
+    coordinator = DynamicHeatingCoordinator(hass, entry, async_get_dispatcher(hass))
+    hass.states.async_set("climate.living", "heat", CLIMATE_ATTRIBUTES)
+    calls = async_mock_service(hass, "climate", "set_temperature")
+
+    # Away now, expected back in the next slot
+    prices = _slots(coordinator, 3)
+    keys = [p["hour"].isoformat() for p in prices]
+    inputs = {
+        **EMPTY_INPUTS,
+        "away": True,
+        "current_slot": keys[0],
+        "occupancy": {keys[0]: 0.0, keys[1]: 0.9, keys[2]: 0.9},
+    }
+    plan = calculate_plan(prices, price_statistics(prices), inputs, CONFIG)
+    assert plan[keys[0]]["preheat"]
+    assert plan[keys[0]]["target_temp"] == 21.5
+
+    coordinator._daily_plan = plan
+    await coordinator._apply_zone_temperatures()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(calls) == 1
+    assert calls[0].data["entity_id"] == "climate.living"
+    assert calls[0].data["temperature"] == 21.5
+
+
+async def test_grouped_zone_gets_group_target(hass: HomeAssistant) -> None:
+    """Zones in a group follow their profile's planned target."""
+    config = {
+        **CONFIG,
+        CONF_ZONES: [
+            *CONFIG[CONF_ZONES],
+            {CONF_ZONE_NAME: "Bedroom", CONF_ZONE_CLIMATE: "climate.bedroom"},
+        ],
+        CONF_ZONE_GROUPS: [
+            {
+                CONF_GROUP_NAME: "Bedrooms",
+                CONF_GROUP_ZONES: ["climate.bedroom"],
+                CONF_COMFORT_TEMP: 19,
+            }
+        ],
+    }
+    entry = MockConfigEntry(domain=DOMAIN, data=config)
+    entry.add_to_hass(hass)
+    coordinator = DynamicHeatingCoordinator(hass, entry, async_get_dispatcher(hass))
+    hass.states.async_set("climate.living", "heat", CLIMATE_ATTRIBUTES)
+    hass.states.async_set("climate.bedroom", "heat", CLIMATE_ATTRIBUTES)
+    calls = async_mock_service(hass, "climate", "set_temperature")
+
+    prices = _slots(coordinator, 3)
+    inputs = {**EMPTY_INPUTS, "current_slot": prices[0]["hour"].isoformat()}
+    coordinator._daily_plan = calculate_plan(
+        prices, price_statistics(prices), inputs, config, coordinator.profiles
+    )
+    await coordinator._apply_zone_temperatures()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    targets = {call.data["entity_id"]: call.data["temperature"] for call in calls}
+    assert targets == {"climate.living": 21.5, "climate.bedroom": 19}
+
+
+async def test_planning_cost_follows_executor_runs(hass: HomeAssistant) -> None:
+    """A slow estimate recovers through offloaded runs; simulations don't count."""
+    entry = MockConfigEntry(domain=DOMAIN, data=CONFIG)
+    coordinator = DynamicHeatingCoordinator(hass, entry, async_get_dispatcher(hass))
+    prices = _slots(coordinator, 24)
+    stats = price_statistics(prices)
+    coordinator._planning_cost_per_slot = 1.0
+
+    await coordinator._async_calculate_plan(prices, stats, EMPTY_INPUTS, CONFIG)
+    assert coordinator.planning_offloaded
+    assert coordinator._planning_cost_per_slot < 1.0
+
+    coordinator._spot_slots = prices
+    metrics = (
+        coordinator.planning_duration,
+        coordinator.planning_offloaded,
+        coordinator._planning_cost_per_slot,
+    )
+    result = await coordinator.async_simulate()
+    assert len(result["daily_plan"]) == 24
+    assert metrics == (
+        coordinator.planning_duration,
+        coordinator.planning_offloaded,
+        coordinator._planning_cost_per_slot,
+    )
+
+
+async def test_options_reach_every_component(hass: HomeAssistant) -> None:
+    """Settings changed in the options flow override the entry data."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={**CONFIG, CONF_OUTDOOR_TEMP_SENSOR: "sensor.old"},
+        options={
+            CONF_OUTDOOR_TEMP_SENSOR: "sensor.outdoor",
+            CONF_HEAT_PUMP_SWITCH: "switch.heat_pump",
+        },
+    )
+    coordinator = DynamicHeatingCoordinator(hass, entry, async_get_dispatcher(hass))
+
+    assert coordinator.heat_sources.switches == {"heat_pump": "switch.heat_pump"}
+    assert coordinator.history._statistic_ids == ["sensor.price", "sensor.outdoor"]
+
+
+async def test_republished_prices_rebuild_the_window(
+    hass: HomeAssistant, freezer
+) -> None:
+    """A price source publishing again replaces the window's statistics."""
+    day = dt_util.start_of_local_day()
+    freezer.move_to(day + timedelta(hours=10))
+
+    def publish(value: float) -> None:
+        prices = [
+            {
+                "start": (day + timedelta(hours=hour)).isoformat(),
+                "end": (day + timedelta(hours=hour + 1)).isoformat(),
+                "value": value if hour == 12 else 1.0,
+            }
+            for hour in range(24)
+        ]
+        hass.states.async_set(
+            "sensor.price", "1.0", {"raw_today": prices, "raw_tomorrow": []}
+        )
+
+    entry = MockConfigEntry(domain=DOMAIN, data=CONFIG)
+    coordinator = DynamicHeatingCoordinator(hass, entry, async_get_dispatcher(hass))
+    publish(5.0)
+    await coordinator.async_refresh()
+    assert coordinator.data[ATTR_PRICE_HIGH] == 5.0
+
+    freezer.tick(timedelta(minutes=5))
+    publish(3.0)
+    await coordinator.async_refresh()
+    assert coordinator.data[ATTR_PRICE_HIGH] == 3.0
@@ -0,0 +1,77 @@
+"""Tests for the domain-wide service-call dispatcher."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant, ServiceCall
+
+from custom_components.dynamic_heating.const import (
+    CONF_BOILER_SWITCH,
+    CONF_HEAT_PUMP_SWITCH,
+)
+from custom_components.dynamic_heating.dispatcher import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    async_get_dispatcher,
+)
+from custom_components.dynamic_heating.heat_source import (
+    SOURCE_BOILER,
+    HeatSourceSwitcher,
+)
+
+
+async def test_newer_command_replaces_queued_one(hass: HomeAssistant) -> None:
+    """Only the latest queued command for an entity is sent."""
+    sent: list[int] = []
+    release = asyncio.Event()
+
+    async def turn_on(call: ServiceCall) -> None:
+        if call.data["n"] == 0:
+            await release.wait()
+        sent.append(call.data["n"])
+
+    hass.services.async_register("switch", "turn_on", turn_on)
+    dispatcher = async_get_dispatcher(hass)
+
+    # Hold the worker on the first call so the others wait in the queue
+    dispatcher.async_enqueue("switch.a", "switch", "turn_on", {"n": 0})
+    first = dispatcher.async_enqueue(
+        "switch.b", "switch", "turn_on", {"n": 1}, PRIORITY_HIGH
+    )
+    second = dispatcher.async_enqueue(
+        "switch.b", "switch", "turn_on", {"n": 2}, PRIORITY_LOW
+    )
+    assert dispatcher.queue_depth == 1
+    release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert first.result() is False
+    assert second.result() is True
+    assert sent == [0, 2]
+    assert dispatcher.coalesced == 1
+    assert dispatcher.queue_depth == 0
+
+
+async def test_heat_source_switched_on_before_others_off(
+    hass: HomeAssistant,
+) -> None:
+    """The chosen source goes on first; the others go off only after it."""
+    config = {
+        CONF_HEAT_PUMP_SWITCH: "switch.heat_pump",
+        CONF_BOILER_SWITCH: "switch.boiler",
+    }
+    switcher = HeatSourceSwitcher(hass, config, async_get_dispatcher(hass))
+    hass.states.async_set("switch.heat_pump", "on")
+    hass.states.async_set("switch.boiler", "off")
+    order: list[str] = []
+
+    async def record(call: ServiceCall) -> None:
+        order.append(f"{call.data['entity_id']} {call.service}")
+
+    hass.services.async_register("switch", "turn_on", record)
+    hass.services.async_register("switch", "turn_off", record)
+
+    switcher.async_apply(SOURCE_BOILER)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert order == ["switch.boiler turn_on", "switch.heat_pump turn_off"]
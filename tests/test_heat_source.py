@@ -0,0 +1,113 @@
+"""Tests for hybrid heat-source selection."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_mock_service,
+)
+
+from custom_components.dynamic_heating.const import (
+    CONF_BOILER_EFFICIENCY,
+    CONF_BOILER_SWITCH,
+    CONF_COP_CURVE,
+    CONF_HEAT_PUMP_SWITCH,
+    CONF_OUTDOOR_TEMP_SENSOR,
+    CONF_PRICE_SENSOR,
+    DOMAIN,
+)
+from custom_components.dynamic_heating.coordinator import DynamicHeatingCoordinator
+from custom_components.dynamic_heating.dispatcher import async_get_dispatcher
+from custom_components.dynamic_heating.heat_source import (
+    SOURCE_BOILER,
+    SOURCE_HEAT_PUMP,
+    HeatSourceSwitcher,
+    select_heat_sources,
+)
+
+# A COP of 2 at -10 °C rising to 4 at 10 °C, and a boiler at 0.1 per kWh
+CONFIG = {
+    CONF_HEAT_PUMP_SWITCH: "switch.heat_pump",
+    CONF_BOILER_SWITCH: "switch.boiler",
+    CONF_BOILER_EFFICIENCY: 100,
+    CONF_COP_CURVE: "-10=2; 10=4",
+}
+
+
+def test_forecast_sets_the_cop_per_slot() -> None:
+    """A cold slot in the forecast goes to the boiler at the same price."""
+    sources = select_heat_sources(
+        [0.3, 0.3, 0.3], 10.0, 0.1, CONFIG, [None, -10.0, 10.0]
+    )
+
+    assert sources == [
+        (SOURCE_HEAT_PUMP, 0.075),
+        (SOURCE_BOILER, 0.1),
+        (SOURCE_HEAT_PUMP, 0.075),
+    ]
+
+
+def test_running_source_kept_within_margin() -> None:
+    """Near-equal costs do not switch away from the running source."""
+    # The heat pump costs 0.1, 0.098, 0.102 and 0.08 per kWh of heat
+    prices = [0.4, 0.392, 0.408, 0.32]
+    sources = select_heat_sources(prices, 10.0, 0.1, CONFIG, None, SOURCE_BOILER)
+
+    assert [source for source, _ in sources] == [
+        SOURCE_BOILER,
+        SOURCE_BOILER,
+        SOURCE_BOILER,
+        SOURCE_HEAT_PUMP,
+    ]
+    assert sources[1] == (SOURCE_BOILER, 0.1)
+
+
+async def test_outdoor_forecast_resampled_onto_slots(hass: HomeAssistant) -> None:
+    """The outdoor sensor's forecast lands on the slots it covers."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            **CONFIG,
+            CONF_PRICE_SENSOR: "sensor.price",
+            CONF_OUTDOOR_TEMP_SENSOR: "sensor.outdoor",
+        },
+    )
+    coordinator = DynamicHeatingCoordinator(hass, entry, async_get_dispatcher(hass))
+    now = coordinator._current_slot()
+    hours = [now + timedelta(hours=index) for index in range(3)]
+    keys = [hour.isoformat() for hour in hours]
+    hass.states.async_set(
+        "sensor.outdoor",
+        "4.0",
+        {
+            "forecast": [
+                {"datetime": hours[0].isoformat(), "temperature": 3.0},
+                {"datetime": hours[1].isoformat(), "temperature": -2.0},
+            ]
+        },
+    )
+    hass.states.async_set("switch.boiler", "on")
+    hass.states.async_set("switch.heat_pump", "off")
+
+    inputs = coordinator._capture_plan_inputs([{"hour": hour} for hour in hours])
+
+    assert inputs["outdoor_forecast"] == {keys[0]: 3.0, keys[1]: -2.0}
+    assert inputs["heat_source"] == SOURCE_BOILER
+
+
+async def test_unavailable_source_keeps_the_others_on(hass: HomeAssistant) -> None:
+    """An unavailable chosen source never switches the working ones off."""
+    switcher = HeatSourceSwitcher(hass, CONFIG, async_get_dispatcher(hass))
+    hass.states.async_set("switch.heat_pump", "on")
+    hass.states.async_set("switch.boiler", STATE_UNAVAILABLE)
+    calls = async_mock_service(hass, "switch", "turn_off")
+    calls += async_mock_service(hass, "switch", "turn_on")
+
+    switcher.async_apply(SOURCE_BOILER)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert calls == []
+    assert switcher.dispatcher.queue_depth == 0
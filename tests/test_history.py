@@ -0,0 +1,59 @@
+"""Tests for the recorder history warm-up."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dynamic_heating.const import CONF_PRICE_SENSOR, DOMAIN
+from custom_components.dynamic_heating.history import HistoryWarmup
+
+
+async def test_row_cap_keeps_the_rest_for_later(hass: HomeAssistant) -> None:
+    """A fetch cut off at the row cap resumes after the last row it got."""
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_SENSOR: "sensor.price"})
+    warmup = HistoryWarmup(hass, entry, entry.data)
+    now = dt_util.utcnow()
+
+    def fetch(
+        entity_id: str, start: datetime, end: datetime, limit: int
+    ) -> list[tuple[float, str]]:
+        # One row per hour, oldest first, at most limit rows
+        rows = []
+        moment = start + timedelta(minutes=30)
+        while moment < end and len(rows) < limit:
+            rows.append((moment.timestamp(), "home"))
+            moment += timedelta(hours=1)
+        return rows
+
+    recorder = MagicMock(async_add_executor_job=hass.async_add_executor_job)
+    with (
+        patch(
+            "custom_components.dynamic_heating.history.get_instance",
+            return_value=recorder,
+        ),
+        patch("custom_components.dynamic_heating.history.HISTORY_MAX_ROWS", 10),
+    ):
+        await warmup._async_fetch("person.me", now, fetch)
+        rows = warmup.states("person.me")
+        assert len(rows) == 10
+        assert warmup._fetched_until["person.me"] == rows[-1][0]
+
+        await warmup._async_fetch("person.me", now, fetch)
+        rows = warmup.states("person.me")
+        assert len(rows) == 20
+        assert all(earlier[0] < later[0] for earlier, later in zip(rows, rows[1:]))
+
+
+async def test_warm_up_without_recorder(hass: HomeAssistant) -> None:
+    """Without the recorder the warm-up finishes on the cache alone."""
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_SENSOR: "sensor.price"})
+    warmup = HistoryWarmup(hass, entry, entry.data)
+
+    await warmup.async_warm_up()
+
+    assert warmup.ready
+    assert warmup.statistics("sensor.price") == []
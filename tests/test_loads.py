@@ -0,0 +1,61 @@
+"""Tests for storage load scheduling."""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.dynamic_heating.const import (
+    CONF_ZONE_DEADLINE,
+    CONF_ZONE_ENERGY,
+    CONF_ZONE_HEATER_POWER,
+    CONF_ZONE_LOAD,
+    CONF_ZONES,
+    DOMAIN,
+)
+from custom_components.dynamic_heating.dispatcher import async_get_dispatcher
+from custom_components.dynamic_heating.loads import LoadScheduler
+
+HOUR = timedelta(hours=1)
+CONFIG = {
+    CONF_ZONES: [
+        {
+            CONF_ZONE_LOAD: "switch.tank",
+            CONF_ZONE_HEATER_POWER: 2.0,
+            CONF_ZONE_ENERGY: 6.0,
+            CONF_ZONE_DEADLINE: "07:00",
+        }
+    ]
+}
+
+
+async def test_delivered_energy_survives_restart(
+    hass: HomeAssistant, hass_storage: dict[str, Any], freezer
+) -> None:
+    """A restart keeps the energy already delivered in the current cycle."""
+    entry = MockConfigEntry(domain=DOMAIN, data=CONFIG)
+    freezer.move_to(dt_util.now().replace(hour=1, minute=0, second=0, microsecond=0))
+    hass.states.async_set("switch.tank", "on")
+
+    loads = LoadScheduler(hass, entry, CONFIG, async_get_dispatcher(hass))
+    await loads.async_load()
+    assert loads.requirements(HOUR)[0]["slots"] == 3
+
+    # Charge for an hour, then let the delayed save run
+    loads.async_apply(["switch.tank"])
+    freezer.tick(HOUR)
+    assert loads.requirements(HOUR)[0]["slots"] == 2
+    freezer.tick(timedelta(minutes=2))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert f"{DOMAIN}.{entry.entry_id}.loads" in hass_storage
+
+    restarted = LoadScheduler(hass, entry, CONFIG, async_get_dispatcher(hass))
+    await restarted.async_load()
+    assert restarted.requirements(HOUR)[0]["slots"] == 2
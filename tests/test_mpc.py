@@ -0,0 +1,60 @@
+"""Tests for the model predictive controller."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.dynamic_heating.mpc import (
+    MpcController,
+    ZoneModel,
+    solve_zone,
+)
+
+START = datetime(2026, 1, 15, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+MODEL = ZoneModel(time_constant=20, heat_rate=2.0, heater_power=5.0)
+
+
+def test_flat_prices_hold_the_lower_bound() -> None:
+    """With nothing to gain from storing heat the zone stays at its bound."""
+    solution = solve_zone(START, MODEL, 20.0, 0.0, HOUR, [0.5] * 4, [20] * 4, [23] * 4)
+
+    assert solution.setpoint == 20
+    assert solution.predicted == [20.0] * 4
+    assert all(0 < duty < 1 for duty in solution.duty)
+
+
+def test_cheap_slot_stores_heat() -> None:
+    """A cheap slot ahead of expensive ones heats at full power."""
+    costs = [0.1, 0.5, 0.5, 0.5]
+    solution = solve_zone(START, MODEL, 20.0, 0.0, HOUR, costs, [20] * 4, [23] * 4)
+
+    assert solution.duty[0] == 1.0
+    assert solution.duty[1] < 0.01
+    assert solution.setpoint == solution.predicted[0] > 20
+    assert min(solution.predicted) >= 20 - 1e-6
+    assert max(solution.predicted) <= 23
+
+
+def test_upper_bound_caps_storage() -> None:
+    """Stored heat never pushes the zone over its upper bound."""
+    costs = [0.1, 0.5, 0.5, 0.5]
+    solution = solve_zone(START, MODEL, 20.0, 0.0, HOUR, costs, [20] * 4, [20.5] * 4)
+
+    assert solution.setpoint == 20.5
+    assert max(solution.predicted) <= 20.5
+
+
+def test_controller_warm_starts_from_the_last_plan() -> None:
+    """A later solve reuses the shifted duty and forgets dropped zones."""
+    controller = MpcController()
+    zones = {"climate.living": (MODEL, 20.0)}
+    args = ([0.5] * 4, [20] * 4, [23] * 4, 0.0, zones)
+
+    controller.solve_all(START, HOUR, *args)
+    first = controller.solution("climate.living")
+    setpoints = controller.solve_all(START + HOUR, HOUR, *args)
+
+    assert setpoints == {"climate.living": 20}
+    assert controller.solution("climate.living") is not first
+    controller.forget(set())
+    assert controller.solution("climate.living") is None
@@ -0,0 +1,117 @@
+"""Tests for the pure heating planner."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.dynamic_heating.const import (
+    ATTR_PRICE_AVERAGE,
+    CONF_COMFORT_END,
+    CONF_COMFORT_START,
+    CONF_TEMP_AWAY,
+    CONF_TEMP_NORMAL,
+    CONF_TIER_COUNT,
+    CONF_TIER_METHOD,
+    CONF_TIER_OFFSETS,
+    PRICE_TIER_HIGH,
+    PRICE_TIER_LOW,
+    PRICE_TIER_NORMAL,
+    TIER_METHOD_QUANTILE,
+)
+from custom_components.dynamic_heating.planner import (
+    EMPTY_INPUTS,
+    calculate_plan,
+    is_comfort_hour,
+    price_statistics,
+    range_tiers,
+    schedule_loads,
+)
+
+START = datetime(2026, 1, 15, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+# No comfort hours, so every target follows its tier
+CONFIG = {CONF_COMFORT_START: "00:00", CONF_COMFORT_END: "00:00"}
+
+
+def _slots(prices: list[float]) -> list[dict]:
+    """Return hourly slots starting at START."""
+    return [
+        {"hour": START + index * HOUR, "price": price, "spot_price": price}
+        for index, price in enumerate(prices)
+    ]
+
+
+def test_range_tiers() -> None:
+    """Slots near the minimum are low, slots near the maximum high."""
+    slots = _slots([1, 2, 3, 4, 10])
+    stats = price_statistics(slots)
+
+    assert stats[ATTR_PRICE_AVERAGE] == 4
+    assert range_tiers([1, 2, 3, 4, 10], stats) == [
+        PRICE_TIER_LOW,
+        PRICE_TIER_LOW,
+        PRICE_TIER_NORMAL,
+        PRICE_TIER_NORMAL,
+        PRICE_TIER_HIGH,
+    ]
+
+
+def test_quantile_plan_applies_offsets() -> None:
+    """Quantile tiers add their offset to the normal temperature."""
+    config = {
+        **CONFIG,
+        CONF_TEMP_NORMAL: 20,
+        CONF_TIER_METHOD: TIER_METHOD_QUANTILE,
+        CONF_TIER_COUNT: 2,
+        CONF_TIER_OFFSETS: "1, -1",
+    }
+    slots = _slots([5, 1, 9, 2, 8, 3])
+    plan = calculate_plan(slots, price_statistics(slots), EMPTY_INPUTS, config)
+
+    assert [entry["tier_index"] for entry in plan.values()] == [1, 0, 1, 0, 1, 0]
+    assert [entry["target_temp"] for entry in plan.values()] == [19, 21] * 3
+
+
+def test_signal_cost_raises_the_score() -> None:
+    """A grid signal cost can move a cheap slot out of the low tier."""
+    slots = _slots([1, 1, 5])
+    key = slots[0]["hour"].isoformat()
+    inputs = {**EMPTY_INPUTS, "signal_costs": {key: 4.0}}
+    plan = calculate_plan(slots, price_statistics(slots), inputs, CONFIG)
+
+    assert plan[key]["score"] == 5.0
+    assert plan[key]["tier"] == PRICE_TIER_HIGH
+
+
+def test_away_sets_the_away_temperature() -> None:
+    """Away overrides every tier."""
+    slots = _slots([1, 5, 9])
+    inputs = {**EMPTY_INPUTS, "away": True}
+    plan = calculate_plan(
+        slots, price_statistics(slots), inputs, {**CONFIG, CONF_TEMP_AWAY: 15}
+    )
+
+    assert {entry["target_temp"] for entry in plan.values()} == {15}
+
+
+def test_loads_charge_in_the_cheapest_slots_before_the_deadline() -> None:
+    """Each load gets its cheapest slots, the earliest on ties."""
+    hours = [START + index * HOUR for index in range(6)]
+    loads = [
+        {"id": "car", "slots": 2, "deadline": hours[4]},
+        {"id": "water", "slots": 1, "deadline": hours[5]},
+    ]
+
+    charging = schedule_loads(hours, [3, 1, 2, 2, 0, 1], loads)
+
+    # Slot 4 is the cheapest but past the car's deadline
+    assert charging == {1: ["car"], 2: ["car"], 4: ["water"]}
+
+
+def test_comfort_hours_across_midnight() -> None:
+    """A comfort window ending after midnight wraps around."""
+    config = {CONF_COMFORT_START: "22:00:00", CONF_COMFORT_END: "06:00:00"}
+
+    assert is_comfort_hour(START.replace(hour=23), config)
+    assert is_comfort_hour(START.replace(hour=5), config)
+    assert not is_comfort_hour(START.replace(hour=12), config)
@@ -0,0 +1,40 @@
+"""Tests for the presence predictor."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dynamic_heating.const import (
+    CONF_HOME_AWAY_SENSOR,
+    CONF_PRICE_SENSOR,
+    DOMAIN,
+)
+from custom_components.dynamic_heating.history import HistoryWarmup
+from custom_components.dynamic_heating.presence import (
+    BUCKET,
+    PresencePredictor,
+    bucket_index,
+    bucket_start,
+)
+
+
+async def test_first_bucket_follows_the_entity(hass: HomeAssistant, freezer) -> None:
+    """A tick before async_start records the entity's state, not away."""
+    config = {CONF_PRICE_SENSOR: "sensor.price", CONF_HOME_AWAY_SENSOR: "person.me"}
+    entry = MockConfigEntry(domain=DOMAIN, data=config)
+    predictor = PresencePredictor(
+        hass, entry, config, HistoryWarmup(hass, entry, config)
+    )
+    hass.states.async_set("person.me", "home")
+    bucket = bucket_start(dt_util.utcnow())
+
+    predictor.async_tick()
+    unsub = predictor.async_start()
+    freezer.move_to(bucket + BUCKET)
+    predictor.async_tick()
+    unsub()
+
+    index = bucket_index(bucket)
+    assert predictor._observed[index] == 1
+    assert predictor._home[index] == 1
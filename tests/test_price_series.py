@@ -0,0 +1,145 @@
+"""Tests for price series normalization and merging."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.dynamic_heating.price_series import (
+    SYNTHETIC_QUALITY,
+    PriceSeries,
+    merge_series,
+    normalize_prices,
+)
+
+START = datetime(2026, 1, 15, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+def _series(prices: list[float], synthetic: bool = False) -> PriceSeries:
+    """Return a series of hourly prices starting at START."""
+    return PriceSeries(
+        slots=[
+            {"hour": START + index * HOUR, "price": price}
+            for index, price in enumerate(prices)
+        ],
+        quality=SYNTHETIC_QUALITY if synthetic else 1.0,
+        synthetic=synthetic,
+    )
+
+
+def _raw(prices: list[float | None], step: timedelta = HOUR) -> list[dict]:
+    """Return parser output with one price per step starting at START."""
+    return [
+        {"hour": START + index * step, "price": price}
+        for index, price in enumerate(prices)
+    ]
+
+
+def test_normalize_interpolates_short_gaps() -> None:
+    """A missing hour is interpolated and counts half towards quality."""
+    raw = _raw([1.0, 2.0, 3.0, 4.0])
+    del raw[2]
+    series = normalize_prices(raw, START, 24 * HOUR)
+
+    assert [slot["price"] for slot in series.slots] == [1.0, 2.0, 3.0, 4.0]
+    assert series.slots[2]["interpolated"]
+    assert series.interpolated == 1
+    assert series.quality == 3.5 / 4
+
+
+def test_normalize_counts_long_gaps() -> None:
+    """Gaps longer than the interpolation limit stay gaps."""
+    raw = _raw([1.0, 2.0, None, None, None, 6.0, 7.0])
+    series = normalize_prices(raw, START, 24 * HOUR)
+
+    assert [slot["price"] for slot in series.slots] == [1.0, 2.0, 6.0, 7.0]
+    assert series.gaps == 3
+
+
+def test_normalize_drops_invalid_and_merges_duplicates() -> None:
+    """Unparseable prices are dropped and a repeated slot keeps the last."""
+    raw = [*_raw([1.0, "x", float("nan")]), {"hour": START, "price": 3.0}]
+    series = normalize_prices(raw, START, 24 * HOUR)
+
+    assert [slot["price"] for slot in series.slots] == [3.0]
+    assert series.duplicates == 1
+
+
+def test_normalize_repeats_coarse_prices() -> None:
+    """Hourly prices fill every slot of a finer resolution."""
+    quarter = timedelta(minutes=15)
+    series = normalize_prices(_raw([1.0, 2.0]), START, 24 * HOUR, quarter)
+
+    assert [slot["price"] for slot in series.slots] == [1.0] * 4 + [2.0] * 4
+    assert series.resolution == quarter
+
+
+def test_normalize_averages_finer_prices() -> None:
+    """Quarter-hour prices on an hourly grid average over each hour."""
+    quarter = timedelta(minutes=15)
+    raw = _raw([1.0, 2.0, 3.0, 6.0, 4.0, 4.0], quarter)
+    series = normalize_prices(raw, START, 24 * HOUR, HOUR)
+
+    assert [slot["price"] for slot in series.slots] == [3.0, 4.0]
+    assert series.duplicates == 0
+
+
+def test_merge_averages_finer_fallback() -> None:
+    """A quarter-hour fallback fills an hourly gap with its hour's mean."""
+    quarter = timedelta(minutes=15)
+    primary = normalize_prices(_raw([1.0, None, 3.0]), START, 24 * HOUR)
+    fallback = normalize_prices(
+        _raw([9.0] * 4 + [1.0, 2.0, 3.0, 6.0], quarter), START, 24 * HOUR, HOUR
+    )
+    merged = merge_series([("primary", primary), ("fallback", fallback)])
+
+    assert [slot["price"] for slot in merged.slots] == [1.0, 3.0, 3.0]
+    assert merged.slots[1]["source"] == "fallback"
+
+
+def test_merge_prefers_primary() -> None:
+    """The first source wins every slot it has real data for."""
+    merged = merge_series([("a", _series([1, 2])), ("b", _series([5, 6, 7]))])
+
+    assert [slot["price"] for slot in merged.slots] == [1, 2, 7]
+    assert [slot["source"] for slot in merged.slots] == ["a", "a", "b"]
+    assert merged.quality == 1.0
+    assert not merged.synthetic
+
+
+def test_merge_prefers_real_over_interpolated() -> None:
+    """A secondary's real price beats the primary's interpolated one."""
+    primary = _series([1, 2, 3])
+    primary.slots[1]["interpolated"] = True
+    merged = merge_series([("a", primary), ("b", _series([5, 6, 7]))])
+
+    assert [slot["source"] for slot in merged.slots] == ["a", "b", "a"]
+    assert merged.interpolated == 0
+
+
+def test_merge_ranks_synthetic_last() -> None:
+    """A synthetic primary only fills slots no real source has."""
+    merged = merge_series(
+        [("a", _series([9, 9, 9], synthetic=True)), ("b", _series([5, 6]))]
+    )
+
+    assert [slot["source"] for slot in merged.slots] == ["b", "b", "a"]
+    assert merged.quality == (2 + SYNTHETIC_QUALITY) / 3
+    assert not merged.synthetic
+
+
+def test_merge_all_synthetic() -> None:
+    """Only synthetic data is reported as synthetic with low quality."""
+    merged = merge_series([("a", _series([9, 9], synthetic=True))])
+
+    assert merged.synthetic
+    assert merged.quality == SYNTHETIC_QUALITY
+
+
+def test_merge_counts_gaps() -> None:
+    """Slots no source covers are gaps and lower the quality."""
+    secondary = _series([5, 6, 7, 8])
+    del secondary.slots[1:3]
+    merged = merge_series([("a", _series([1])), ("b", secondary)])
+
+    assert merged.gaps == 2
+    assert merged.quality == 2 / 4
@@ -0,0 +1,63 @@
+"""Tests for the sliding price window."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.dynamic_heating.price_window import SlidingPriceWindow
+
+START = datetime(2026, 1, 15, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+def _series(prices: list[float]) -> list[tuple[datetime, float]]:
+    """Return hourly slots starting at START."""
+    return [(START + index * HOUR, price) for index, price in enumerate(prices)]
+
+
+def test_statistics() -> None:
+    """The window covers the slots between its start and end."""
+    window = SlidingPriceWindow()
+    window.update(_series([5, 1, 3, 9]), START, START + 3 * HOUR)
+
+    assert len(window) == 3
+    assert (window.minimum, window.maximum, window.average) == (1, 5, 3)
+
+
+def test_slide() -> None:
+    """Sliding evicts expired slots and appends newly published ones."""
+    window = SlidingPriceWindow()
+    window.update(_series([5, 1, 3]), START, START + 3 * HOUR)
+    window.update(_series([5, 1, 3, 9, 2]), START + 2 * HOUR, START + 5 * HOUR)
+
+    assert len(window) == 3
+    assert (window.minimum, window.maximum) == (2, 9)
+    assert window.average == 14 / 3
+
+
+def test_republished_middle_slot() -> None:
+    """A price changed inside the window rebuilds the statistics."""
+    window = SlidingPriceWindow()
+    window.update(_series([5, 1, 3, 4]), START, START + 4 * HOUR)
+    window.update(_series([5, 8, 3, 4]), START, START + 4 * HOUR, True)
+
+    assert (window.minimum, window.maximum, window.average) == (3, 8, 5)
+
+
+def test_republished_missing_slots() -> None:
+    """Slots withdrawn from the series are dropped from the window."""
+    window = SlidingPriceWindow()
+    window.update(_series([5, 1, 3]), START, START + 3 * HOUR)
+    window.update(_series([5, 1]), START, START + 3 * HOUR, True)
+
+    assert len(window) == 2
+    assert window.maximum == 5
+
+
+def test_slide_trusts_held_slots() -> None:
+    """Without a republication the held slots are not compared again."""
+    window = SlidingPriceWindow()
+    window.update(_series([5, 1, 3]), START, START + 3 * HOUR)
+    window.update(_series([5, 8, 3, 9]), START + HOUR, START + 4 * HOUR)
+
+    assert len(window) == 3
+    assert (window.minimum, window.maximum) == (1, 9)
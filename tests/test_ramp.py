@@ -0,0 +1,56 @@
+"""Tests for setpoint ramping."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.dynamic_heating.ramp import RAMP_GRANULARITY, RampTrajectory
+
+START = datetime(2026, 1, 15, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+def _plan(targets: list[float]) -> dict[str, dict]:
+    """Return an hourly plan with the given targets starting at START."""
+    return {
+        (START + index * HOUR).isoformat(): {"target_temp": target}
+        for index, target in enumerate(targets)
+    }
+
+
+def test_rise_starts_early_enough() -> None:
+    """A rise is reached on time, one granularity step at a time."""
+    trajectory = RampTrajectory.build(
+        _plan([18, 18, 18, 21, 21]), HOUR, START, 18.0, 1.0, 4 * HOUR
+    )
+
+    assert trajectory.setpoint_at(START - HOUR) is None
+    assert trajectory.setpoint_at(START) == 18
+    assert trajectory.setpoint_at(START + 3 * HOUR) == 21
+    assert len(trajectory) == 7
+    setpoints = [trajectory.setpoint_at(moment) for moment in trajectory._times]
+    assert all(
+        later - earlier == RAMP_GRANULARITY
+        for earlier, later in zip(setpoints, setpoints[1:])
+    )
+
+
+def test_lookahead_limits_preheating() -> None:
+    """Nothing rises earlier than the look-ahead before the target."""
+    trajectory = RampTrajectory.build(
+        _plan([18, 18, 18, 21, 21]), HOUR, START, 18.0, 1.0, 2 * HOUR
+    )
+
+    assert trajectory.setpoint_at(START + HOUR - timedelta(minutes=5)) == 18
+    assert trajectory.setpoint_at(START + 3 * HOUR) < 21
+    assert trajectory.setpoint_at(START + 4 * HOUR) == 21
+
+
+def test_falls_follow_the_ramp_rate() -> None:
+    """A drop from the current setpoint is spread over time too."""
+    trajectory = RampTrajectory.build(
+        _plan([18, 18]), HOUR, START, 20.0, 2.0, 4 * HOUR
+    )
+
+    assert trajectory.setpoint_at(START) == 20
+    assert trajectory.setpoint_at(START + HOUR / 2) == 19
+    assert trajectory.setpoint_at(START + HOUR) == 18
@@ -0,0 +1,78 @@
+"""Tests for the plan and simulation service responses."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.dynamic_heating.const import (
+    ATTR_RESOLUTION,
+    CONF_PRICE_SENSOR,
+    DOMAIN,
+)
+from custom_components.dynamic_heating.coordinator import DynamicHeatingCoordinator
+from custom_components.dynamic_heating.dispatcher import async_get_dispatcher
+from custom_components.dynamic_heating.price_series import floor_to_resolution
+from custom_components.dynamic_heating.services import _merge_entries, _plan_response
+
+QUARTER = timedelta(minutes=15)
+
+
+async def test_simulated_quarter_hours_on_an_hourly_entry(
+    hass: HomeAssistant,
+) -> None:
+    """Supplied prices are planned and resampled at their own resolution."""
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_PRICE_SENSOR: "sensor.price"})
+    coordinator = DynamicHeatingCoordinator(hass, entry, async_get_dispatcher(hass))
+    assert coordinator.resolution == timedelta(hours=1)
+    start = floor_to_resolution(coordinator._current_slot(), QUARTER)
+    prices = [
+        {"hour": start + index * QUARTER, "price": float(index)} for index in range(8)
+    ]
+
+    result = await coordinator.async_simulate(prices)
+    quarters = _plan_response(coordinator, result, None, None)
+    hours = _plan_response(coordinator, result, None, 60)
+
+    assert quarters[ATTR_RESOLUTION] == 15
+    assert len(quarters["slots"]) == 8
+    assert hours[ATTR_RESOLUTION] == 60
+    assert [slot["price"] for slot in hours["slots"]] == [1.5, 5.5]
+
+
+def test_merge_keeps_groups_loads_and_sources() -> None:
+    """Group targets, loads and heat sources survive resampling."""
+    base = {
+        "tier": "low",
+        "target_temp": 20,
+        "is_comfort_hour": False,
+        "boost_for_cop": False,
+        "price": 1.0,
+        "spot_price": 1.0,
+        "score": 1.0,
+    }
+    merged = _merge_entries(
+        [
+            {
+                **base,
+                "group_targets": {"Bedrooms": 18},
+                "loads": ["car"],
+                "heat_source": "boiler",
+                "heat_cost": 0.1,
+            },
+            {
+                **base,
+                "group_targets": {"Bedrooms": 19},
+                "loads": ["car", "water"],
+                "heat_source": "boiler",
+                "heat_cost": 0.2,
+                "preheat": True,
+            },
+        ]
+    )
+
+    assert merged["group_targets"] == {"Bedrooms": 19}
+    assert merged["loads"] == ["car", "water"]
+    assert (merged["heat_source"], merged["heat_cost"]) == ("boiler", 0.15)
+    assert merged["preheat"]
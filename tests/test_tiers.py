@@ -0,0 +1,59 @@
+"""Tests for quantile price tiers."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.dynamic_heating.const import (
+    CONF_TEMP_BOOST,
+    CONF_TEMP_NORMAL,
+    CONF_TEMP_SETBACK,
+    PRICE_TIER_HIGH,
+    PRICE_TIER_LOW,
+    PRICE_TIER_NORMAL,
+)
+from custom_components.dynamic_heating.tiers import (
+    assign_tiers,
+    quantile_boundaries,
+    select,
+    tier_name,
+    tier_offsets,
+)
+
+
+def test_select_matches_sorting() -> None:
+    """Quickselect returns the k-th smallest value and leaves the input alone."""
+    values = [5, 3, 9, 3, 1, 7, 3, 8]
+    original = list(values)
+
+    assert [select(values, k) for k in range(len(values))] == sorted(values)
+    assert values == original
+
+
+def test_outlier_does_not_move_the_tiers() -> None:
+    """A spike does not push the other slots into the low tier."""
+    scores = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 100.0]
+    boundaries = quantile_boundaries(scores, 3)
+    tiers = assign_tiers(scores, boundaries)
+
+    # A score equal to a boundary belongs to the cheaper tier
+    assert boundaries == [3.0, 5.0]
+    assert tiers == [0, 0, 0, 1, 1, 2, 2]
+    assert [tier_name(index, 3) for index in (0, 1, 2)] == [
+        PRICE_TIER_LOW,
+        PRICE_TIER_NORMAL,
+        PRICE_TIER_HIGH,
+    ]
+
+
+def test_tier_offsets_default_spread() -> None:
+    """Without a spec the offsets run from the boost to the setback."""
+    config = {CONF_TEMP_NORMAL: 20, CONF_TEMP_BOOST: 22, CONF_TEMP_SETBACK: 18}
+
+    assert tier_offsets(5, None, config) == [2.0, 1.0, 0.0, -1.0, -2.0]
+    assert tier_offsets(3, "1; 0; -1.5", config) == [1.0, 0.0, -1.5]
+
+
+def test_tier_offsets_count_mismatch() -> None:
+    """A spec with the wrong number of offsets is rejected."""
+    with pytest.raises(ValueError):
+        tier_offsets(3, "1, 0", {})
@@ -0,0 +1,69 @@
+"""Tests for zone groups and their temperature profiles."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.dynamic_heating.const import (
+    CONF_COMFORT_TEMP,
+    CONF_GROUP_NAME,
+    CONF_GROUP_PARENT,
+    CONF_GROUP_ZONES,
+    CONF_TEMP_SETBACK,
+)
+from custom_components.dynamic_heating.zone_groups import (
+    resolve_profiles,
+    validate_groups,
+)
+
+
+def _group(name: str, zones: list[str], parent: str | None = None, **overrides):
+    """Return a zone group definition."""
+    return {
+        CONF_GROUP_NAME: name,
+        CONF_GROUP_ZONES: zones,
+        CONF_GROUP_PARENT: parent,
+        **overrides,
+    }
+
+
+def test_nested_groups_inherit_overrides() -> None:
+    """Inner groups apply their overrides on top of their parents'."""
+    groups = [
+        _group("Upstairs", [], **{CONF_TEMP_SETBACK: 17}),
+        _group("Bedrooms", ["climate.bed"], "Upstairs", **{CONF_COMFORT_TEMP: 19}),
+        _group("Bathroom", ["climate.bath"], "Upstairs"),
+    ]
+    zone_profiles, profiles = resolve_profiles(groups, {CONF_TEMP_SETBACK: 18})
+
+    assert zone_profiles == {"climate.bed": "Bedrooms", "climate.bath": "Bathroom"}
+    assert profiles == {
+        "Bedrooms": {CONF_TEMP_SETBACK: 17, CONF_COMFORT_TEMP: 19},
+        "Bathroom": {CONF_TEMP_SETBACK: 17},
+    }
+
+
+def test_identical_profiles_are_shared() -> None:
+    """Groups producing the same settings share one profile."""
+    groups = [
+        _group("East", ["climate.east"], **{CONF_COMFORT_TEMP: 19}),
+        _group("West", ["climate.west"], **{CONF_COMFORT_TEMP: 19}),
+        _group("Same", ["climate.same"], **{CONF_COMFORT_TEMP: 21}),
+    ]
+    zone_profiles, profiles = resolve_profiles(groups, {CONF_COMFORT_TEMP: 21})
+
+    assert zone_profiles == {"climate.east": "East", "climate.west": "East"}
+    assert list(profiles) == ["East"]
+
+
+@pytest.mark.parametrize(
+    "groups",
+    [
+        [_group("A", [], "B"), _group("B", [], "A")],
+        [_group("A", [], "Missing")],
+        [_group("A", ["climate.x"]), _group("B", ["climate.x"])],
+    ],
+)
+def test_invalid_groups(groups: list[dict]) -> None:
+    """Cycles, unknown parents and zones in two groups are rejected."""
+    with pytest.raises(ValueError):
+        validate_groups(groups)